@@ -0,0 +1,57 @@
+import contextlib
+import os
+import threading
+import time
+
+from src.ai.metrics import GameMetrics
+from src.ai.session import GameSession
+from src.ai.stub_server import StubModel, create_server
+
+NUMBER_OF_PLAYERS = 4
+
+
+def _play(config_list: list, number_of_games: int) -> dict:
+    metrics = GameMetrics()
+    session = None
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for game_index in range(number_of_games):
+            if session is None:
+                session = GameSession(
+                    NUMBER_OF_PLAYERS, config_list, seed=game_index, metrics=metrics
+                )
+            else:
+                session.reset(game_index)
+            session.play()
+    duration = time.perf_counter() - start
+
+    summary = metrics.summary()
+    return {
+        "games_per_second": number_of_games / duration,
+        "model_calls_per_second": summary["model_calls"] / duration,
+        "turns_per_second": summary["turns"] / duration,
+    }
+
+
+def run(quick: bool = False) -> dict[str, float]:
+    """Full group chat games per second against the local stub model, without model latency"""
+    number_of_games = 1 if quick else 5
+    server = create_server(StubModel(seed=0), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    config_list = [
+        {
+            "model": "gpt-4",
+            "api_key": "local",
+            "base_url": f"http://127.0.0.1:{server.server_port}/v1",
+            # Measure the round trips, not autogen's disk cache
+            "cache_seed": None,
+        }
+    ]
+
+    try:
+        return {
+            f"end_to_end/{name}": rate for name, rate in _play(config_list, number_of_games).items()
+        }
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,49 @@
+from benchmarks.timing import best_rate
+
+from src.handler.game_handler import ResistanceCoupGameHandler
+from src.models.player import PlayerStrategy
+from src.simulation.headless import run_games
+
+PLAYER_COUNTS = [2, 3, 4, 5, 6]
+
+# Strategy mixes handed out to the seats in order, None is the default rotation
+STRATEGY_MIXES: dict[str, list[PlayerStrategy]] = {
+    "rotation": None,
+    "aggressive": [PlayerStrategy.aggressive],
+    "conservative": [PlayerStrategy.conservative],
+    "coup_freak": [PlayerStrategy.coup_freak],
+}
+# A search per decision makes ISMCTS games orders of magnitude slower, so fewer are played
+ISMCTS_MIX = [PlayerStrategy.ismcts, PlayerStrategy.aggressive, PlayerStrategy.conservative]
+
+
+def _games_per_second(
+    number_of_players: int, strategies: list[PlayerStrategy], number_of_games: int
+) -> float:
+    handler = ResistanceCoupGameHandler(number_of_players, seed=0, strategies=strategies)
+
+    # Every run plays the same games
+    def play_games():
+        run_games(
+            number_of_players,
+            range(number_of_games),
+            seed=0,
+            handler=handler,
+            strategies=strategies,
+        )
+
+    return best_rate(play_games, number=1, repeat=3) * number_of_games
+
+
+def run(quick: bool = False) -> dict[str, float]:
+    """Headless games per second by number of players and strategy mix"""
+    number_of_games = 20 if quick else 200
+    results = {
+        f"macro/{name}/{number_of_players}p": _games_per_second(
+            number_of_players, strategies, number_of_games
+        )
+        for name, strategies in STRATEGY_MIXES.items()
+        for number_of_players in PLAYER_COUNTS
+    }
+    results["macro/ismcts/3p"] = _games_per_second(3, ISMCTS_MIX, 1 if quick else 3)
+    return results
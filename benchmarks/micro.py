@@ -0,0 +1,55 @@
+import time
+
+from benchmarks.timing import best_rate
+
+from src.handler.game_handler import ACTIONS_MAP, ResistanceCoupGameHandler
+from src.handler.narration import NullSink
+from src.models.action import ActionType
+
+NUMBER_OF_PLAYERS = 4
+# Players are eliminated one by one from a table this large, dealt again when one is left
+ELIMINATION_TABLE_SIZE = 1_000
+
+
+def _deactivate_player_rate(number: int, repeat: int = 5) -> float:
+    """Eliminations per second, of a real player each, in the fastest of `repeat` runs"""
+    handler = ResistanceCoupGameHandler(ELIMINATION_TABLE_SIZE, seed=0, narration=NullSink())
+    snapshot = handler.snapshot()
+    best = float("inf")
+    for _ in range(repeat):
+        elapsed, remaining = 0.0, number
+        while remaining:
+            # Dealing the table again isn't timed
+            handler.restore(snapshot)
+            players = handler.players[1:][:remaining]
+            remaining -= len(players)
+
+            start = time.perf_counter()
+            for player in players:
+                # As if the player lost their last card this turn
+                handler._pending_eliminations.append(player)
+                handler._deactivate_player()
+            elapsed += time.perf_counter() - start
+        best = min(best, elapsed)
+    return number / best
+
+
+def run(quick: bool = False) -> dict[str, float]:
+    """Calls per second of the handler's hot paths, on a freshly dealt game"""
+    number = 2_000 if quick else 20_000
+    handler = ResistanceCoupGameHandler(NUMBER_OF_PLAYERS, seed=0, narration=NullSink())
+    current_player = handler.current_player
+    target_player = next(player for player in handler.players if player != current_player)
+    steal = ACTIONS_MAP[ActionType.steal]
+
+    def swap_card():
+        handler._swap_card(current_player, current_player.cards.pop())
+
+    return {
+        "micro/validate_action": best_rate(
+            lambda: handler._validate_action(steal, current_player, target_player), number
+        ),
+        "micro/swap_card": best_rate(swap_card, number),
+        "micro/deactivate_player": _deactivate_player_rate(number),
+        "micro/get_game_state": best_rate(handler.get_game_state, number // 10),
+    }
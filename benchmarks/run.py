@@ -0,0 +1,75 @@
+import argparse
+import json
+import platform
+import sys
+
+from benchmarks import end_to_end, macro, micro
+
+SUITES = {"micro": micro, "macro": macro, "end_to_end": end_to_end}
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float) -> list[str]:
+    """The benchmarks that are more than `threshold` slower than their baseline"""
+    return [
+        name
+        for name, rate in results.items()
+        if name in baseline and rate < baseline[name] * (1 - threshold)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game engine, handler and agents")
+    parser.add_argument(
+        "--suites",
+        type=lambda value: value.split(","),
+        default=list(SUITES),
+        help=f"Comma separated suites to run, out of {','.join(SUITES)}",
+    )
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations, for a smoke test")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Fail when a benchmark is this fraction slower than its baseline",
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Store these results as the new baseline"
+    )
+    args = parser.parse_args()
+
+    results: dict[str, float] = {}
+    for suite in args.suites:
+        if suite not in SUITES:
+            parser.error(f"Unknown suite {suite}, choose from {','.join(SUITES)}")
+        results.update(SUITES[suite].run(quick=args.quick))
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(
+                {"machine": platform.platform(), "python": platform.python_version(), **results},
+                file,
+                indent=2,
+            )
+        print(f"Saved the baseline to {args.baseline}")
+
+    try:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+    except FileNotFoundError:
+        baseline = {}
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, rate in results.items():
+        change = f"{rate / baseline[name] - 1:+.1%}" if name in baseline else "no baseline"
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<40} {rate:>14,.2f}/s  {change}{flag}")
+
+    if regressions:
+        print(f"{len(regressions)} benchmarks regressed more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
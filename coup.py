@@ -1,19 +1,16 @@
+import argparse
+import asyncio
 import sys
 
-from autogen import (
-    AssistantAgent,
-    GroupChat,
-    GroupChatManager,
-    UserProxyAgent,
-    config_list_from_dotenv,
-)
+from autogen import config_list_from_dotenv
 
-from src.ai.agents import (
-    create_game_master_agent,
-    create_player_agent,
-    create_user_proxy,
-)
-from src.handler.game_handler import ResistanceCoupGameHandler
+from src.ai.async_runner import run_sessions
+from src.ai.broker import DecisionBroker, HTTPBatchBackend, OpenAIBackend
+from src.ai.cache import ResponseCache
+from src.ai.metrics import GameMetrics
+from src.ai.session import GameSession
+from src.handler.event_log import EventLog
+from src.models.player import PlayerStrategy
 
 config_list = config_list_from_dotenv(
     dotenv_file_path=".env",
@@ -26,49 +23,144 @@ config_list = config_list_from_dotenv(
 
 
 def main():
-    # Create game handler with 3 players
-    handler = ResistanceCoupGameHandler(3)
-    print(f"First player is {handler.current_player}")
+    parser = argparse.ArgumentParser(description="Watch AI agents play The Resistance: Coup")
+    parser.add_argument("--players", type=int, default=3, help="Number of players per game")
+    parser.add_argument("--games", type=int, default=1, help="Number of games to play")
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="Number of games to play at the same time"
+    )
+    parser.add_argument(
+        "--until-settled",
+        action="store_true",
+        help="Stop starting new games once the ranking of the strategies by win rate is settled, "
+        "playing at most --games games",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the (first) game")
+    parser.add_argument(
+        "--base-url",
+        default=None,
+        help="Play against a local OpenAI compatible server instead of the OpenAI API",
+    )
+    parser.add_argument(
+        "--context-window",
+        type=int,
+        default=None,
+        help="Only send the last N messages to the model, with a snapshot of the game before them",
+    )
+    parser.add_argument(
+        "--strategies",
+        type=lambda value: [PlayerStrategy(strategy) for strategy in value.split(",")],
+        default=None,
+        help="Comma separated strategies handed out to the seats in order, "
+        "ismcts seats are played by a search instead of a model",
+    )
+    parser.add_argument(
+        "--event-log",
+        default=None,
+        help="Write the event log of a single game to this file (.jsonl or .jsonl.gz)",
+    )
+    parser.add_argument(
+        "--metrics",
+        default=None,
+        help="Write timings, tokens and invalid actions per turn to this file "
+        "(.csv, or Prometheus text for .prom)",
+    )
+    parser.add_argument(
+        "--response-window",
+        action="store_true",
+        help="Ask all players at once whether they counter or challenge an action",
+    )
+    parser.add_argument(
+        "--batch-window",
+        type=float,
+        default=None,
+        help="Collect the model requests of all games for this many seconds and send them together",
+    )
+    parser.add_argument(
+        "--batch-route",
+        action="store_true",
+        help="Send every batch as one request to the /chat/completions/batch route of --base-url, "
+        "which the stub server has",
+    )
+    args = parser.parse_args()
 
-    # Create AI players
-    agent_players = []
-    for ind, player in enumerate(handler.players):
-        agent_players.append(
-            create_player_agent(
-                name=player.name,
-                other_player_names=[
-                    other_player.name
-                    for other_player in handler.players
-                    if other_player.name != player.name
-                ],
-                cards=player.cards,
-                strategy=player.strategy,
-                handler=handler,
-                config_list=config_list,
-            )
-        )
+    session_config_list = config_list
+    if args.base_url:
+        session_config_list = [{"model": "gpt-4", "api_key": "local", "base_url": args.base_url}]
 
-    # Game master
-    game_master: AssistantAgent = create_game_master_agent(handler, config_list)
+    # Model responses are cached on disk, replays of the same prompts don't call the model again
+    response_cache = ResponseCache()
+    metrics = GameMetrics() if args.metrics else None
 
-    # Game master
-    user_proxy: UserProxyAgent = create_user_proxy(config_list)
+    broker = None
+    if args.batch_window is not None:
+        if args.batch_route:
+            if not args.base_url:
+                parser.error("--batch-route needs the --base-url of the server")
+            backend = HTTPBatchBackend(args.base_url)
+        else:
+            backend = OpenAIBackend(
+                api_key=session_config_list[0].get("api_key"),
+                base_url=session_config_list[0].get("base_url"),
+            )
+        broker = DecisionBroker(backend, window=args.batch_window)
 
-    # Define group chat
-    group_chat = GroupChat(
-        agents=[user_proxy, game_master, *agent_players],
-        messages=[],
-        admin_name=game_master.name,
-        max_round=1000,
-    )
-    manager = GroupChatManager(groupchat=group_chat, llm_config={"config_list": config_list})
+    if args.games == 1:
+        # Create game handler and the agents playing the game
+        event_log = EventLog() if args.event_log else None
+        session = GameSession(
+            args.players,
+            session_config_list,
+            response_cache,
+            seed=args.seed,
+            context_window=args.context_window,
+            event_log=event_log,
+            strategies=args.strategies,
+            metrics=metrics,
+            response_window=args.response_window,
+            broker=broker,
+        )
+        print(f"First player is {session.handler.current_player}")
 
-    task = """
-    Play a game of The Resistance: Coup until there is a single winner.
-    """
+        try:
+            session.play()
+        finally:
+            # Also keep the log of a game that crashed or was interrupted
+            if event_log is not None:
+                event_log.write(args.event_log)
+        print("GAME OVER")
+    else:
+        results = asyncio.run(
+            run_sessions(
+                args.games,
+                args.players,
+                session_config_list,
+                concurrency=args.concurrency,
+                response_cache=response_cache,
+                seed=args.seed,
+                context_window=args.context_window,
+                strategies=args.strategies,
+                metrics=metrics,
+                response_window=args.response_window,
+                broker=broker,
+                until_settled=args.until_settled,
+            )
+        )
+        print(f"GAMES OVER, played {len(results)} of {args.games} games")
+        for result in results:
+            print(
+                f"  - Game {result.game_index}: winner {result.winner}, "
+                f"{result.messages} messages in {result.duration:.1f}s"
+                + (f" ({result.error})" if result.error else "")
+            )
 
-    game_master.initiate_chat(manager, message=task)
-    print("GAME OVER")
+    print(f"Response cache: {response_cache.stats()}")
+    if broker is not None:
+        broker.close()
+        print(f"Decision broker: {broker.stats()}")
+    if metrics is not None:
+        metrics.write(args.metrics)
+        print(f"Metrics: {metrics.summary()}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,46 @@
+import argparse
+import sys
+
+from src.server.game_server import GameServer
+from src.server.games import RESPONSE_TIMEOUT, GamePool
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Host many games over HTTP and websockets, for humans, bots and agents to join"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Host to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument(
+        "--max-games", type=int, default=1000, help="Most games hosted at the same time"
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=600.0,
+        help="Seconds without a join or command after which a game is closed",
+    )
+    parser.add_argument("--max-players", type=int, default=100, help="Most players per game")
+    parser.add_argument(
+        "--response-timeout",
+        type=float,
+        default=RESPONSE_TIMEOUT,
+        help="Seconds the players get to challenge or counter before an action can be executed",
+    )
+    args = parser.parse_args()
+
+    pool = GamePool(args.max_games, args.idle_timeout, args.max_players, args.response_timeout)
+    server = GameServer(pool, args.host, args.port)
+    print(f"Hosting games on http://{args.host}:{server.server_port}/games")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        print(f"Closed with {len(pool)} games still hosted")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -0,0 +1,111 @@
+import argparse
+import multiprocessing
+import sys
+import time
+
+from src.engine.batch import run_batch_tournament
+from src.models.player import PlayerStrategy
+from src.simulation.headless import replay_game
+from src.simulation.tournament import run_tournament
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play headless games of The Resistance: Coup")
+    parser.add_argument("--games", type=int, default=1000, help="Number of games to play")
+    parser.add_argument("--players", type=int, default=3, help="Number of players per game")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the tournament")
+    parser.add_argument("--max-turns", type=int, default=1000, help="Turn limit per game")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=multiprocessing.cpu_count(),
+        help="Number of worker processes",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["handler", "compact", "batch"],
+        default="handler",
+        help="Play through the game handler, on the faster compact game state, "
+        "or as NumPy batches of games played in lockstep",
+    )
+    parser.add_argument(
+        "--strategies",
+        type=lambda value: [PlayerStrategy(strategy) for strategy in value.split(",")],
+        default=None,
+        help="Comma separated strategies handed out to the seats in order, for example "
+        "ismcts,conservative,aggressive (handler engine only)",
+    )
+    parser.add_argument(
+        "--until-settled",
+        action="store_true",
+        help="Stop as soon as the ranking of the strategies by win rate is settled, "
+        "playing at most --games games (handler and compact engines)",
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=0.95,
+        help="Confidence the ranking needs to be settled with",
+    )
+    parser.add_argument(
+        "--replay",
+        type=int,
+        default=None,
+        metavar="GAME_INDEX",
+        help="Replay a single game of the tournament with --seed and show the play-by-play",
+    )
+    args = parser.parse_args()
+
+    if args.replay is not None:
+        if args.seed is None:
+            parser.error("--replay needs the --seed of the tournament")
+        result = replay_game(args.players, args.seed, args.replay, args.max_turns, args.strategies)
+        print(result.model_dump_json(indent=2))
+        return
+
+    start = time.perf_counter()
+    if args.engine == "batch":
+        if args.until_settled:
+            parser.error("--until-settled needs the handler or compact engine")
+        # Vectorized over the games, so it runs in this process
+        args.workers = 1
+        summary = run_batch_tournament(
+            args.games, args.players, seed=args.seed, max_turns=args.max_turns
+        )
+    else:
+        summary, _ = run_tournament(
+            args.games,
+            args.players,
+            seed=args.seed,
+            workers=args.workers,
+            max_turns=args.max_turns,
+            engine=args.engine,
+            strategies=args.strategies,
+            until_settled=args.until_settled,
+            confidence=args.confidence,
+        )
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"Played {summary.number_of_games} games with seed {summary.seed} in {elapsed:.2f}s "
+        f"({summary.number_of_games / elapsed:.0f} games/s on {args.workers} workers)"
+    )
+    if summary.settled:
+        print(f"The ranking of the strategies was settled after {summary.number_of_games} games")
+    print(f"Average game length: {summary.average_turns:.1f} turns")
+    for strategy, strategy_summary in summary.strategies.items():
+        low, high = strategy_summary.win_rate_interval
+        print(
+            f"  - {strategy.value}: {strategy_summary.win_rate:.1%} win rate per seat "
+            f"(95% interval {low:.1%}-{high:.1%}), "
+            f"average placing {strategy_summary.average_placing:.2f}"
+        )
+    if summary.unfinished_games:
+        print(f"{summary.unfinished_games} games hit the turn limit without a winner")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(130)
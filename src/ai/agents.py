@@ -1,12 +1,22 @@
-from autogen import AssistantAgent, UserProxyAgent
+import asyncio
+import functools
+import json
+from typing import Optional
 
-from src.handler.game_handler import ResistanceCoupGameHandler
-from src.models.action import ActionType
+from autogen import Agent, AssistantAgent, ConversableAgent, UserProxyAgent
+
+from src.ai.bots import PlayerBot
+from src.ai.cache import ResponseCache, enable_response_cache
+from src.ai.ismcts import DecisionType, responders
+from src.ai.prompts import player_functions, player_instructions
+from src.handler.game_handler import ResistanceCoupGameHandler, TurnPhase
 from src.models.card import Card
 from src.models.player import PlayerStrategy
 
 
-def create_user_proxy(config_list: list) -> UserProxyAgent:
+def create_user_proxy(
+    config_list: list, response_cache: Optional[ResponseCache] = None
+) -> UserProxyAgent:
     llm_config = {
         "config_list": config_list,
         "temperature": 0,
@@ -27,11 +37,15 @@ def create_user_proxy(config_list: list) -> UserProxyAgent:
         human_input_mode="NEVER",
         # max_consecutive_auto_reply=10
     )
+    if response_cache:
+        enable_response_cache(user_proxy, response_cache)
     return user_proxy
 
 
 def create_game_master_agent(
-    handler: ResistanceCoupGameHandler, config_list: list
+    handler: ResistanceCoupGameHandler,
+    config_list: list,
+    response_cache: Optional[ResponseCache] = None,
 ) -> AssistantAgent:
     llm_config = {
         "config_list": config_list,
@@ -74,6 +88,8 @@ def create_game_master_agent(
         },
         description="The game master in a game of The Resistance Coup.",
     )
+    if response_cache:
+        enable_response_cache(game_master, response_cache)
     return game_master
 
 
@@ -84,185 +100,15 @@ def create_player_agent(
     strategy: PlayerStrategy,
     handler: ResistanceCoupGameHandler,
     config_list: list,
+    response_cache: Optional[ResponseCache] = None,
 ) -> AssistantAgent:
     llm_config = {
         "config_list": config_list,
         "temperature": 0.5,
-        "functions": [
-            {
-                "name": "perform_action",
-                "description": "Perform a valid action for Resistance: Coup",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "player_name": {
-                            "type": "string",
-                            "description": "Send your own name.",
-                            "enum": [name],
-                        },
-                        "action_name": {
-                            "type": "string",
-                            "description": "The name of the action to perform.",
-                            "enum": [
-                                ActionType.income,
-                                ActionType.foreign_aid,
-                                ActionType.tax,
-                                ActionType.coup,
-                                ActionType.steal,
-                                ActionType.assassinate,
-                                ActionType.exchange,
-                            ],
-                        },
-                        "target_player_name": {
-                            "type": "string",
-                            "description": "The player name to target.",
-                        },
-                    },
-                    "required": ["player_name", "action_name"],
-                },
-            },
-            {
-                "name": "counter_action",
-                "description": "Counter the previous action that was performed",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "countering_player_name": {
-                            "type": "string",
-                            "description": "Send your own name.",
-                            "enum": [name],
-                        },
-                    },
-                    "required": ["countering_player_name"],
-                },
-            },
-            {
-                "name": "challenge_action",
-                "description": "Challenge the previous action that was performed by another player "
-                "if you think that the player that performed the action does not have the required card.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "challenging_player_name": {
-                            "type": "string",
-                            "description": "Send your own name.",
-                            "enum": [name],
-                        },
-                    },
-                    "required": ["challenging_player_name"],
-                },
-            },
-            {
-                "name": "challenge_counter_action",
-                "description": "Challenge the previous counter-action that was performed by another player "
-                "if you think that the player that performed the counter-action does not "
-                "have the required card.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "challenging_player_name": {
-                            "type": "string",
-                            "description": "Send your own name.",
-                            "enum": [name],
-                        },
-                    },
-                    "required": ["challenging_player_name"],
-                },
-            },
-            {
-                "name": "execute_action",
-                "description": "Execute the action that was performed and complete the turn.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "player_name": {
-                            "type": "string",
-                            "description": "Send your own name.",
-                            "enum": [name],
-                        },
-                        "action_name": {
-                            "type": "string",
-                            "description": "The name of the action to perform.",
-                            "enum": [
-                                ActionType.income,
-                                ActionType.foreign_aid,
-                                ActionType.tax,
-                                ActionType.coup,
-                                ActionType.steal,
-                                ActionType.assassinate,
-                                ActionType.exchange,
-                            ],
-                        },
-                        "target_player_name": {
-                            "type": "string",
-                            "description": "The player name to target.",
-                        },
-                    },
-                    "required": ["player_name", "action_name"],
-                },
-            },
-        ],
+        "functions": player_functions(name),
     }
 
-    if strategy == PlayerStrategy.aggressive:
-        strategy_str = (
-            "Your strategy is to play aggressive. Try to assassinate, coup, or steal as soon as you can. "
-            "Don't be scared to bluff to get more coins."
-            "If you keep getting blocked, rather get income on your next turn, before playing aggressive again. "
-            "Always challenge other players if you don't think they have the card they claim to have."
-        )
-    elif strategy == PlayerStrategy.conservative:
-        strategy_str = (
-            "Your strategy is to play conservative. "
-            "Build up your money, avoid bluffing, and wait for the opportunity to perform a coup."
-            "Don't be too reckless with challenging other players after an action or counteraction, but feel free"
-            "to do it if you are pretty sure."
-        )
-    else:
-        strategy_str = (
-            "Your strategy is to perform a coup as soon as you have enough coins, otherwise gather money as "
-            "fast as possible by taking foreign aid or tax. However be careful not to bluff too much, otherwise "
-            "you might lose your cards and be eliminated."
-        )
-
-    instructions = f"""Your name is {name} and you are a player in the game The Resistance: Coup. 
-        You are playing against {", ".join(other_player_names)}. 
-        
-        You start with a {str(cards[0])} card and a {str(cards[1])} card, as well as 2 coins.
-        
-        On your turn you have to pick a valid action based on your current available cards and coins. 
-        Also provide your own name to the function. 
-        
-        Never announce what cards you have, they are secret.
-        
-        If your action was invalid, you have to pick another action. However feel free to bluff and perform an 
-        action even if you don't have the card, but be careful because it could be challenged.
-        
-        You can counter another player's action if action_can_be_countered is "True", 
-        after they tried to perform their action.
-        
-        Feel free to challenge another player's action if action_can_be_challenged is "True", 
-        after they tried to perform their action, and if you think they are bluffing, by using the
-        challenge_action function.
-        
-        Feel free to challenge another player's counter-action if you think they are bluffing, by using the
-        challenge_counter_action function.
-        
-        If no one counters or challenges your action, you have the call "execute_action" to complete the turn. 
-        If after perform_action you find that turn_complete is "True", you don't have to execute your action.
-                
-        You also chit-chat with your opponent when you communicate an action to light up the mood.
-
-        You should ensure both you and your opponents are making valid actions. 
-        Also that everyone is only taking actions when it is their turn.
-        
-        {strategy_str}
-        
-        Don't hoard up coins, but rather try the assassinate or coup actions when you have a chance. 
-
-        Do not apologize for making invalid actions.
-        
-        If the game is over, stop playing."""
+    instructions = player_instructions(name, other_player_names, cards, strategy)
 
     player = AssistantAgent(
         name=name,
@@ -278,5 +124,188 @@ def create_player_agent(
         max_consecutive_auto_reply=100,
         description=f"The player named {name} the game of The Resistance Coup",
     )
+    if response_cache:
+        enable_response_cache(player, response_cache)
+
+    restrict_to_legal_actions(player, handler)
+
+    return player
+
+
+def reset_player_agent(
+    player: ConversableAgent,
+    other_player_names: list[str],
+    cards: list[Card],
+    strategy: PlayerStrategy,
+) -> None:
+    """Prepare a player agent for a new game, keeping its schemas, caches and registered replies"""
+    player.reset()
+    player.update_system_message(
+        player_instructions(player.name, other_player_names, cards, strategy)
+    )
+
+
+def restrict_to_legal_actions(player: ConversableAgent, handler: ResistanceCoupGameHandler) -> None:
+    """
+    Only offer the model the actions and targets that are legal right now.
+
+    The enums of the perform_action schema are narrowed before every model call, so the model
+    can't pick an action the handler would reject and has to retry. The schema dicts are shared
+    with the agent's client, so they are updated in place.
+    """
+    perform_action = next(
+        function
+        for function in player.llm_config["functions"]
+        if function["name"] == "perform_action"
+    )
+    properties = perform_action["parameters"]["properties"]
+    all_action_names = list(properties["action_name"]["enum"])
+
+    def update_legal_actions(
+        recipient: ConversableAgent,
+        messages: Optional[list[dict]] = None,
+        sender: Optional[Agent] = None,
+        config: Optional[dict] = None,
+    ):
+        legal_actions = handler.legal_actions(recipient.name)
+        if legal_actions:
+            properties["action_name"]["enum"] = list(
+                dict.fromkeys(action_type for action_type, _ in legal_actions)
+            )
+            targets = list(dict.fromkeys(target for _, target in legal_actions if target))
+        else:
+            # Not our turn to act, any call is rejected by the handler anyway
+            properties["action_name"]["enum"] = all_action_names
+            targets = []
+
+        if targets:
+            properties["target_player_name"]["enum"] = targets
+        else:
+            properties["target_player_name"].pop("enum", None)
+
+        # Never replies itself, the model does with the updated schema
+        return False, None
+
+    position = [reply["reply_func"] for reply in player._reply_func_list].index(
+        ConversableAgent.a_generate_oai_reply
+    )
+    player.register_reply([Agent, None], update_legal_actions, position=position)
+
+
+def _bot_function_call(bot: PlayerBot, handler: ResistanceCoupGameHandler) -> Optional[dict]:
+    """The function a bot calls when it is asked to speak, None when it passes"""
+    player_name = bot.player_name
+    acting_player_name = handler.current_player.name
+    action = handler.current_action
+    execute_action = {
+        "name": "execute_action",
+        "arguments": {
+            "player_name": acting_player_name,
+            "action_name": action.action_type if action else None,
+            "target_player_name": handler.current_action_target_player_name or "",
+        },
+    }
+
+    match handler.turn_phase:
+        case TurnPhase.action if player_name == acting_player_name:
+            action_type, target_player_name = bot.choose_action(handler)
+            return {
+                "name": "perform_action",
+                "arguments": {
+                    "player_name": player_name,
+                    "action_name": action_type,
+                    "target_player_name": target_player_name or "",
+                },
+            }
+        case TurnPhase.action_response:
+            if player_name == acting_player_name:
+                return execute_action
+            if action.can_be_challenged and bot.should_challenge(
+                handler,
+                acting_player_name,
+                action.action_type,
+                handler.current_action_target_player_name,
+            ):
+                return {
+                    "name": "challenge_action",
+                    "arguments": {"challenging_player_name": player_name},
+                }
+            if (
+                action.can_be_countered
+                and player_name in responders(handler, DecisionType.counter)
+                and bot.should_counter(handler, acting_player_name, action.action_type)
+            ):
+                return {
+                    "name": "counter_action",
+                    "arguments": {"countering_player_name": player_name},
+                }
+        case TurnPhase.counter_response:
+            countering_player_name = handler.current_counter_action_player_name
+            if player_name != countering_player_name and bot.should_challenge_counter(
+                handler, countering_player_name, action.action_type
+            ):
+                return {
+                    "name": "challenge_counter_action",
+                    "arguments": {"challenging_player_name": player_name},
+                }
+            if player_name == acting_player_name:
+                return execute_action
+
+    return None
+
+
+def create_bot_player_agent(bot: PlayerBot, handler: ResistanceCoupGameHandler) -> ConversableAgent:
+    """A seat in the group chat played by a bot (for example ISMCTS) instead of a model"""
+
+    def bot_reply(
+        recipient: ConversableAgent,
+        messages: Optional[list[dict]] = None,
+        sender: Optional[Agent] = None,
+        config: Optional[dict] = None,
+    ):
+        if (function_call := _bot_function_call(bot, handler)) is None:
+            return True, "I pass."
+
+        return True, {
+            "content": f"{bot.player_name} calls {function_call['name']}.",
+            "function_call": {
+                "name": function_call["name"],
+                "arguments": json.dumps(function_call["arguments"]),
+            },
+        }
+
+    async def a_bot_reply(
+        recipient: ConversableAgent,
+        messages: Optional[list[dict]] = None,
+        sender: Optional[Agent] = None,
+        config: Optional[dict] = None,
+    ):
+        # A search can take a while, keep the event loop free for the other games
+        return await asyncio.get_event_loop().run_in_executor(
+            None, functools.partial(bot_reply, recipient, messages, sender, config)
+        )
+
+    player = ConversableAgent(
+        name=bot.player_name,
+        llm_config=False,
+        function_map={
+            "perform_action": handler.perform_action,
+            "counter_action": handler.counter_action,
+            "challenge_action": handler.challenge_action,
+            "challenge_counter_action": handler.challenge_counter_action,
+            "execute_action": handler.execute_action,
+        },
+        code_execution_config=False,
+        human_input_mode="NEVER",
+        max_consecutive_auto_reply=100,
+        description=f"The player named {bot.player_name} the game of The Resistance Coup",
+    )
+
+    # Function calls are still executed first, the bot answers instead of a model
+    position = [reply["reply_func"] for reply in player._reply_func_list].index(
+        ConversableAgent.a_generate_oai_reply
+    )
+    player.register_reply([Agent, None], bot_reply, position=position)
+    player.register_reply([Agent, None], a_bot_reply, position=position)
 
     return player
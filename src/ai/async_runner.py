@@ -0,0 +1,143 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from pydantic import BaseModel
+
+from src.ai.broker import DecisionBroker
+from src.ai.cache import ResponseCache
+from src.ai.metrics import GameMetrics
+from src.ai.session import GameSession
+from src.models.player import PlayerStrategy
+from src.simulation.headless import game_seed
+from src.simulation.statistics import WinRateTracker
+
+
+class SessionResult(BaseModel):
+    game_index: int
+    winner: Optional[str] = None
+    strategies: dict[str, PlayerStrategy] = {}
+    messages: int = 0
+    duration: float = 0.0
+    error: Optional[str] = None
+
+
+async def _play_session(
+    game_index: int,
+    number_of_players: int,
+    config_list: list,
+    semaphore: asyncio.Semaphore,
+    response_cache: Optional[ResponseCache],
+    seed: Optional[int],
+    context_window: Optional[int],
+    strategies: Optional[list[PlayerStrategy]],
+    idle_sessions: list[GameSession],
+    metrics: Optional[GameMetrics],
+    response_window: bool,
+    broker: Optional[DecisionBroker],
+    tracker: Optional[WinRateTracker],
+    confidence: float,
+    settled: asyncio.Event,
+) -> Optional[SessionResult]:
+    async with semaphore:
+        # Games that didn't start before the ranking settled aren't played
+        if settled.is_set():
+            return None
+
+        start = time.perf_counter()
+        # The same seed as the game of this index in a headless tournament
+        seed_of_game = None if seed is None else game_seed(seed, game_index)
+        if idle_sessions:
+            session = idle_sessions.pop()
+            session.reset(seed_of_game)
+        else:
+            session = GameSession(
+                number_of_players,
+                config_list,
+                response_cache=response_cache,
+                seed=seed_of_game,
+                context_window=context_window,
+                strategies=strategies,
+                metrics=metrics,
+                response_window=response_window,
+                broker=broker,
+            )
+        result = SessionResult(game_index=game_index)
+        try:
+            await session.a_play()
+        except Exception as e:
+            # One broken game shouldn't take down the rest of the batch
+            result.error = f"{type(e).__name__}: {e}"
+
+        winner = session.winner
+        result.winner = winner.name if winner else None
+        result.strategies = {player.name: player.strategy for player in session.handler.players}
+        result.messages = len(session.group_chat.messages)
+        result.duration = time.perf_counter() - start
+
+        if tracker is not None and result.error is None:
+            tracker.update(result.strategies, result.winner)
+            if tracker.settled(confidence):
+                settled.set()
+
+        idle_sessions.append(session)
+        return result
+
+
+async def run_sessions(
+    number_of_games: int,
+    number_of_players: int,
+    config_list: list,
+    concurrency: int = 8,
+    response_cache: Optional[ResponseCache] = None,
+    seed: Optional[int] = None,
+    context_window: Optional[int] = None,
+    strategies: Optional[list[PlayerStrategy]] = None,
+    metrics: Optional[GameMetrics] = None,
+    response_window: bool = False,
+    broker: Optional[DecisionBroker] = None,
+    until_settled: bool = False,
+    confidence: float = 0.95,
+) -> list[SessionResult]:
+    """
+    Play `number_of_games` LLM games concurrently, at most `concurrency` at a time.
+
+    Every running game has its own handler and agents, which are reset and reused by a next game
+    once it's done, so at most `concurrency` sets of agents are ever built. autogen runs the model
+    calls of async chats in the event loop's default executor, which is sized to `concurrency` so
+    the calls of all running games can be in flight together, or be batched by a `broker`.
+
+    With `until_settled` no more games are started once the ranking of the strategies by win rate
+    is settled with `confidence`, the games already running are finished.
+    """
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+
+    semaphore = asyncio.Semaphore(concurrency)
+    idle_sessions: list[GameSession] = []
+    tracker = WinRateTracker() if until_settled else None
+    settled = asyncio.Event()
+    results = await asyncio.gather(
+        *[
+            _play_session(
+                game_index,
+                number_of_players,
+                config_list,
+                semaphore,
+                response_cache,
+                seed,
+                context_window,
+                strategies,
+                idle_sessions,
+                metrics,
+                response_window,
+                broker,
+                tracker,
+                confidence,
+                settled,
+            )
+            for game_index in range(number_of_games)
+        ]
+    )
+    return [result for result in results if result is not None]
@@ -0,0 +1,208 @@
+import random
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from src.handler.game_handler import ACTIONS_MAP, ResistanceCoupGameHandler
+from src.models.action import ActionType
+from src.models.card import CardType
+from src.models.player import Player, PlayerStrategy
+
+
+class PlayerBot(ABC):
+    """A rule-based player that takes the same decisions an LLM player would, without the LLM"""
+
+    strategy: PlayerStrategy
+
+    def __init__(self, player_name: str, rng: Optional[random.Random] = None):
+        self.player_name = player_name
+        self.rng = rng or random.Random()
+
+    def _player(self, handler: ResistanceCoupGameHandler) -> Player:
+        return handler.get_player(self.player_name)
+
+    def _opponents(self, handler: ResistanceCoupGameHandler) -> list[Player]:
+        return [
+            player
+            for player in handler.players
+            if player.is_active and player.name != self.player_name
+        ]
+
+    def _has_card(self, handler: ResistanceCoupGameHandler, card_type: CardType) -> bool:
+        return any(card.card_type == card_type for card in self._player(handler).cards)
+
+    def _can_block(self, handler: ResistanceCoupGameHandler, action_type: ActionType) -> bool:
+        return any(
+            self._has_card(handler, card_type)
+            for card_type in ACTIONS_MAP[action_type].counter_card_types
+        )
+
+    def _coup_target(self, handler: ResistanceCoupGameHandler) -> str:
+        # Go after the opponent with the most influence, then the most coins
+        return max(
+            self._opponents(handler), key=lambda player: (len(player.cards), player.coins)
+        ).name
+
+    def _steal_target(self, handler: ResistanceCoupGameHandler) -> Optional[str]:
+        richest = max(self._opponents(handler), key=lambda player: player.coins)
+        return richest.name if richest.coins > 0 else None
+
+    def _forced_action(
+        self, handler: ResistanceCoupGameHandler
+    ) -> Optional[tuple[ActionType, Optional[str]]]:
+        player = self._player(handler)
+        if player.coins >= 10:
+            return ActionType.coup, self._coup_target(handler)
+        if handler.treasury == 0:
+            if player.coins >= 7:
+                return ActionType.coup, self._coup_target(handler)
+            if steal_target := self._steal_target(handler):
+                return ActionType.steal, steal_target
+            return ActionType.exchange, None
+        return None
+
+    def choose_action(self, handler: ResistanceCoupGameHandler) -> tuple[ActionType, Optional[str]]:
+        if forced_action := self._forced_action(handler):
+            return forced_action
+
+        action = self._choose_action(handler)
+        # Never send the handler an action it would reject
+        legal_actions = handler.legal_actions(self.player_name)
+        if legal_actions and action not in legal_actions:
+            return self.rng.choice(legal_actions)
+        return action
+
+    @abstractmethod
+    def _choose_action(
+        self, handler: ResistanceCoupGameHandler
+    ) -> tuple[ActionType, Optional[str]]:
+        ...
+
+    @abstractmethod
+    def should_challenge(
+        self,
+        handler: ResistanceCoupGameHandler,
+        acting_player_name: str,
+        action_type: ActionType,
+        target_player_name: Optional[str],
+    ) -> bool:
+        ...
+
+    @abstractmethod
+    def should_counter(
+        self,
+        handler: ResistanceCoupGameHandler,
+        acting_player_name: str,
+        action_type: ActionType,
+    ) -> bool:
+        ...
+
+    @abstractmethod
+    def should_challenge_counter(
+        self,
+        handler: ResistanceCoupGameHandler,
+        countering_player_name: str,
+        action_type: ActionType,
+    ) -> bool:
+        ...
+
+
+class AggressiveBot(PlayerBot):
+    strategy = PlayerStrategy.aggressive
+
+    def _choose_action(
+        self, handler: ResistanceCoupGameHandler
+    ) -> tuple[ActionType, Optional[str]]:
+        player = self._player(handler)
+        if player.coins >= 7:
+            return ActionType.coup, self._coup_target(handler)
+        if player.coins >= 3:
+            return ActionType.assassinate, self._coup_target(handler)
+        steal_target = self._steal_target(handler)
+        if steal_target and self.rng.random() < 0.5:
+            return ActionType.steal, steal_target
+        # Happy to bluff a Duke
+        return ActionType.tax, None
+
+    def should_challenge(self, handler, acting_player_name, action_type, target_player_name):
+        if target_player_name == self.player_name:
+            return self.rng.random() < 0.5
+        return self.rng.random() < 0.25
+
+    def should_counter(self, handler, acting_player_name, action_type):
+        # Blocks whenever it can, and bluffs a block half the time
+        return self._can_block(handler, action_type) or self.rng.random() < 0.5
+
+    def should_challenge_counter(self, handler, countering_player_name, action_type):
+        return self.rng.random() < 0.3
+
+
+class ConservativeBot(PlayerBot):
+    strategy = PlayerStrategy.conservative
+
+    def _choose_action(
+        self, handler: ResistanceCoupGameHandler
+    ) -> tuple[ActionType, Optional[str]]:
+        player = self._player(handler)
+        if player.coins >= 7:
+            return ActionType.coup, self._coup_target(handler)
+        if self._has_card(handler, CardType.duke):
+            return ActionType.tax, None
+        # Mixes in income so two blockers going after each other can't stall the game
+        if self.rng.random() < 0.5:
+            return ActionType.income, None
+        if self._has_card(handler, CardType.captain) and (
+            steal_target := self._steal_target(handler)
+        ):
+            return ActionType.steal, steal_target
+        if self._has_card(handler, CardType.assassin) and player.coins >= 3:
+            return ActionType.assassinate, self._coup_target(handler)
+        return ActionType.income, None
+
+    def should_challenge(self, handler, acting_player_name, action_type, target_player_name):
+        # Only challenge when holding two copies of the claimed card ourselves
+        card_type = ACTIONS_MAP[action_type].associated_card_type
+        return sum(card.card_type == card_type for card in self._player(handler).cards) == 2
+
+    def should_counter(self, handler, acting_player_name, action_type):
+        return self._can_block(handler, action_type)
+
+    def should_challenge_counter(self, handler, countering_player_name, action_type):
+        return False
+
+
+class CoupFreakBot(PlayerBot):
+    strategy = PlayerStrategy.coup_freak
+
+    def _choose_action(
+        self, handler: ResistanceCoupGameHandler
+    ) -> tuple[ActionType, Optional[str]]:
+        player = self._player(handler)
+        if player.coins >= 7:
+            return ActionType.coup, self._coup_target(handler)
+        if self._has_card(handler, CardType.duke) or self.rng.random() < 0.3:
+            return ActionType.tax, None
+        return ActionType.foreign_aid, None
+
+    def should_challenge(self, handler, acting_player_name, action_type, target_player_name):
+        return self.rng.random() < 0.1
+
+    def should_counter(self, handler, acting_player_name, action_type):
+        return self._can_block(handler, action_type) or (
+            action_type == ActionType.assassinate and len(self._player(handler).cards) == 1
+        )
+
+    def should_challenge_counter(self, handler, countering_player_name, action_type):
+        return self.rng.random() < 0.1
+
+
+BOTS_MAP: dict[PlayerStrategy, type[PlayerBot]] = {
+    PlayerStrategy.aggressive: AggressiveBot,
+    PlayerStrategy.conservative: ConservativeBot,
+    PlayerStrategy.coup_freak: CoupFreakBot,
+}
+
+
+def create_player_bot(
+    player_name: str, strategy: PlayerStrategy, rng: Optional[random.Random] = None
+) -> PlayerBot:
+    return BOTS_MAP[strategy](player_name, rng)
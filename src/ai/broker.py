@@ -0,0 +1,187 @@
+import json
+import queue
+import threading
+import time
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, NamedTuple, Optional, Protocol
+
+from autogen import ConversableAgent
+from openai import OpenAI
+from openai.types.chat import ChatCompletion
+
+from src.ai.stub_server import StubModel
+
+DEFAULT_WINDOW = 0.02
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_RETRIES = 2
+
+
+class BatchBackend(Protocol):
+    def complete(self, requests: list[dict]) -> list[dict]:
+        """A chat completion response for every request, or a dict with an `error` for failures"""
+        ...
+
+
+class StubBackend:
+    """Answers batches in process from a StubModel, as a stand-in for the model"""
+
+    def __init__(self, model: StubModel):
+        self.model = model
+
+    def complete(self, requests: list[dict]) -> list[dict]:
+        return self.model.complete_batch(requests)
+
+
+class HTTPBatchBackend:
+    """Sends every batch as a single request to the `/chat/completions/batch` route of the server"""
+
+    def __init__(self, base_url: str, api_key: str = "local", timeout: float = 600):
+        self.url = base_url.rstrip("/") + "/chat/completions/batch"
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def complete(self, requests: list[dict]) -> list[dict]:
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps({"requests": requests}).encode(),
+            headers={"Content-Type": "application/json", "Authorization": f"Bearer {self.api_key}"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())["responses"]
+
+
+class OpenAIBackend:
+    """
+    Sends the requests of a batch concurrently, over the connection pool of a single client.
+
+    For servers without a batch route, such as the OpenAI API. The requests of all games share
+    their connections instead of every agent opening its own.
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_BATCH_SIZE, **client_config):
+        self.client = OpenAI(**client_config)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def _complete(self, request: dict) -> dict:
+        try:
+            return self.client.chat.completions.create(**request).model_dump()
+        except Exception as e:
+            return {"error": {"message": f"{type(e).__name__}: {e}"}}
+
+    def complete(self, requests: list[dict]) -> list[dict]:
+        return list(self._executor.map(self._complete, requests))
+
+
+class _PendingRequest(NamedTuple):
+    request: dict
+    future: Future
+    attempt: int
+
+
+class DecisionBroker:
+    """
+    Collects the model requests of many concurrent games and sends them to the backend together.
+
+    The first request waits at most `window` seconds for others to join its batch, a batch is sent
+    as soon as it holds `max_batch_size` requests. Answers are routed back to the agent that asked,
+    failed requests join the next batch up to `max_retries` times.
+    """
+
+    def __init__(
+        self,
+        backend: BatchBackend,
+        window: float = DEFAULT_WINDOW,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ):
+        self.backend = backend
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.max_retries = max_retries
+
+        self.batches = 0
+        self.requests = 0
+
+        self._queue: queue.Queue[Optional[_PendingRequest]] = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, request: dict) -> Future:
+        future: Future = Future()
+        self._queue.put(_PendingRequest(request, future, 0))
+        return future
+
+    def complete(self, request: dict) -> dict:
+        return self.submit(request).result()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _next_batch(self) -> Optional[list[_PendingRequest]]:
+        pending = self._queue.get()
+        if pending is None:
+            return None
+
+        batch = [pending]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                pending = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if pending is None:
+                # Finish this batch before stopping
+                self._queue.put(None)
+                break
+            batch.append(pending)
+        return batch
+
+    def _run(self) -> None:
+        while (batch := self._next_batch()) is not None:
+            self.batches += 1
+            self.requests += len(batch)
+            try:
+                responses = self.backend.complete([pending.request for pending in batch])
+            except Exception as e:
+                responses = [{"error": {"message": f"{type(e).__name__}: {e}"}}] * len(batch)
+
+            # Requests left without a response fail like any other, instead of waiting forever
+            missing = {"error": {"message": "The backend returned no response for this request"}}
+            responses = list(responses) + [missing] * (len(batch) - len(responses))
+
+            for pending, response in zip(batch, responses):
+                if "error" not in response:
+                    pending.future.set_result(response)
+                elif pending.attempt < self.max_retries:
+                    self._queue.put(pending._replace(attempt=pending.attempt + 1))
+                else:
+                    pending.future.set_exception(
+                        Exception(f"Model request failed: {response['error'].get('message')}")
+                    )
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "average_batch_size": self.requests / self.batches if self.batches else 0.0,
+        }
+
+
+def enable_decision_broker(agent: ConversableAgent, broker: DecisionBroker) -> None:
+    """Send the model requests of an agent (or a GroupChatManager) through `broker`"""
+    if agent.client is None:
+        return
+
+    def brokered_completions_create(client: Any, params: dict) -> ChatCompletion:
+        # Streaming doesn't batch, and agents in a group chat don't stream anyway
+        request = {key: value for key, value in params.items() if key != "stream"}
+        return ChatCompletion.model_validate(broker.complete(request))
+
+    # Below the response cache and metrics, which wrap create()
+    agent.client._completions_create = brokered_completions_create
@@ -0,0 +1,109 @@
+import hashlib
+import json
+from typing import Any, Optional
+
+import diskcache
+from autogen import ConversableAgent, OpenAIWrapper
+
+DEFAULT_CACHE_DIRECTORY = ".cache/responses"
+DEFAULT_SIZE_LIMIT = 2**30
+
+
+class ResponseCache:
+    """
+    A content-addressed cache of model responses on local disk.
+
+    Responses are keyed on the model, temperature, messages and function schema of the request, so
+    byte-identical prompts are only sent to the model once. The cache is shared by every process
+    using the same directory, and evicts the least recently used responses once it grows past
+    `size_limit` bytes.
+    """
+
+    def __init__(
+        self, directory: str = DEFAULT_CACHE_DIRECTORY, size_limit: int = DEFAULT_SIZE_LIMIT
+    ):
+        self._cache = diskcache.Cache(
+            directory, size_limit=size_limit, eviction_policy="least-recently-used"
+        )
+        # Hits and misses of every process sharing the cache are counted by diskcache
+        self._cache.stats(enable=True)
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(
+        model: Optional[str],
+        temperature: Optional[float],
+        messages: list[dict],
+        functions: Optional[list[dict]],
+    ) -> str:
+        request = {
+            "model": model,
+            "temperature": temperature,
+            "messages": messages,
+            "functions": functions,
+        }
+        return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        response = self._cache.get(key)
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response
+
+    def set(self, key: str, response: Any) -> None:
+        self._cache.set(key, response)
+
+    def stats(self) -> dict:
+        shared_hits, shared_misses = self._cache.stats()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared_hits": shared_hits,
+            "shared_misses": shared_misses,
+            "size_bytes": self._cache.volume(),
+            "entries": len(self._cache),
+        }
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def close(self) -> None:
+        self._cache.close()
+
+
+class CachedOpenAIWrapper(OpenAIWrapper):
+    """An OpenAIWrapper that answers repeated requests from a ResponseCache"""
+
+    def __init__(self, *, response_cache: ResponseCache, config_list: list = None, **base_config):
+        super().__init__(config_list=config_list, **base_config)
+        self.response_cache = response_cache
+
+    def create(self, **config):
+        # The first config of the list is the one that answers, unless it fails
+        request = {**config, **self._config_list[0]}
+        key = self.response_cache.key(
+            model=request.get("model"),
+            temperature=request.get("temperature"),
+            messages=request.get("messages"),
+            functions=request.get("functions"),
+        )
+
+        if (response := self.response_cache.get(key)) is not None:
+            self._update_usage_summary(response, use_cache=True)
+            return response
+
+        # Skip autogen's own cache, we are the cache
+        response = super().create(**{**config, "cache_seed": None})
+        self.response_cache.set(key, response)
+        return response
+
+
+def enable_response_cache(agent: ConversableAgent, response_cache: ResponseCache) -> None:
+    """Route the model calls of an agent (or a GroupChatManager) through `response_cache`"""
+    if agent.client is None:
+        return
+    agent.client = CachedOpenAIWrapper(response_cache=response_cache, **agent.llm_config)
@@ -0,0 +1,108 @@
+import asyncio
+import functools
+import json
+from typing import Optional
+
+from autogen import Agent, ConversableAgent
+
+from src.handler.game_handler import ResistanceCoupGameHandler
+
+DEFAULT_WINDOW = 12
+DEFAULT_EVENTS = 10
+MAX_EVENT_LENGTH = 200
+
+
+def _describe_event(message: dict, agent_name: str) -> Optional[str]:
+    """A single line of the public event log for a function call or its result"""
+    if function_call := message.get("function_call"):
+        speaker = message.get("name") or agent_name
+        arguments = " ".join(str(function_call.get("arguments", "")).split())
+        event = f"{speaker} called {function_call['name']}({arguments})"
+    elif message.get("role") == "function":
+        event = f"{message.get('name')} returned {' '.join(str(message.get('content')).split())}"
+    else:
+        return None
+
+    return event[:MAX_EVENT_LENGTH]
+
+
+def compact_messages(
+    messages: list[dict],
+    agent_name: str,
+    handler: ResistanceCoupGameHandler,
+    window: int = DEFAULT_WINDOW,
+    events: int = DEFAULT_EVENTS,
+) -> list[dict]:
+    """
+    Keep the last `window` messages verbatim and replace everything before them with a snapshot.
+
+    The snapshot is the current game state, the agent's own cards if it is a player, and the last
+    `events` function calls and results of the older messages, so its size doesn't depend on the
+    length of the game.
+    """
+    if len(messages) <= window:
+        return messages
+
+    # Don't open the window on a function result without the call that produced it
+    start = len(messages) - window
+    while start > 0 and messages[start].get("role") == "function":
+        start -= 1
+    if start == 0:
+        return messages
+
+    event_log: list[str] = []
+    for message in reversed(messages[:start]):
+        if len(event_log) == events:
+            break
+        if event := _describe_event(message, agent_name):
+            event_log.append(event)
+    event_log.reverse()
+
+    snapshot = {"game_state": handler.get_game_state()}
+    if agent_name in [player.name for player in handler.players]:
+        snapshot["your_cards"] = [str(card) for card in handler.get_player(agent_name).cards]
+
+    content = (
+        f"Summary of the game so far, {start} earlier messages are left out:\n"
+        f"{json.dumps(snapshot, default=str)}\n"
+        "Most recent earlier events:\n" + "\n".join(f" - {event}" for event in event_log)
+    )
+    return [{"role": "user", "content": content}] + messages[start:]
+
+
+def enable_context_window(
+    agent: ConversableAgent,
+    handler: ResistanceCoupGameHandler,
+    window: int = DEFAULT_WINDOW,
+    events: int = DEFAULT_EVENTS,
+) -> None:
+    """Only send the last `window` messages to the model, and a snapshot of the game before them"""
+
+    def windowed_oai_reply(
+        recipient: ConversableAgent,
+        messages: Optional[list[dict]] = None,
+        sender: Optional[Agent] = None,
+        config: Optional[dict] = None,
+    ):
+        if messages is None:
+            messages = recipient.chat_messages[sender]
+        return recipient.generate_oai_reply(
+            compact_messages(messages, recipient.name, handler, window, events), sender
+        )
+
+    async def a_windowed_oai_reply(
+        recipient: ConversableAgent,
+        messages: Optional[list[dict]] = None,
+        sender: Optional[Agent] = None,
+        config: Optional[dict] = None,
+    ):
+        return await asyncio.get_event_loop().run_in_executor(
+            None, functools.partial(windowed_oai_reply, recipient, messages, sender, config)
+        )
+
+    # Answer right before the default model replies, so function calls and termination still go first
+    position = [reply["reply_func"] for reply in agent._reply_func_list].index(
+        ConversableAgent.a_generate_oai_reply
+    )
+    agent.register_reply([Agent, None], windowed_oai_reply, position=position)
+    agent.register_reply([Agent, None], a_windowed_oai_reply, position=position)
@@ -0,0 +1,448 @@
+import math
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+from typing import Any, NamedTuple, Optional
+
+from src.ai.bots import PlayerBot, create_player_bot
+from src.ai.transposition import TranspositionTable
+from src.handler.deck import CARD_TYPES
+from src.handler.game_handler import (
+    GameSnapshot,
+    PlayerSnapshot,
+    ResistanceCoupGameHandler,
+)
+from src.handler.narration import NullSink
+from src.handler.zobrist import Feature, zobrist_key
+from src.models.action import ActionType
+from src.models.player import PlayerStrategy
+
+DEFAULT_TIME_BUDGET = 0.1
+DEFAULT_MAX_ITERATIONS = 300
+DEFAULT_EXPLORATION = 0.3
+DEFAULT_ROLLOUT_TURNS = 20
+
+# How searching players are assumed to play in simulations, other players play their own strategy
+ROLLOUT_STRATEGY = PlayerStrategy.coup_freak
+
+
+class DecisionType(str, Enum):
+    action = "action"
+    challenge = "challenge"
+    counter = "counter"
+    challenge_counter = "challenge_counter"
+
+
+class Decision(NamedTuple):
+    """A decision one player has to take, in the order headless games ask for them"""
+
+    decision_type: DecisionType
+    player_name: str
+    # Players that are asked the same question after this one, in seat order
+    waiting: tuple[str, ...] = ()
+
+
+def responders(handler: ResistanceCoupGameHandler, decision_type: DecisionType) -> list[str]:
+    """The players that get to respond to the current action or counter-action"""
+    acting_player_name = handler.current_player.name
+    match decision_type:
+        case DecisionType.challenge:
+            return handler.players_after(acting_player_name)
+        case DecisionType.counter:
+            # Anyone can block foreign aid, only the target can block a steal or an assassination
+            if handler.current_action.action_type == ActionType.foreign_aid:
+                return handler.players_after(acting_player_name)
+            return [
+                player_name
+                for player_name in handler.players_after(acting_player_name)
+                if player_name == handler.current_action_target_player_name
+            ]
+        case DecisionType.challenge_counter:
+            return handler.players_after(handler.current_counter_action_player_name)
+    return []
+
+
+def legal_moves(handler: ResistanceCoupGameHandler, decision: Decision) -> list[Any]:
+    if decision.decision_type != DecisionType.action:
+        return [False, True]
+
+    return handler.legal_actions(decision.player_name)
+
+
+def _ask(decision_type: DecisionType, players: list[str]) -> Optional[Decision]:
+    if not players:
+        return None
+    return Decision(decision_type, players[0], tuple(players[1:]))
+
+
+def _next_turn(handler: ResistanceCoupGameHandler, result: dict) -> Optional[Decision]:
+    if result["game_over"]:
+        return None
+    return Decision(DecisionType.action, handler.current_player.name)
+
+
+def _execute(handler: ResistanceCoupGameHandler) -> Optional[Decision]:
+    result = handler.execute_action(
+        handler.current_player.name,
+        handler.current_action.action_type,
+        handler.current_action_target_player_name,
+    )
+    return _next_turn(handler, result)
+
+
+def _counters(handler: ResistanceCoupGameHandler) -> Optional[Decision]:
+    if handler.current_action.can_be_countered and (
+        decision := _ask(DecisionType.counter, responders(handler, DecisionType.counter))
+    ):
+        return decision
+    return _execute(handler)
+
+
+def advance(
+    handler: ResistanceCoupGameHandler, decision: Decision, move: Any
+) -> Optional[Decision]:
+    """Apply `move` to the handler and return the next decision, None once the game is over"""
+    if decision.decision_type == DecisionType.action:
+        action_type, target_player_name = move
+        result = handler.perform_action(decision.player_name, action_type, target_player_name)
+        if result["turn_complete"]:
+            return _next_turn(handler, result)
+        if handler.current_action.can_be_challenged:
+            return _ask(DecisionType.challenge, responders(handler, DecisionType.challenge))
+        return _counters(handler)
+
+    if not move:
+        # Declined, ask the next player or move on
+        if decision.waiting:
+            return _ask(decision.decision_type, list(decision.waiting))
+        if decision.decision_type == DecisionType.challenge:
+            return _counters(handler)
+        return _execute(handler)
+
+    match decision.decision_type:
+        case DecisionType.challenge:
+            return _next_turn(handler, handler.challenge_action(decision.player_name))
+        case DecisionType.counter:
+            handler.counter_action(decision.player_name)
+            if decision := _ask(
+                DecisionType.challenge_counter,
+                responders(handler, DecisionType.challenge_counter),
+            ):
+                return decision
+            return _execute(handler)
+        case DecisionType.challenge_counter:
+            return _next_turn(handler, handler.challenge_counter_action(decision.player_name))
+
+
+def bot_move(bot: PlayerBot, handler: ResistanceCoupGameHandler, decision: Decision) -> Any:
+    action_type = handler.current_action.action_type if handler.current_action else None
+    match decision.decision_type:
+        case DecisionType.action:
+            return bot.choose_action(handler)
+        case DecisionType.challenge:
+            return bot.should_challenge(
+                handler,
+                handler.current_player.name,
+                action_type,
+                handler.current_action_target_player_name,
+            )
+        case DecisionType.counter:
+            return bot.should_counter(handler, handler.current_player.name, action_type)
+        case DecisionType.challenge_counter:
+            return bot.should_challenge_counter(
+                handler, handler.current_counter_action_player_name, action_type
+            )
+
+
+class _Node:
+    __slots__ = ("player_name", "children", "visits", "reward", "availability")
+
+    def __init__(self, player_name: Optional[str]):
+        # The player that took the move leading to this node, the rewards are theirs
+        self.player_name = player_name
+        self.children: dict[Any, _Node] = {}
+        self.visits = 0
+        self.reward = 0.0
+        self.availability = 1
+
+
+class _Search:
+    """
+    Single observer ISMCTS on a private handler, reused for every decision.
+
+    Only the decisions of the searching player are part of the tree. The other players decide as
+    the bot of their strategy would with the cards they were dealt, so they can't play around
+    the searching player's hidden cards.
+    """
+
+    def __init__(
+        self,
+        number_of_players: int,
+        strategies: list[PlayerStrategy],
+        table_size: Optional[int] = None,
+    ):
+        # Simulated games don't narrate
+        self.handler = ResistanceCoupGameHandler(number_of_players, narration=NullSink())
+        self.seats = {player.name: seat for seat, player in enumerate(self.handler.players)}
+        self.rng = random.Random()
+        self.models = {
+            player.name: create_player_bot(
+                player.name,
+                ROLLOUT_STRATEGY if strategy == PlayerStrategy.ismcts else strategy,
+                self.rng,
+            )
+            for player, strategy in zip(self.handler.players, strategies)
+        }
+        # Rewards of positions already rolled out, kept for every decision and game of the search
+        self.table = TranspositionTable(table_size) if table_size else None
+
+    def _determinize(self, root: GameSnapshot, seat: int) -> GameSnapshot:
+        """Deal the cards we can't see at random, consistent with what we can see"""
+        # The deck and the hands of the others, however many decks the game is played with
+        unknown = Counter(dict(zip(CARD_TYPES, root.deck)))
+        for index, player in enumerate(root.players):
+            if index != seat:
+                unknown.update(player.cards)
+        hidden = list(unknown.elements())
+        self.rng.shuffle(hidden)
+
+        players = []
+        for index, player in enumerate(root.players):
+            if index == seat or not player.cards:
+                players.append(player)
+            else:
+                cards = tuple(hidden.pop() for _ in player.cards)
+                players.append(PlayerSnapshot(player.coins, cards, player.is_active))
+
+        deck = Counter(hidden)
+        return root._replace(
+            players=tuple(players), deck=tuple(deck[card_type] for card_type in CARD_TYPES)
+        )
+
+    def _rewards(self) -> dict[str, float]:
+        active_players = [player for player in self.handler.players if player.is_active]
+        if len(active_players) == 1:
+            return {active_players[0].name: 1.0}
+
+        # Unfinished simulation, share the win by influence and coins
+        scores = {player.name: len(player.cards) + player.coins / 7 for player in active_players}
+        total = sum(scores.values())
+        return {player_name: score / total for player_name, score in scores.items()}
+
+    def _rollout(self, decision: Optional[Decision], rollout_turns: int) -> dict[str, float]:
+        turn_limit = self.handler.turn + rollout_turns
+        while decision is not None and self.handler.turn < turn_limit:
+            bot = self.models[decision.player_name]
+            decision = advance(self.handler, decision, bot_move(bot, self.handler, decision))
+        return self._rewards()
+
+    def _evaluate(self, decision: Optional[Decision], rollout_turns: int) -> dict[str, float]:
+        if self.table is None:
+            return self._rollout(decision, rollout_turns)
+
+        key = self._position_key(decision)
+        if (rewards := self.table.get(key)) is None:
+            rewards = self._rollout(decision, rollout_turns)
+            self.table.put(key, rewards)
+        return rewards
+
+    def _position_key(self, decision: Optional[Decision]) -> int:
+        """The hash of the game state and the pending decision, the same in every process"""
+        key = self.handler.zobrist_hash
+        if decision is not None:
+            key ^= zobrist_key(Feature.decision, 0, decision.decision_type)
+            key ^= zobrist_key(Feature.decision_player, 0, self.seats[decision.player_name])
+            for position, player_name in enumerate(decision.waiting):
+                key ^= zobrist_key(Feature.waiting_player, position, self.seats[player_name])
+        return key
+
+    def _ucb(self, node: _Node, exploration: float) -> float:
+        return node.reward / node.visits + exploration * math.sqrt(
+            math.log(node.availability) / node.visits
+        )
+
+    def run(
+        self,
+        root: GameSnapshot,
+        decision: Decision,
+        seed: int,
+        time_budget: Optional[float],
+        max_iterations: Optional[int],
+        exploration: float,
+        rollout_turns: int,
+    ) -> dict[Any, tuple[int, float]]:
+        """Search from `root`, returning the visits and total reward of every root move"""
+        self.rng.seed(seed)
+        # Only to seed the handler's shuffles, the game itself is restored below
+        self.handler.initialize_game(seed)
+        seat = [player.name for player in self.handler.players].index(decision.player_name)
+        deadline = time.perf_counter() + time_budget if time_budget is not None else math.inf
+
+        tree = _Node(None)
+        iterations = 0
+        while (max_iterations is None or iterations < max_iterations) and (
+            time.perf_counter() < deadline
+        ):
+            iterations += 1
+            self.handler.restore(self._determinize(root, seat))
+
+            node, next_decision, path = tree, decision, []
+            while next_decision is not None:
+                if next_decision.player_name != decision.player_name:
+                    model = self.models[next_decision.player_name]
+                    move = bot_move(model, self.handler, next_decision)
+                    next_decision = advance(self.handler, next_decision, move)
+                    continue
+
+                moves = legal_moves(self.handler, next_decision)
+                untried = [move for move in moves if move not in node.children]
+                for move in moves:
+                    if move in node.children:
+                        node.children[move].availability += 1
+
+                if untried:
+                    move = self.rng.choice(untried)
+                    node.children[move] = _Node(next_decision.player_name)
+                else:
+                    move = max(moves, key=lambda move: self._ucb(node.children[move], exploration))
+
+                node = node.children[move]
+                path.append(node)
+                next_decision = advance(self.handler, next_decision, move)
+                if untried:
+                    break
+
+            rewards = self._evaluate(next_decision, rollout_turns)
+            for node in path:
+                node.visits += 1
+                node.reward += rewards.get(node.player_name, 0.0)
+
+        return {move: (child.visits, child.reward) for move, child in tree.children.items()}
+
+
+# Worker processes of a root parallel search keep their searches around between decisions
+_worker_searches: dict[tuple, _Search] = {}
+
+
+def _run_worker_search(args: tuple) -> dict[Any, tuple[int, float]]:
+    number_of_players, strategies, table_size, *search_args = args
+    key = (number_of_players, tuple(strategies), table_size)
+    if key not in _worker_searches:
+        _worker_searches[key] = _Search(number_of_players, strategies, table_size)
+    return _worker_searches[key].run(*search_args)
+
+
+class ISMCTSBot(PlayerBot):
+    """
+    A player that searches the game with information set Monte Carlo tree search.
+
+    Every iteration deals the cards it can't see at random, consistent with its own hand and the
+    cards already lost, and plays the game forward through the handler. Each decision searches
+    for `time_budget` seconds or `max_iterations` iterations, whichever runs out first. With more
+    than one worker, independent searches run in parallel processes and their root statistics
+    are added up. With a `table_size`, positions reached again, by the hash of the game state and
+    the pending decision, reuse the rewards of their first rollout from a transposition table.
+    """
+
+    strategy = PlayerStrategy.ismcts
+
+    def __init__(
+        self,
+        player_name: str,
+        rng: Optional[random.Random] = None,
+        time_budget: Optional[float] = DEFAULT_TIME_BUDGET,
+        max_iterations: Optional[int] = None,
+        workers: int = 1,
+        exploration: float = DEFAULT_EXPLORATION,
+        rollout_turns: int = DEFAULT_ROLLOUT_TURNS,
+        table_size: Optional[int] = None,
+    ):
+        super().__init__(player_name, rng)
+        if time_budget is None and max_iterations is None:
+            raise Exception("ISMCTS needs a time budget or a maximum number of iterations.")
+
+        self.time_budget = time_budget
+        self.max_iterations = max_iterations
+        self.workers = workers
+        self.exploration = exploration
+        self.rollout_turns = rollout_turns
+        self.table_size = table_size
+
+        self._search: Optional[_Search] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def search(self, handler: ResistanceCoupGameHandler, decision: Decision) -> Any:
+        moves = legal_moves(handler, decision)
+        if len(moves) == 1:
+            return moves[0]
+
+        strategies = [player.strategy for player in handler.players]
+        search_args = (
+            handler.snapshot(include_rng=False),
+            decision,
+            self.time_budget,
+            self.max_iterations,
+            self.exploration,
+            self.rollout_turns,
+        )
+        seeds = [self.rng.getrandbits(64) for _ in range(self.workers)]
+
+        if self.workers == 1:
+            if self._search is None or len(self._search.handler.players) != len(strategies):
+                self._search = _Search(len(strategies), strategies, self.table_size)
+            root, decision, *options = search_args
+            root_stats = [self._search.run(root, decision, seeds[0], *options)]
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.workers)
+            root_stats = list(
+                self._executor.map(
+                    _run_worker_search,
+                    [
+                        (
+                            len(strategies),
+                            strategies,
+                            self.table_size,
+                            search_args[0],
+                            search_args[1],
+                            seed,
+                        )
+                        + search_args[2:]
+                        for seed in seeds
+                    ],
+                )
+            )
+
+        visits: Counter = Counter()
+        for stats in root_stats:
+            for move, (move_visits, _) in stats.items():
+                visits[move] += move_visits
+        # The most visited move, or any legal one if the budget didn't allow a single iteration
+        return max(moves, key=lambda move: visits[move])
+
+    def _choose_action(
+        self, handler: ResistanceCoupGameHandler
+    ) -> tuple[ActionType, Optional[str]]:
+        return self.search(handler, Decision(DecisionType.action, self.player_name))
+
+    def _respond(self, handler: ResistanceCoupGameHandler, decision_type: DecisionType) -> bool:
+        players = responders(handler, decision_type)
+        after = players.index(self.player_name) + 1 if self.player_name in players else 0
+        waiting = players[after:] if after else []
+        return self.search(handler, Decision(decision_type, self.player_name, tuple(waiting)))
+
+    def should_challenge(self, handler, acting_player_name, action_type, target_player_name):
+        return self._respond(handler, DecisionType.challenge)
+
+    def should_counter(self, handler, acting_player_name, action_type):
+        return self._respond(handler, DecisionType.counter)
+
+    def should_challenge_counter(self, handler, countering_player_name, action_type):
+        return self._respond(handler, DecisionType.challenge_counter)
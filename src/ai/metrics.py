@@ -0,0 +1,298 @@
+import csv
+import functools
+import threading
+import time
+from collections import defaultdict
+from enum import Enum
+from typing import Callable, NamedTuple, Optional
+
+from autogen import ConversableAgent, GroupChat
+
+from src.handler.game_handler import ResistanceCoupGameHandler
+
+
+class SampleKind(str, Enum):
+    # A call to one of the handler's public actions by an agent
+    handler_call = "handler_call"
+    model_call = "model_call"
+    speaker_selection = "speaker_selection"
+
+
+class Sample(NamedTuple):
+    game: Optional[int]
+    turn: int
+    phase: str
+    strategy: str
+    kind: SampleKind
+    # The handler function, or the agent calling the model
+    name: str
+    duration: float
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    # The message of the exception an invalid action raised
+    error: Optional[str] = None
+
+
+TURN_COLUMNS = [
+    "game",
+    "turn",
+    "strategy",
+    "handler_calls",
+    "handler_seconds",
+    "invalid_actions",
+    "model_calls",
+    "model_seconds",
+    "prompt_tokens",
+    "completion_tokens",
+    "speaker_selections",
+    "speaker_selection_seconds",
+]
+
+
+class GameMetrics:
+    """
+    Timings, token usage and invalid actions of the games played by agents.
+
+    Every handler call, model call and speaker selection is recorded as a sample labelled with the
+    game (its seed), the turn, the turn phase and the strategy of the player whose turn it is. The
+    samples are aggregated per turn for CSV, and per kind, name, strategy and phase for Prometheus.
+    """
+
+    def __init__(self):
+        self.samples: list[Sample] = []
+        # Model calls of concurrent games run in executor threads
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    @staticmethod
+    def labels(handler: ResistanceCoupGameHandler) -> dict:
+        return {
+            "game": handler.seed,
+            "turn": handler.turn,
+            "phase": handler.turn_phase.value,
+            "strategy": handler.current_player.strategy.value,
+        }
+
+    def record(self, sample: Sample) -> None:
+        with self._lock:
+            self.samples.append(sample)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.samples.clear()
+
+    def turns(self) -> list[dict]:
+        """The samples added up per turn of every game"""
+        turns: dict[tuple, dict] = {}
+        for sample in self.samples:
+            key = (sample.game, sample.turn)
+            if key not in turns:
+                turns[key] = {column: 0 for column in TURN_COLUMNS}
+                turns[key].update(game=sample.game, turn=sample.turn, strategy=sample.strategy)
+
+            row = turns[key]
+            match sample.kind:
+                case SampleKind.handler_call:
+                    row["handler_calls"] += 1
+                    row["handler_seconds"] += sample.duration
+                    row["invalid_actions"] += sample.error is not None
+                case SampleKind.model_call:
+                    row["model_calls"] += 1
+                    row["model_seconds"] += sample.duration
+                    row["prompt_tokens"] += sample.prompt_tokens
+                    row["completion_tokens"] += sample.completion_tokens
+                case SampleKind.speaker_selection:
+                    row["speaker_selections"] += 1
+                    row["speaker_selection_seconds"] += sample.duration
+        return list(turns.values())
+
+    def summary(self) -> dict:
+        turns = self.turns()
+        model_calls = [sample for sample in self.samples if sample.kind == SampleKind.model_call]
+
+        by_strategy: dict[str, dict] = defaultdict(
+            lambda: {"turns": 0, "model_calls": 0, "model_seconds": 0.0, "tokens": 0}
+        )
+        for row in turns:
+            strategy = by_strategy[row["strategy"]]
+            strategy["turns"] += 1
+            strategy["model_calls"] += row["model_calls"]
+            strategy["model_seconds"] += row["model_seconds"]
+            strategy["tokens"] += row["prompt_tokens"] + row["completion_tokens"]
+
+        model_seconds_by_phase: dict[str, float] = defaultdict(float)
+        for sample in model_calls:
+            model_seconds_by_phase[sample.phase] += sample.duration
+
+        return {
+            "games": len({row["game"] for row in turns}),
+            "turns": len(turns),
+            "handler_calls": sum(row["handler_calls"] for row in turns),
+            "invalid_actions": sum(row["invalid_actions"] for row in turns),
+            "model_calls": len(model_calls),
+            "model_calls_per_turn": len(model_calls) / len(turns) if turns else 0.0,
+            "model_seconds": sum(row["model_seconds"] for row in turns),
+            "prompt_tokens": sum(row["prompt_tokens"] for row in turns),
+            "completion_tokens": sum(row["completion_tokens"] for row in turns),
+            "speaker_selection_seconds": sum(row["speaker_selection_seconds"] for row in turns),
+            "by_strategy": dict(by_strategy),
+            "model_seconds_by_phase": dict(model_seconds_by_phase),
+        }
+
+    def to_prometheus(self) -> str:
+        """The samples in the Prometheus text exposition format"""
+        counts: dict[tuple, int] = defaultdict(int)
+        seconds: dict[tuple, float] = defaultdict(float)
+        tokens: dict[tuple, int] = defaultdict(int)
+        errors: dict[tuple, int] = defaultdict(int)
+        for sample in self.samples:
+            labels = (sample.kind.value, sample.name, sample.strategy, sample.phase)
+            counts[labels] += 1
+            seconds[labels] += sample.duration
+            if sample.kind == SampleKind.model_call:
+                tokens[labels + ("prompt",)] += sample.prompt_tokens
+                tokens[labels + ("completion",)] += sample.completion_tokens
+            if sample.error is not None:
+                errors[labels] += 1
+
+        def line(metric: str, labels: tuple, value: float) -> str:
+            names = ["kind", "name", "strategy", "phase", "type"]
+            label_str = ",".join(f'{name}="{label}"' for name, label in zip(names, labels))
+            return f"{metric}{{{label_str}}} {value}"
+
+        lines = [
+            "# HELP coup_calls_total Handler calls, model calls and speaker selections.",
+            "# TYPE coup_calls_total counter",
+            *[line("coup_calls_total", labels, value) for labels, value in counts.items()],
+            "# HELP coup_call_seconds_total Wall time spent in the calls.",
+            "# TYPE coup_call_seconds_total counter",
+            *[line("coup_call_seconds_total", labels, value) for labels, value in seconds.items()],
+            "# HELP coup_tokens_total Prompt and completion tokens of the model calls.",
+            "# TYPE coup_tokens_total counter",
+            *[line("coup_tokens_total", labels, value) for labels, value in tokens.items()],
+            "# HELP coup_invalid_actions_total Handler calls rejected with an exception.",
+            "# TYPE coup_invalid_actions_total counter",
+            *[
+                line("coup_invalid_actions_total", labels, value)
+                for labels, value in errors.items()
+            ],
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Write the metrics per turn as CSV, or as Prometheus text when the path ends with `.prom`"""
+        if path.endswith(".prom"):
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(self.to_prometheus())
+            return
+
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=TURN_COLUMNS)
+            writer.writeheader()
+            writer.writerows(self.turns())
+
+
+def timed_handler_call(
+    function: Callable, name: str, handler: ResistanceCoupGameHandler, metrics: GameMetrics
+) -> Callable:
+    """`function` of the handler, recording every call as a handler call sample"""
+
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        # Label the call with the turn it was made in, before the call ends the turn
+        labels = metrics.labels(handler)
+        error = None
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            metrics.record(
+                Sample(
+                    **labels,
+                    kind=SampleKind.handler_call,
+                    name=name,
+                    duration=duration,
+                    error=error,
+                )
+            )
+
+    return timed
+
+
+def instrument_agent(
+    agent: ConversableAgent, handler: ResistanceCoupGameHandler, metrics: GameMetrics
+) -> None:
+    """Record the handler calls and model calls of an agent"""
+    for name, function in agent.function_map.items():
+        agent.function_map[name] = timed_handler_call(function, name, handler, metrics)
+
+    client = getattr(agent, "client", None)
+    if client is None:
+        return
+
+    create = client.create
+
+    def timed_create(**config):
+        labels = metrics.labels(handler)
+        start = time.perf_counter()
+        response = create(**config)
+        usage = getattr(response, "usage", None)
+        metrics.record(
+            Sample(
+                **labels,
+                kind=SampleKind.model_call,
+                name=agent.name,
+                duration=time.perf_counter() - start,
+                prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+                completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+            )
+        )
+        return response
+
+    # Replaces the method of this client only, install it after the response cache
+    client.create = timed_create
+
+
+def instrument_group_chat(
+    group_chat: GroupChat, handler: ResistanceCoupGameHandler, metrics: GameMetrics
+) -> None:
+    """Record the time spent selecting the next speaker, including the model call if one is needed"""
+    select_speaker = group_chat.select_speaker
+    a_select_speaker = group_chat.a_select_speaker
+
+    def timed_select_speaker(*args, **kwargs):
+        labels = metrics.labels(handler)
+        start = time.perf_counter()
+        speaker = select_speaker(*args, **kwargs)
+        metrics.record(
+            Sample(
+                **labels,
+                kind=SampleKind.speaker_selection,
+                name="select_speaker",
+                duration=time.perf_counter() - start,
+            )
+        )
+        return speaker
+
+    async def a_timed_select_speaker(*args, **kwargs):
+        labels = metrics.labels(handler)
+        start = time.perf_counter()
+        speaker = await a_select_speaker(*args, **kwargs)
+        metrics.record(
+            Sample(
+                **labels,
+                kind=SampleKind.speaker_selection,
+                name="select_speaker",
+                duration=time.perf_counter() - start,
+            )
+        )
+        return speaker
+
+    group_chat.select_speaker = timed_select_speaker
+    group_chat.a_select_speaker = a_timed_select_speaker
@@ -0,0 +1,215 @@
+import functools
+
+from src.models.action import ActionType
+from src.models.card import Card
+from src.models.player import PlayerStrategy
+
+ACTION_NAMES: list[ActionType] = [
+    ActionType.income,
+    ActionType.foreign_aid,
+    ActionType.tax,
+    ActionType.coup,
+    ActionType.steal,
+    ActionType.assassinate,
+    ActionType.exchange,
+]
+
+# Properties of the function schemas that hold the name of the player calling them
+PLAYER_NAME_PROPERTIES = ["player_name", "countering_player_name", "challenging_player_name"]
+# Properties narrowed to the legal actions of a player before each model call
+ACTION_PROPERTIES = ["action_name", "target_player_name"]
+
+STRATEGY_INSTRUCTIONS: dict[PlayerStrategy, str] = {
+    PlayerStrategy.aggressive: (
+        "Your strategy is to play aggressive. Try to assassinate, coup, or steal as soon as you can. "
+        "Don't be scared to bluff to get more coins."
+        "If you keep getting blocked, rather get income on your next turn, before playing aggressive again. "
+        "Always challenge other players if you don't think they have the card they claim to have."
+    ),
+    PlayerStrategy.conservative: (
+        "Your strategy is to play conservative. "
+        "Build up your money, avoid bluffing, and wait for the opportunity to perform a coup."
+        "Don't be too reckless with challenging other players after an action or counteraction, but feel free"
+        "to do it if you are pretty sure."
+    ),
+    PlayerStrategy.coup_freak: (
+        "Your strategy is to perform a coup as soon as you have enough coins, otherwise gather money as "
+        "fast as possible by taking foreign aid or tax. However be careful not to bluff too much, otherwise "
+        "you might lose your cards and be eliminated."
+    ),
+}
+
+PLAYER_INSTRUCTIONS = """Your name is {name} and you are a player in the game The Resistance: Coup. 
+        You are playing against {other_player_names}. 
+        
+        You start with a {first_card} card and a {second_card} card, as well as 2 coins.
+        
+        On your turn you have to pick a valid action based on your current available cards and coins. 
+        Also provide your own name to the function. 
+        
+        Never announce what cards you have, they are secret.
+        
+        If your action was invalid, you have to pick another action. However feel free to bluff and perform an 
+        action even if you don't have the card, but be careful because it could be challenged.
+        
+        You can counter another player's action if action_can_be_countered is "True", 
+        after they tried to perform their action.
+        
+        Feel free to challenge another player's action if action_can_be_challenged is "True", 
+        after they tried to perform their action, and if you think they are bluffing, by using the
+        challenge_action function.
+        
+        Feel free to challenge another player's counter-action if you think they are bluffing, by using the
+        challenge_counter_action function.
+        
+        If no one counters or challenges your action, you have the call "execute_action" to complete the turn. 
+        If after perform_action you find that turn_complete is "True", you don't have to execute your action.
+                
+        You also chit-chat with your opponent when you communicate an action to light up the mood.
+
+        You should ensure both you and your opponents are making valid actions. 
+        Also that everyone is only taking actions when it is their turn.
+        
+        {strategy}
+        
+        Don't hoard up coins, but rather try the assassinate or coup actions when you have a chance. 
+
+        Do not apologize for making invalid actions.
+        
+        If the game is over, stop playing."""
+
+
+def player_instructions(
+    name: str, other_player_names: list[str], cards: list[Card], strategy: PlayerStrategy
+) -> str:
+    return PLAYER_INSTRUCTIONS.format(
+        name=name,
+        other_player_names=", ".join(other_player_names),
+        first_card=str(cards[0]),
+        second_card=str(cards[1]),
+        strategy=STRATEGY_INSTRUCTIONS.get(
+            strategy, STRATEGY_INSTRUCTIONS[PlayerStrategy.coup_freak]
+        ),
+    )
+
+
+@functools.cache
+def _player_functions() -> list[dict]:
+    """The function schemas of a player, without the player's name"""
+    return [
+        {
+            "name": "perform_action",
+            "description": "Perform a valid action for Resistance: Coup",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "player_name": {
+                        "type": "string",
+                        "description": "Send your own name.",
+                    },
+                    "action_name": {
+                        "type": "string",
+                        "description": "The name of the action to perform.",
+                        "enum": list(ACTION_NAMES),
+                    },
+                    "target_player_name": {
+                        "type": "string",
+                        "description": "The player name to target.",
+                    },
+                },
+                "required": ["player_name", "action_name"],
+            },
+        },
+        {
+            "name": "counter_action",
+            "description": "Counter the previous action that was performed",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "countering_player_name": {
+                        "type": "string",
+                        "description": "Send your own name.",
+                    },
+                },
+                "required": ["countering_player_name"],
+            },
+        },
+        {
+            "name": "challenge_action",
+            "description": "Challenge the previous action that was performed by another player "
+            "if you think that the player that performed the action does not have the required card.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "challenging_player_name": {
+                        "type": "string",
+                        "description": "Send your own name.",
+                    },
+                },
+                "required": ["challenging_player_name"],
+            },
+        },
+        {
+            "name": "challenge_counter_action",
+            "description": "Challenge the previous counter-action that was performed by another player "
+            "if you think that the player that performed the counter-action does not "
+            "have the required card.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "challenging_player_name": {
+                        "type": "string",
+                        "description": "Send your own name.",
+                    },
+                },
+                "required": ["challenging_player_name"],
+            },
+        },
+        {
+            "name": "execute_action",
+            "description": "Execute the action that was performed and complete the turn.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "player_name": {
+                        "type": "string",
+                        "description": "Send your own name.",
+                    },
+                    "action_name": {
+                        "type": "string",
+                        "description": "The name of the action to perform.",
+                        "enum": list(ACTION_NAMES),
+                    },
+                    "target_player_name": {
+                        "type": "string",
+                        "description": "The player name to target.",
+                    },
+                },
+                "required": ["player_name", "action_name"],
+            },
+        },
+    ]
+
+
+def player_functions(name: str) -> list[dict]:
+    """
+    The function schemas of the player `name`.
+
+    The schemas are built once. Only the properties holding the player's name, and the ones that are
+    narrowed to the legal actions during the game, are copied for each player, everything else is
+    shared by all players.
+    """
+    functions = []
+    for function in _player_functions():
+        properties = {
+            property_name: {**schema, "enum": [name]}
+            if property_name in PLAYER_NAME_PROPERTIES
+            else {**schema}
+            if property_name in ACTION_PROPERTIES
+            else schema
+            for property_name, schema in function["parameters"]["properties"].items()
+        }
+        functions.append(
+            {**function, "parameters": {**function["parameters"], "properties": properties}}
+        )
+    return functions
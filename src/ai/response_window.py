@@ -0,0 +1,113 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
+
+from autogen import Agent, ConversableAgent
+
+from src.ai.metrics import GameMetrics, timed_handler_call
+from src.handler.game_handler import ResistanceCoupGameHandler, ResponseType, TurnPhase
+
+RESPONSE_FUNCTIONS: dict[str, ResponseType] = {
+    "counter_action": ResponseType.counter,
+    "challenge_action": ResponseType.challenge,
+    "challenge_counter_action": ResponseType.challenge,
+}
+
+
+def _response_of(
+    handler: ResistanceCoupGameHandler, player_name: str, reply: Union[str, dict, None]
+) -> ResponseType:
+    """The response a player's reply amounts to, anything but a legal counter or challenge passes"""
+    function_call = reply.get("function_call") if isinstance(reply, dict) else None
+    response = RESPONSE_FUNCTIONS.get(function_call["name"]) if function_call else None
+    if response is None or response not in handler.legal_responses(player_name):
+        return ResponseType.pass_
+    return response
+
+
+def _describe(handler: ResistanceCoupGameHandler, responses: dict[str, ResponseType]) -> str:
+    if handler.turn_phase == TurnPhase.counter_response:
+        responding_to = f"{handler.current_counter_action_player_name}'s counter"
+    else:
+        responding_to = (
+            f"{handler.current_player.name}'s {handler.current_action.action_type.value}"
+        )
+    responses_str = ", ".join(
+        f"{player_name} {response.value}" for player_name, response in responses.items()
+    )
+    return f"Responses to {responding_to}: {responses_str}."
+
+
+def enable_response_window(
+    game_master: ConversableAgent,
+    players: list[ConversableAgent],
+    handler: ResistanceCoupGameHandler,
+    metrics: Optional[GameMetrics] = None,
+) -> None:
+    """
+    Let the game master ask every eligible player for their response to an action at once.
+
+    Instead of the group chat polling the players one at a time, all players that may counter or
+    challenge are asked in parallel, and the handler resolves their responses with a fixed
+    priority. A response window costs a single round trip to the model, whatever the number of
+    players. The group chat has to hand the response phases to the game master.
+    """
+    agents = {player.name: player for player in players}
+    # Challenges and counters of a window don't go through the function map of an agent
+    resolve_responses = handler.resolve_responses
+    if metrics is not None:
+        resolve_responses = timed_handler_call(
+            resolve_responses, "resolve_responses", handler, metrics
+        )
+
+    def responders() -> list[ConversableAgent]:
+        return [
+            agents[player_name]
+            for player_name in handler.get_eligible_responders()
+            if player_name in agents
+        ]
+
+    def resolve(replies: dict[str, Union[str, dict, None]]) -> str:
+        responses = {
+            player_name: _response_of(handler, player_name, reply)
+            for player_name, reply in replies.items()
+        }
+        # Describe the window before resolving it ends the turn
+        description = _describe(handler, responses)
+        result = resolve_responses(responses)
+        return f"{description}\nResult: {json.dumps(result)}"
+
+    def response_window_reply(
+        recipient: ConversableAgent,
+        messages: Optional[list[dict]] = None,
+        sender: Optional[Agent] = None,
+        config: Optional[dict] = None,
+    ):
+        if handler.turn_phase not in [TurnPhase.action_response, TurnPhase.counter_response]:
+            return False, None
+
+        players_to_ask = responders()
+        with ThreadPoolExecutor(max_workers=max(len(players_to_ask), 1)) as executor:
+            replies = list(
+                executor.map(lambda player: player.generate_reply(sender=sender), players_to_ask)
+            )
+        return True, resolve({player.name: reply for player, reply in zip(players_to_ask, replies)})
+
+    async def a_response_window_reply(
+        recipient: ConversableAgent,
+        messages: Optional[list[dict]] = None,
+        sender: Optional[Agent] = None,
+        config: Optional[dict] = None,
+    ):
+        if handler.turn_phase not in [TurnPhase.action_response, TurnPhase.counter_response]:
+            return False, None
+
+        players_to_ask = responders()
+        replies = await asyncio.gather(
+            *[player.a_generate_reply(sender=sender) for player in players_to_ask]
+        )
+        return True, resolve({player.name: reply for player, reply in zip(players_to_ask, replies)})
+
+    game_master.register_reply([Agent, None], response_window_reply)
+    game_master.register_reply([Agent, None], a_response_window_reply)
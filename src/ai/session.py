@@ -0,0 +1,161 @@
+import random
+from typing import Optional
+
+from autogen import AssistantAgent, ConversableAgent, GroupChatManager, UserProxyAgent
+
+from src.ai.agents import (
+    create_bot_player_agent,
+    create_game_master_agent,
+    create_player_agent,
+    create_user_proxy,
+    reset_player_agent,
+)
+from src.ai.broker import DecisionBroker, enable_decision_broker
+from src.ai.cache import ResponseCache, enable_response_cache
+from src.ai.context import enable_context_window
+from src.ai.ismcts import ISMCTSBot
+from src.ai.metrics import GameMetrics, instrument_agent, instrument_group_chat
+from src.ai.response_window import enable_response_window
+from src.ai.speaker import StateDrivenGroupChat
+from src.handler.event_log import EventLog
+from src.handler.game_handler import ResistanceCoupGameHandler
+from src.models.player import Player, PlayerStrategy
+
+TASK = """
+    Play a game of The Resistance: Coup until there is a single winner.
+    """
+
+
+class GameSession:
+    """A game handler together with the agents and group chat playing the game"""
+
+    def __init__(
+        self,
+        number_of_players: int,
+        config_list: list,
+        response_cache: Optional[ResponseCache] = None,
+        seed: Optional[int] = None,
+        max_round: int = 1000,
+        context_window: Optional[int] = None,
+        event_log: Optional[EventLog] = None,
+        strategies: Optional[list[PlayerStrategy]] = None,
+        metrics: Optional[GameMetrics] = None,
+        response_window: bool = False,
+        broker: Optional[DecisionBroker] = None,
+    ):
+        self.handler = ResistanceCoupGameHandler(number_of_players, seed, event_log, strategies)
+
+        # AI players, seats with the ISMCTS strategy are played by a search instead of a model
+        self._bots_rng = random.Random(seed)
+        self.players: list[ConversableAgent] = [
+            create_bot_player_agent(ISMCTSBot(player.name, self._bots_rng), self.handler)
+            if player.strategy == PlayerStrategy.ismcts
+            else create_player_agent(
+                name=player.name,
+                other_player_names=[
+                    other_player.name
+                    for other_player in self.handler.players
+                    if other_player.name != player.name
+                ],
+                cards=player.cards,
+                strategy=player.strategy,
+                handler=self.handler,
+                config_list=config_list,
+                response_cache=response_cache,
+            )
+            for player in self.handler.players
+        ]
+
+        # Game master
+        self.game_master: AssistantAgent = create_game_master_agent(
+            self.handler, config_list, response_cache
+        )
+
+        # User proxy
+        self.user_proxy: UserProxyAgent = create_user_proxy(config_list, response_cache)
+
+        # Bound the prompt size, older messages are replaced by a snapshot of the game
+        if context_window:
+            for agent in [self.user_proxy, self.game_master, *self.players]:
+                enable_context_window(agent, self.handler, window=context_window)
+
+        # Ask all players for their response to an action at once, instead of one at a time
+        if response_window:
+            enable_response_window(self.game_master, self.players, self.handler, metrics)
+
+        # Define group chat, whose turn it is follows from the state of the game
+        self.group_chat = StateDrivenGroupChat(
+            agents=[self.user_proxy, self.game_master, *self.players],
+            messages=[],
+            admin_name=self.game_master.name,
+            max_round=max_round,
+            handler=self.handler,
+            response_window=response_window,
+        )
+        # The manager plays a copy of the group chat, so the group chat is instrumented before
+        if metrics is not None:
+            instrument_group_chat(self.group_chat, self.handler, metrics)
+        self.manager = GroupChatManager(
+            groupchat=self.group_chat, llm_config={"config_list": config_list}
+        )
+        if response_cache:
+            enable_response_cache(self.manager, response_cache)
+
+        # Batch the model requests with the ones of other games
+        if broker is not None:
+            for agent in [self.user_proxy, self.game_master, *self.players, self.manager]:
+                enable_decision_broker(agent, broker)
+
+        # Time the handler and model calls, after the response cache so cache hits are timed as well
+        if metrics is not None:
+            for agent in [self.user_proxy, self.game_master, *self.players, self.manager]:
+                instrument_agent(agent, self.handler, metrics)
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        """
+        Start a new game with the same agents.
+
+        Building the agents and their model clients is a large part of starting a game, a reset only
+        deals again, clears the conversations and gives the players their new cards.
+        """
+        self.handler.initialize_game(seed)
+        self._bots_rng.seed(seed)
+
+        for agent, player in zip(self.players, self.handler.players):
+            if player.strategy == PlayerStrategy.ismcts:
+                agent.reset()
+                continue
+            reset_player_agent(
+                agent,
+                other_player_names=[
+                    other_player.name
+                    for other_player in self.handler.players
+                    if other_player.name != player.name
+                ],
+                cards=player.cards,
+                strategy=player.strategy,
+            )
+
+        self.game_master.reset()
+        self.user_proxy.reset()
+        self.group_chat.reset()
+        self.manager.reset()
+
+    @property
+    def winner(self) -> Optional[Player]:
+        active_players = [player for player in self.handler.players if player.is_active]
+        return active_players[0] if len(active_players) == 1 else None
+
+    def play(self) -> None:
+        self.game_master.initiate_chat(self.manager, message=TASK)
+
+    async def a_play(self) -> None:
+        # autogen also runs the sync termination check in async chats, which counts every reply twice
+        # against max_consecutive_auto_reply and ends long games early
+        for agent in [self.user_proxy, self.game_master, *self.players, self.manager]:
+            agent._reply_func_list = [
+                reply
+                for reply in agent._reply_func_list
+                if reply["reply_func"] != ConversableAgent.check_termination_and_human_reply
+            ]
+        await self.game_master.a_initiate_chat(self.manager, message=TASK)
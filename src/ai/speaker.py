@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from autogen import Agent, GroupChat
+
+from src.handler.game_handler import ResistanceCoupGameHandler, TurnPhase
+
+
+@dataclass
+class StateDrivenGroupChat(GroupChat):
+    """
+    A group chat that picks the next speaker from the state of the game instead of asking the model.
+
+    Whose turn it is follows from the handler: the current player acts, function calls are executed
+    by the player that made them and the game master wraps up the game. Only when several players
+    may respond to an action or counter-action is the model asked, and then only to choose between
+    those players.
+    """
+
+    handler: Optional[ResistanceCoupGameHandler] = None
+    # The game master asks all responders at once, see enable_response_window
+    response_window: bool = False
+
+    def _agent_by_name(self, name: Optional[str]) -> Optional[Agent]:
+        return next((agent for agent in self.agents if agent.name == name), None)
+
+    def _prepare_and_select_agents(
+        self, last_speaker: Agent
+    ) -> Tuple[Optional[Agent], List[Agent]]:
+        if self.handler is None:
+            return super()._prepare_and_select_agents(last_speaker)
+
+        # Players execute their own function calls
+        if self.messages and "function_call" in self.messages[-1]:
+            if last_speaker.can_execute_function(self.messages[-1]["function_call"]["name"]):
+                return last_speaker, [last_speaker]
+            return super()._prepare_and_select_agents(last_speaker)
+
+        match self.handler.turn_phase:
+            case TurnPhase.action:
+                current_player = self._agent_by_name(self.handler.current_player.name)
+                if current_player is not None:
+                    return current_player, [current_player]
+            case TurnPhase.game_over:
+                # The game master announces the winner, after which the user proxy terminates
+                game_master = self._agent_by_name(self.admin_name)
+                if game_master is not None and last_speaker != game_master:
+                    return game_master, [game_master]
+                seated_names = {player.name for player in self.handler.players}
+                user_proxy = next(
+                    (
+                        agent
+                        for agent in self.agents
+                        if agent.name != self.admin_name and agent.name not in seated_names
+                    ),
+                    None,
+                )
+                if user_proxy is not None:
+                    return user_proxy, [user_proxy]
+            case TurnPhase.action_response | TurnPhase.counter_response if self.response_window:
+                game_master = self._agent_by_name(self.admin_name)
+                if game_master is not None:
+                    return game_master, [game_master]
+            case TurnPhase.action_response | TurnPhase.counter_response:
+                # The acting player executes, or one of the other players responds
+                player_names = [self.handler.current_player.name]
+                player_names += [
+                    player_name
+                    for player_name in self.handler.get_eligible_responders()
+                    if player_name not in player_names
+                ]
+                agents = [
+                    agent
+                    for player_name in player_names
+                    if (agent := self._agent_by_name(player_name)) is not None
+                ]
+                if len(agents) == 1:
+                    return agents[0], agents
+                if agents:
+                    return None, agents
+
+        return super()._prepare_and_select_agents(last_speaker)
@@ -0,0 +1,331 @@
+import ast
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from src.ai.prompts import STRATEGY_INSTRUCTIONS
+from src.models.action import ActionType
+from src.models.player import PlayerStrategy
+
+# The actions a strategy prefers, the first legal one is played
+ACTION_PREFERENCES: dict[PlayerStrategy, list[ActionType]] = {
+    PlayerStrategy.aggressive: [
+        ActionType.coup,
+        ActionType.assassinate,
+        ActionType.steal,
+        ActionType.tax,
+        ActionType.foreign_aid,
+        ActionType.income,
+        ActionType.exchange,
+    ],
+    PlayerStrategy.conservative: [
+        ActionType.coup,
+        ActionType.income,
+        ActionType.foreign_aid,
+        ActionType.exchange,
+    ],
+    PlayerStrategy.coup_freak: [
+        ActionType.coup,
+        ActionType.tax,
+        ActionType.foreign_aid,
+        ActionType.income,
+    ],
+}
+
+# How likely a strategy is to challenge, or counter an action it can counter
+CHALLENGE_RATES = {
+    PlayerStrategy.aggressive: 0.3,
+    PlayerStrategy.conservative: 0.05,
+    PlayerStrategy.coup_freak: 0.1,
+}
+COUNTER_RATES = {
+    PlayerStrategy.aggressive: 0.3,
+    PlayerStrategy.conservative: 0.6,
+    PlayerStrategy.coup_freak: 0.4,
+}
+
+SELECT_SPEAKER_PATTERN = re.compile(r"select the next role from (\[.*?\]) to play")
+
+
+class StubModel:
+    """
+    Answers chat completion requests of the agents like a model would, without a model.
+
+    Players answer with the function calls a simple bot of their strategy would make, which follow
+    from the request alone: the function schemas (narrowed to the legal actions when it is the
+    player's turn), the system message (which holds the strategy) and the last function calls and
+    results in the conversation. Speaker selection picks one of the offered roles, the user proxy
+    terminates the game. A `script` of messages is answered first, in order.
+    """
+
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        script: Optional[list[dict]] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+        self._rng = random.Random(seed)
+        self._script = list(script or [])
+        # Requests are answered from several threads
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.errors = 0
+
+    def delay(self) -> float:
+        with self._lock:
+            return max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            if self._rng.random() < self.error_rate:
+                self.errors += 1
+                return True
+            return False
+
+    def reply(self, request: dict) -> dict:
+        """The message the model answers with"""
+        with self._lock:
+            if self._script:
+                return self._script.pop(0)
+
+        messages = request.get("messages", [])
+        functions = request.get("functions") or [
+            tool["function"] for tool in request.get("tools", []) if tool.get("type") == "function"
+        ]
+        function_names = {function["name"] for function in functions}
+
+        if "perform_action" in function_names:
+            return self._player_reply(messages, functions)
+        if "get_game_state" in function_names:
+            return {"role": "assistant", "content": "Next player, it is your turn."}
+
+        if messages and (match := SELECT_SPEAKER_PATTERN.search(str(messages[-1].get("content")))):
+            with self._lock:
+                return {
+                    "role": "assistant",
+                    "content": self._rng.choice(ast.literal_eval(match.group(1))),
+                }
+        return {"role": "assistant", "content": "TERMINATE"}
+
+    def _strategy(self, messages: list[dict]) -> PlayerStrategy:
+        system_message = next(
+            (message["content"] for message in messages if message.get("role") == "system"), ""
+        )
+        return next(
+            (
+                strategy
+                for strategy, instructions in STRATEGY_INSTRUCTIONS.items()
+                if instructions in system_message
+            ),
+            PlayerStrategy.coup_freak,
+        )
+
+    @staticmethod
+    def _last_function_calls(messages: list[dict]) -> tuple[Optional[dict], Optional[dict], bool]:
+        """The last perform_action and counter_action arguments, and if the action is unresolved"""
+        perform_action = counter_action = None
+        unresolved = False
+        for index, message in enumerate(messages):
+            if not (function_call := message.get("function_call")):
+                continue
+            try:
+                arguments = json.loads(function_call.get("arguments") or "{}")
+            except json.JSONDecodeError:
+                continue
+
+            result = messages[index + 1].get("content") if index + 1 < len(messages) else None
+            if not result or "turn_complete" not in str(result):
+                # Rejected or not executed yet
+                continue
+
+            if function_call["name"] == "perform_action":
+                perform_action, counter_action = arguments, None
+            elif function_call["name"] == "counter_action":
+                counter_action = arguments
+            unresolved = "'turn_complete': False" in str(result)
+        return perform_action, counter_action, unresolved
+
+    def _player_reply(self, messages: list[dict], functions: list[dict]) -> dict:
+        properties = next(
+            function["parameters"]["properties"]
+            for function in functions
+            if function["name"] == "perform_action"
+        )
+        name = properties["player_name"]["enum"][0]
+        strategy = self._strategy(messages)
+
+        # The schema is only narrowed to the legal actions when it is our turn
+        action_names = properties["action_name"].get("enum", [])
+        targets = properties["target_player_name"].get("enum", [])
+        if targets or len(action_names) < len(ActionType):
+            return self._perform_action(name, strategy, action_names, targets)
+
+        perform_action, counter_action, unresolved = self._last_function_calls(messages)
+        if not unresolved or perform_action is None:
+            return {"role": "assistant", "content": "I pass."}
+
+        acting_player_name = perform_action.get("player_name")
+        action_name = perform_action.get("action_name")
+        if name == acting_player_name:
+            return self._function_call(name, "execute_action", perform_action)
+
+        with self._lock:
+            if counter_action is None:
+                if self._rng.random() < CHALLENGE_RATES[strategy]:
+                    return self._function_call(
+                        name, "challenge_action", {"challenging_player_name": name}
+                    )
+                can_counter = action_name == ActionType.foreign_aid.value or (
+                    perform_action.get("target_player_name") == name
+                    and action_name in [ActionType.steal.value, ActionType.assassinate.value]
+                )
+                if can_counter and self._rng.random() < COUNTER_RATES[strategy]:
+                    return self._function_call(
+                        name, "counter_action", {"countering_player_name": name}
+                    )
+            elif counter_action.get("countering_player_name") != name:
+                if self._rng.random() < CHALLENGE_RATES[strategy]:
+                    return self._function_call(
+                        name, "challenge_counter_action", {"challenging_player_name": name}
+                    )
+
+        return {"role": "assistant", "content": "I pass."}
+
+    def _perform_action(
+        self, name: str, strategy: PlayerStrategy, action_names: list[str], targets: list[str]
+    ) -> dict:
+        preferred = [
+            action_type.value
+            for action_type in ACTION_PREFERENCES[strategy]
+            if action_type.value in action_names
+        ]
+        with self._lock:
+            action_name = preferred[0] if preferred else self._rng.choice(action_names)
+            targeted = action_name in [
+                ActionType.coup.value,
+                ActionType.steal.value,
+                ActionType.assassinate.value,
+            ]
+            target_player_name = self._rng.choice(targets) if targeted and targets else ""
+
+        return self._function_call(
+            name,
+            "perform_action",
+            {
+                "player_name": name,
+                "action_name": action_name,
+                "target_player_name": target_player_name,
+            },
+        )
+
+    @staticmethod
+    def _function_call(name: str, function_name: str, arguments: dict) -> dict:
+        return {
+            "role": "assistant",
+            "content": f"{name} calls {function_name}.",
+            "function_call": {"name": function_name, "arguments": json.dumps(arguments)},
+        }
+
+    def completion(self, request: dict) -> dict:
+        """A complete chat completion response to `request`"""
+        message = self.reply(request)
+        finish_reason = "function_call" if message.get("function_call") else "stop"
+        if request.get("tools") and (function_call := message.pop("function_call", None)):
+            message["tool_calls"] = [
+                {"id": f"call_{uuid.uuid4().hex}", "type": "function", "function": function_call}
+            ]
+            finish_reason = "tool_calls"
+
+        # Roughly four characters per token
+        prompt_tokens = len(json.dumps(request.get("messages", []))) // 4
+        completion_tokens = len(json.dumps(message)) // 4
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def complete_batch(self, requests: list[dict]) -> list[dict]:
+        """Answers to a batch of requests, which wait for the latency once"""
+        time.sleep(self.delay())
+        return [
+            {"error": {"message": "Injected error", "type": "server_error"}}
+            if self.should_fail()
+            else self.completion(request)
+            for request in requests
+        ]
+
+
+def _request_handler(model: StubModel) -> type[BaseHTTPRequestHandler]:
+    class StubRequestHandler(BaseHTTPRequestHandler):
+        # Keep connections open, and don't hold back the body behind the headers
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _send_json(self, status: int, body: dict) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            path = self.path.rstrip("/")
+            if not path.endswith("/chat/completions") and not path.endswith("/batch"):
+                self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+
+            if path.endswith("/chat/completions/batch"):
+                self._send_json(200, {"responses": model.complete_batch(request["requests"])})
+                return
+
+            time.sleep(model.delay())
+            if model.should_fail():
+                self._send_json(
+                    model.error_status,
+                    {"error": {"message": "Injected error", "type": "server_error"}},
+                )
+                return
+
+            self._send_json(200, model.completion(request))
+
+        def log_message(self, format, *args):
+            # Hundreds of games make thousands of requests, keep the console quiet
+            pass
+
+    return StubRequestHandler
+
+
+def create_server(
+    model: StubModel, host: str = "127.0.0.1", port: int = 8000
+) -> ThreadingHTTPServer:
+    """An OpenAI compatible server answering from `model`, serve it with `serve_forever()`"""
+    server = ThreadingHTTPServer((host, port), _request_handler(model))
+    server.daemon_threads = True
+    return server
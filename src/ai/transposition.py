@@ -0,0 +1,104 @@
+from enum import Enum
+from typing import Any, Optional
+
+
+class ReplacementPolicy(str, Enum):
+    # A new entry always takes the slot
+    always = "always"
+    # A new entry only takes the slot of one with the same or a lower depth
+    depth = "depth"
+    # Every slot holds two entries: one kept by depth, and one that is always replaced
+    two_tier = "two_tier"
+
+
+class TranspositionTable:
+    """
+    A fixed size table of evaluated positions, by their Zobrist hash.
+
+    Positions reached again, through another line of play or in another game, are looked up
+    instead of evaluated again. A hash maps to a single slot, and the `policy` decides which of the
+    two entries keeps a contested slot. `depth` is how much work went into an evaluation, such as
+    the number of rollouts or the search depth behind it.
+    """
+
+    def __init__(self, size: int = 1 << 16, policy: ReplacementPolicy = ReplacementPolicy.always):
+        if size < 1:
+            raise Exception("A transposition table needs at least one slot.")
+        self.size = size
+        self.policy = ReplacementPolicy(policy)
+
+        slots = 2 * size if self.policy == ReplacementPolicy.two_tier else size
+        self._keys: list[Optional[int]] = [None] * slots
+        self._values: list[Any] = [None] * slots
+        self._depths: list[int] = [0] * slots
+
+        self.hits = 0
+        self.misses = 0
+        self.replacements = 0
+
+    def __len__(self) -> int:
+        return sum(key is not None for key in self._keys)
+
+    def _slots(self, key: int) -> tuple[int, ...]:
+        index = key % self.size
+        if self.policy == ReplacementPolicy.two_tier:
+            return 2 * index, 2 * index + 1
+        return (index,)
+
+    def get(self, key: int, min_depth: int = 0) -> Optional[Any]:
+        """The value stored for `key` with at least `min_depth`, or None"""
+        for slot in self._slots(key):
+            if self._keys[slot] == key and self._depths[slot] >= min_depth:
+                self.hits += 1
+                return self._values[slot]
+        self.misses += 1
+        return None
+
+    def put(self, key: int, value: Any, depth: int = 0) -> bool:
+        """Store `value` for `key`, returns whether the policy let it in"""
+        slots = self._slots(key)
+        slot = slots[0]
+        if self.policy == ReplacementPolicy.two_tier:
+            if self._keys[slot] is None or self._keys[slot] == key or depth >= self._depths[slot]:
+                # Demote the deep entry to the always replaced slot rather than losing it
+                if self._keys[slot] not in [None, key]:
+                    self._move(slot, slots[1])
+            else:
+                slot = slots[1]
+        elif (
+            self.policy == ReplacementPolicy.depth
+            and self._keys[slot] not in [None, key]
+            and depth < self._depths[slot]
+        ):
+            return False
+
+        if self._keys[slot] not in [None, key]:
+            self.replacements += 1
+        self._keys[slot] = key
+        self._values[slot] = value
+        self._depths[slot] = depth
+        return True
+
+    def _move(self, source: int, destination: int) -> None:
+        if self._keys[destination] is not None:
+            self.replacements += 1
+        self._keys[destination] = self._keys[source]
+        self._values[destination] = self._values[source]
+        self._depths[destination] = self._depths[source]
+        self._keys[source] = None
+
+    def clear(self) -> None:
+        for slot in range(len(self._keys)):
+            self._keys[slot] = None
+            self._values[slot] = None
+            self._depths[slot] = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "replacements": self.replacements,
+        }
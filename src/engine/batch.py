@@ -0,0 +1,489 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
+from src.engine.compact import (
+    ACTION_CARDS,
+    ACTION_COUNTER_CARDS,
+    ACTION_FLAGS,
+    ASSASSINATE,
+    CAN_BE_CHALLENGED,
+    CAN_BE_COUNTERED,
+    CARD_CODES,
+    CARD_TYPES,
+    COUP,
+    DECK_CODES,
+    EXCHANGE,
+    FOREIGN_AID,
+    INCOME,
+    NO_CARD,
+    STEAL,
+    TAX,
+)
+from src.handler.game_handler import (
+    COINS_PER_DECK,
+    STRATEGY_ROTATION,
+    decks_for_players,
+)
+from src.models.card import CardType
+from src.models.player import PlayerStrategy
+from src.simulation.statistics import wilson_interval
+from src.simulation.tournament import StrategySummary, TournamentSummary
+
+DECK_COUNTS = np.bincount(DECK_CODES, minlength=len(CARD_TYPES))
+
+# Stands in for "no card" in the lookups below, it must not match an empty hand slot
+NO_MATCH = -2
+
+# Per action lookups, indexed by an array of action codes
+FLAGS = np.array(ACTION_FLAGS)
+FIRST_CARDS = np.array([cards[0] if cards else NO_MATCH for cards in ACTION_CARDS])
+FIRST_COUNTER_CARDS = np.array([cards[0] if cards else NO_MATCH for cards in ACTION_COUNTER_CARDS])
+SECOND_COUNTER_CARDS = np.array(
+    [cards[1] if len(cards) > 1 else NO_MATCH for cards in ACTION_COUNTER_CARDS]
+)
+
+DUKE = CARD_CODES[CardType.duke]
+CAPTAIN = CARD_CODES[CardType.captain]
+ASSASSIN = CARD_CODES[CardType.assassin]
+
+AGGRESSIVE, CONSERVATIVE, COUP_FREAK = (
+    list(PlayerStrategy).index(strategy)
+    for strategy in (
+        PlayerStrategy.aggressive,
+        PlayerStrategy.conservative,
+        PlayerStrategy.coup_freak,
+    )
+)
+
+
+class BatchGame:
+    """
+    Many games of the same size, played in lockstep as NumPy arrays.
+
+    Each `step` plays one turn of every running game with the bots of `src.engine.policies`,
+    using masked array operations instead of a Python loop per game. The rules are the ones of
+    `ResistanceCoupGameHandler.execute_action` and `_validate_action`. The deck is kept as the
+    number of cards left of each type, so drawing a card is a weighted pick.
+    """
+
+    def __init__(
+        self,
+        number_of_games: int,
+        number_of_players: int,
+        strategies: Optional[Sequence[PlayerStrategy]] = None,
+        seed: Optional[int | np.random.SeedSequence] = None,
+    ):
+        self.number_of_games = number_of_games
+        self.number_of_players = number_of_players
+        self.strategies = list(
+            strategies
+            or [STRATEGY_ROTATION[i % len(STRATEGY_ROTATION)] for i in range(number_of_players)]
+        )
+        self._strategy_codes = np.array(
+            [list(PlayerStrategy).index(strategy) for strategy in self.strategies]
+        )
+        self.rng = np.random.default_rng(seed)
+
+        self.reset()
+
+    def reset(self) -> None:
+        games, players = self.number_of_games, self.number_of_players
+        all_games = np.arange(games)
+
+        decks = decks_for_players(players)
+        self.deck = np.tile(DECK_COUNTS * decks, (games, 1))
+        self.hands = np.full((games, players, 2), NO_CARD, dtype=np.int8)
+        for player in range(players):
+            for slot in range(2):
+                self.hands[:, player, slot] = self._draw(all_games)
+        self.influence = np.full((games, players), 2, dtype=np.int8)
+
+        # Every player takes 2 coins from the treasury, as long as there are any left
+        treasury = COINS_PER_DECK * decks
+        starting_coins = np.clip(treasury - 2 * np.arange(players), 0, 2)
+        self.coins = np.tile(starting_coins, (games, 1))
+        self.treasury = np.full(games, treasury - starting_coins.sum())
+
+        self.current_player = self.rng.integers(0, players, games)
+        self.running = np.ones(games, dtype=bool)
+        self.turns = np.zeros(games, dtype=np.int32)
+        self.eliminated_at = np.full((games, players), -1, dtype=np.int32)
+
+    # Deck
+
+    def _draw(self, games: np.ndarray) -> np.ndarray:
+        """Draw a card for each of the (unique) `games`"""
+        cumulative = self.deck[games].cumsum(axis=1)
+        picks = self.rng.integers(0, cumulative[:, -1])
+        cards = (cumulative <= picks[:, None]).sum(axis=1)
+        self.deck[games, cards] -= 1
+        return cards
+
+    def _return(self, games: np.ndarray, cards: np.ndarray) -> None:
+        valid = cards != NO_CARD
+        np.add.at(self.deck, (games[valid], cards[valid]), 1)
+
+    # Rules
+
+    def _take_coins(self, games: np.ndarray, number_of_coins: int) -> np.ndarray:
+        taken = np.minimum(self.treasury[games], number_of_coins)
+        self.treasury[games] -= taken
+        return taken
+
+    def _lose_influence(self, games: np.ndarray, players: np.ndarray) -> None:
+        alive = self.influence[games, players] > 0
+        games, players = games[alive], players[alive]
+
+        hands = self.hands[games, players]
+        both = (hands != NO_CARD).all(axis=1)
+        slots = np.where(both, self.rng.random(len(games)) < 0.5, hands[:, 0] == NO_CARD)
+        self.hands[games, players, slots.astype(np.intp)] = NO_CARD
+        self.influence[games, players] -= 1
+
+    def _reveal(
+        self,
+        games: np.ndarray,
+        players: np.ndarray,
+        first_cards: np.ndarray,
+        second_cards: np.ndarray,
+        challengers: np.ndarray,
+    ) -> np.ndarray:
+        """Resolve challenges against `players`, returns whether they had one of the cards"""
+        hands = self.hands[games, players]
+        first_matches = hands == first_cards[:, None]
+        second_matches = hands == second_cards[:, None]
+        has_first = first_matches.any(axis=1)
+        had_card = has_first | second_matches.any(axis=1)
+        slots = np.where(has_first, first_matches.argmax(axis=1), second_matches.argmax(axis=1))
+
+        # The challenger loses influence, the revealed card is swapped for a new one
+        won = np.flatnonzero(had_card)
+        self._lose_influence(games[won], challengers[won])
+        self._return(games[won], hands[won, slots[won]])
+        self.hands[games[won], players[won], slots[won]] = self._draw(games[won])
+
+        # The bluffer loses influence
+        lost = np.flatnonzero(~had_card)
+        self._lose_influence(games[lost], players[lost])
+
+        return had_card
+
+    def _exchange(self, games: np.ndarray, players: np.ndarray) -> None:
+        pool = np.concatenate(
+            [
+                self.hands[games, players].astype(np.intp),
+                self._draw(games)[:, None],
+                self._draw(games)[:, None],
+            ],
+            axis=1,
+        )
+        # Shuffle the cards in hand with the two drawn ones, keeping empty hand slots last
+        keys = self.rng.random(pool.shape)
+        keys[pool == NO_CARD] = 2
+        pool = np.take_along_axis(pool, keys.argsort(axis=1), axis=1)
+
+        two_cards = self.influence[games, players] == 2
+        self.hands[games, players, 0] = pool[:, 0]
+        self.hands[games, players, 1] = np.where(two_cards, pool[:, 1], NO_CARD)
+        self._return(games, np.where(two_cards, pool[:, 2], pool[:, 1]))
+        self._return(games, np.where(two_cards, pool[:, 3], pool[:, 2]))
+
+    def _execute(
+        self,
+        games: np.ndarray,
+        actors: np.ndarray,
+        actions: np.ndarray,
+        targets: np.ndarray,
+        countered: np.ndarray,
+    ) -> None:
+        def select(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+            return games[mask], actors[mask], targets[mask]
+
+        g, a, _ = select(actions == INCOME)
+        self.coins[g, a] += self._take_coins(g, 1)
+
+        g, a, _ = select((actions == FOREIGN_AID) & ~countered)
+        self.coins[g, a] += self._take_coins(g, 2)
+
+        g, a, _ = select(actions == TAX)
+        self.coins[g, a] += self._take_coins(g, 3)
+
+        g, a, t = select(actions == COUP)
+        self.coins[g, a] -= 7
+        self.treasury[g] += 7
+        self._lose_influence(g, t)
+
+        g, a, t = select(actions == ASSASSINATE)
+        self.coins[g, a] -= 3
+        self.treasury[g] += 3
+        g, a, t = select((actions == ASSASSINATE) & ~countered)
+        self._lose_influence(g, t)
+
+        g, a, t = select((actions == STEAL) & ~countered)
+        steal_amount = np.minimum(self.coins[g, t], 2)
+        self.coins[g, t] -= steal_amount
+        self.coins[g, a] += steal_amount
+
+        g, a, _ = select(actions == EXCHANGE)
+        self._exchange(g, a)
+
+    def _end_turn(self, games: np.ndarray, actors: np.ndarray) -> None:
+        influence = self.influence[games]
+
+        eliminated = (influence == 0) & (self.eliminated_at[games] < 0)
+        self.eliminated_at[games] = np.where(
+            eliminated, self.turns[games, None], self.eliminated_at[games]
+        )
+        self.treasury[games] += np.where(eliminated, self.coins[games], 0).sum(axis=1)
+        self.coins[games] = np.where(eliminated, 0, self.coins[games])
+
+        self.turns[games] += 1
+        self.running[games] = (influence > 0).sum(axis=1) > 1
+
+        # Next active player in seat order
+        seats = (actors[:, None] + 1 + np.arange(self.number_of_players)) % self.number_of_players
+        active = np.take_along_axis(influence, seats, axis=1) > 0
+        self.current_player[games] = seats[np.arange(len(games)), active.argmax(axis=1)]
+
+    def _first_responder(
+        self, games: np.ndarray, willing: np.ndarray, after: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """The first willing active player in seat order after `after`, and whether there is one"""
+        players = self.number_of_players
+        order = (np.arange(players) - after[:, None] - 1) % players
+        willing = willing & (self.influence[games] > 0) & (order < players - 1)
+        keys = np.where(willing, order, players)
+        return (after + 1 + keys.min(axis=1)) % players, keys.min(axis=1) < players
+
+    # Bots
+
+    def _choose_actions(
+        self, games: np.ndarray, actors: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        rows = np.arange(len(games))
+        coins = self.coins[games]
+        influence = self.influence[games]
+        hands = self.hands[games, actors]
+        strategies = self._strategy_codes[actors]
+        random = self.rng.random(len(games))
+
+        opponents = influence > 0
+        opponents[rows, actors] = False
+        # Go after the opponent with the most influence, then the most coins
+        coup_targets = np.where(opponents, influence * 1024 + coins, -1).argmax(axis=1)
+        steal_targets = np.where(opponents, coins, -1).argmax(axis=1)
+        can_steal = coins[rows, steal_targets] > 0
+
+        own_coins = coins[rows, actors]
+        has_duke = (hands == DUKE).any(axis=1)
+        has_captain = (hands == CAPTAIN).any(axis=1)
+        has_assassin = (hands == ASSASSIN).any(axis=1)
+
+        aggressive = np.select(
+            [own_coins >= 7, own_coins >= 3, can_steal & (random < 0.5)],
+            [COUP, ASSASSINATE, STEAL],
+            TAX,
+        )
+        conservative = np.select(
+            [
+                own_coins >= 7,
+                has_duke,
+                random < 0.5,
+                has_captain & can_steal,
+                has_assassin & (own_coins >= 3),
+            ],
+            [COUP, TAX, INCOME, STEAL, ASSASSINATE],
+            INCOME,
+        )
+        coup_freak = np.select(
+            [own_coins >= 7, has_duke | (random < 0.3)], [COUP, TAX], FOREIGN_AID
+        )
+        actions = np.select(
+            [strategies == AGGRESSIVE, strategies == CONSERVATIVE],
+            [aggressive, conservative],
+            coup_freak,
+        )
+
+        # Forced actions: 10 coins, or nothing left in the treasury
+        empty_treasury = self.treasury[games] == 0
+        actions = np.select(
+            [
+                own_coins >= 10,
+                empty_treasury & (own_coins >= 7),
+                empty_treasury & can_steal,
+                empty_treasury,
+            ],
+            [COUP, COUP, STEAL, EXCHANGE],
+            actions,
+        )
+
+        targets = np.select(
+            [(actions == COUP) | (actions == ASSASSINATE), actions == STEAL],
+            [coup_targets, steal_targets],
+            -1,
+        )
+        return actions, targets
+
+    def _challenges(
+        self, games: np.ndarray, actions: np.ndarray, targets: np.ndarray
+    ) -> np.ndarray:
+        random = self.rng.random((len(games), self.number_of_players))
+        is_target = np.arange(self.number_of_players) == targets[:, None]
+        claimed_cards = (self.hands[games] == FIRST_CARDS[actions][:, None, None]).sum(axis=2)
+
+        return np.select(
+            [self._strategy_codes == AGGRESSIVE, self._strategy_codes == CONSERVATIVE],
+            [random < np.where(is_target, 0.5, 0.25), claimed_cards == 2],
+            random < 0.1,
+        )
+
+    def _counters(self, games: np.ndarray, actions: np.ndarray) -> np.ndarray:
+        random = self.rng.random((len(games), self.number_of_players))
+        hands = self.hands[games]
+        can_block = (hands == FIRST_COUNTER_CARDS[actions][:, None, None]).any(axis=2) | (
+            hands == SECOND_COUNTER_CARDS[actions][:, None, None]
+        ).any(axis=2)
+        last_card = (actions[:, None] == ASSASSINATE) & (self.influence[games] == 1)
+
+        return np.select(
+            [self._strategy_codes == AGGRESSIVE, self._strategy_codes == CONSERVATIVE],
+            [can_block | (random < 0.5), can_block],
+            can_block | last_card,
+        )
+
+    def _counter_challenges(self, games: np.ndarray) -> np.ndarray:
+        random = self.rng.random((len(games), self.number_of_players))
+        return np.select(
+            [self._strategy_codes == AGGRESSIVE, self._strategy_codes == CONSERVATIVE],
+            [random < 0.3, np.zeros_like(random, dtype=bool)],
+            random < 0.1,
+        )
+
+    # Turns
+
+    def step(self) -> None:
+        """Play one turn of every running game"""
+        games = np.flatnonzero(self.running)
+        actors = self.current_player[games]
+        actions, targets = self._choose_actions(games, actors)
+        flags = FLAGS[actions]
+
+        # Challenges against the action
+        challengers, challenged = self._first_responder(
+            games, self._challenges(games, actions, targets), actors
+        )
+        challenged &= (flags & CAN_BE_CHALLENGED) != 0
+        executed = ~challenged
+        c = np.flatnonzero(challenged)
+        executed[c] = self._reveal(
+            games[c], actors[c], FIRST_CARDS[actions[c]], np.full(len(c), NO_MATCH), challengers[c]
+        )
+
+        # Counters by anyone for foreign aid, or by the target of a steal or assassination
+        countered = np.zeros(len(games), dtype=bool)
+        c = np.flatnonzero(~challenged & ((flags & CAN_BE_COUNTERED) != 0))
+        willing = self._counters(games[c], actions[c])
+        willing &= (actions[c, None] == FOREIGN_AID) | (
+            np.arange(self.number_of_players) == targets[c, None]
+        )
+        counterers, has_counter = self._first_responder(games[c], willing, actors[c])
+        countered[c] = has_counter
+
+        # Challenges against the counter
+        c, counterers = c[has_counter], counterers[has_counter]
+        challengers, challenged = self._first_responder(
+            games[c], self._counter_challenges(games[c]), counterers
+        )
+        c, counterers, challengers = c[challenged], counterers[challenged], challengers[challenged]
+        countered[c] = self._reveal(
+            games[c],
+            counterers,
+            FIRST_COUNTER_CARDS[actions[c]],
+            SECOND_COUNTER_CARDS[actions[c]],
+            challengers,
+        )
+
+        e = np.flatnonzero(executed)
+        self._execute(games[e], actors[e], actions[e], targets[e], countered[e])
+        self._end_turn(games, actors)
+
+    def run(self, max_turns: int = 1000) -> None:
+        while self.running.any() and self.turns.max() < max_turns:
+            self.step()
+
+    # Results
+
+    @property
+    def winners(self) -> np.ndarray:
+        """The winning seat of every game, -1 for games that are still running"""
+        return np.where(self.running, -1, (self.influence > 0).argmax(axis=1))
+
+    def placings(self) -> np.ndarray:
+        """
+        The placing of every player, 1 for the winner. Players still standing in a running game
+        share the places that are left.
+        """
+        players = self.number_of_players
+        eliminated_at = np.where(self.eliminated_at < 0, np.iinfo(np.int32).max, self.eliminated_at)
+        later = eliminated_at[:, None, :] > eliminated_at[:, :, None]
+        # The handler eliminates players of the same turn in seat order
+        same_turn_after = (eliminated_at[:, None, :] == eliminated_at[:, :, None]) & (
+            np.arange(players)[None, :] > np.arange(players)[:, None]
+        )
+        placings = 1 + (later | same_turn_after).sum(axis=2).astype(float)
+
+        standing = (self.influence > 0) & self.running[:, None]
+        shared = (players - (self.eliminated_at >= 0).sum(axis=1) + 1) / 2
+        return np.where(standing, shared[:, None], placings)
+
+
+def run_batch_tournament(
+    number_of_games: int,
+    number_of_players: int,
+    seed: Optional[int] = None,
+    batch_size: int = 10_000,
+    max_turns: int = 1000,
+) -> TournamentSummary:
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % 2**32)
+
+    strategies = [STRATEGY_ROTATION[i % len(STRATEGY_ROTATION)] for i in range(number_of_players)]
+    wins = np.zeros(number_of_players, dtype=np.int64)
+    placings = np.zeros(number_of_players)
+    turns = unfinished = 0
+
+    for batch_index, start in enumerate(range(0, number_of_games, batch_size)):
+        batch = BatchGame(
+            min(batch_size, number_of_games - start),
+            number_of_players,
+            strategies,
+            np.random.SeedSequence([seed, batch_index]),
+        )
+        batch.run(max_turns)
+
+        winners = batch.winners
+        wins += np.bincount(winners[winners >= 0], minlength=number_of_players)
+        placings += batch.placings().sum(axis=0)
+        turns += int(batch.turns.sum())
+        unfinished += int(batch.running.sum())
+
+    summaries: dict[PlayerStrategy, StrategySummary] = {}
+    for seat, strategy in enumerate(strategies):
+        summary = summaries.setdefault(strategy, StrategySummary())
+        summary.seats += number_of_games
+        summary.wins += int(wins[seat])
+        summary.average_placing += float(placings[seat])
+    for summary in summaries.values():
+        summary.win_rate = summary.wins / summary.seats
+        summary.win_rate_interval = wilson_interval(summary.wins, summary.seats)
+        summary.average_placing /= summary.seats
+
+    return TournamentSummary(
+        seed=seed,
+        number_of_games=number_of_games,
+        number_of_players=number_of_players,
+        unfinished_games=unfinished,
+        average_turns=turns / number_of_games,
+        strategies=summaries,
+    )
@@ -0,0 +1,365 @@
+import random
+from enum import IntEnum
+from typing import Optional, Protocol, Sequence
+
+from src.handler.game_handler import (
+    ACTIONS_MAP,
+    COINS_PER_DECK,
+    build_deck,
+    decks_for_players,
+)
+from src.models.action import Action, ActionType
+from src.models.card import Card, CardType
+from src.models.player import Player, PlayerStrategy
+
+# Cards are small ints: the index of their type in CARD_TYPES
+CARD_TYPES: tuple[CardType, ...] = tuple(CardType)
+CARD_CODES: dict[CardType, int] = {card_type: code for code, card_type in enumerate(CARD_TYPES)}
+NO_CARD = -1
+
+# The same cards `build_deck` gives the handler
+DECK_CODES: tuple[int, ...] = tuple(CARD_CODES[card.card_type] for card in build_deck())
+
+
+class ActionCode(IntEnum):
+    income = 0
+    foreign_aid = 1
+    coup = 2
+    tax = 3
+    assassinate = 4
+    steal = 5
+    exchange = 6
+
+
+ACTION_TYPES: tuple[ActionType, ...] = tuple(ActionType[code.name] for code in ActionCode)
+
+# Plain int aliases for the hot path, looking up IntEnum members is a lot slower than a global
+INCOME = int(ActionCode.income)
+FOREIGN_AID = int(ActionCode.foreign_aid)
+COUP = int(ActionCode.coup)
+TAX = int(ActionCode.tax)
+ASSASSINATE = int(ActionCode.assassinate)
+STEAL = int(ActionCode.steal)
+EXCHANGE = int(ActionCode.exchange)
+
+# Flags of each action, looked up by ActionCode instead of going through the pydantic models
+REQUIRES_TARGET = 1
+CAN_BE_CHALLENGED = 2
+CAN_BE_COUNTERED = 4
+
+
+def _action_flags(action: Action) -> int:
+    return (
+        (REQUIRES_TARGET if action.requires_target else 0)
+        | (CAN_BE_CHALLENGED if action.can_be_challenged else 0)
+        | (CAN_BE_COUNTERED if action.can_be_countered else 0)
+    )
+
+
+ACTION_FLAGS: tuple[int, ...] = tuple(
+    _action_flags(ACTIONS_MAP[action_type]) for action_type in ACTION_TYPES
+)
+ACTION_CARDS: tuple[tuple[int, ...], ...] = tuple(
+    (CARD_CODES[ACTIONS_MAP[action_type].associated_card_type],)
+    if ACTIONS_MAP[action_type].associated_card_type
+    else ()
+    for action_type in ACTION_TYPES
+)
+ACTION_COUNTER_CARDS: tuple[tuple[int, ...], ...] = tuple(
+    tuple(CARD_CODES[card_type] for card_type in ACTIONS_MAP[action_type].counter_card_types)
+    for action_type in ACTION_TYPES
+)
+
+# Actions paid out of the treasury, so they can't be played once it is empty
+TREASURY_ACTIONS: tuple[int, ...] = (INCOME, FOREIGN_AID, TAX)
+
+
+class CompactPolicy(Protocol):
+    def choose_action(self, game: "CompactGame", player: int) -> tuple[int, int]:
+        ...
+
+    def should_challenge(
+        self, game: "CompactGame", player: int, actor: int, action: int, target: int
+    ) -> bool:
+        ...
+
+    def should_counter(self, game: "CompactGame", player: int, actor: int, action: int) -> bool:
+        ...
+
+    def should_challenge_counter(
+        self, game: "CompactGame", player: int, countering_player: int, action: int
+    ) -> bool:
+        ...
+
+
+class CompactGame:
+    """
+    The game state of ResistanceCoupGameHandler as flat lists of ints, for high volume simulation.
+
+    Player `i` holds `coins[i]` coins, `influence[i]` cards, and the cards in the hand slots
+    `hands[2 * i]` and `hands[2 * i + 1]` (NO_CARD when empty). The rules are the handler's,
+    pydantic models are only built by `to_players` and `get_game_state`.
+    """
+
+    __slots__ = (
+        "number_of_players",
+        "number_of_decks",
+        "rng",
+        "coins",
+        "influence",
+        "hands",
+        "deck",
+        "treasury",
+        "current_player",
+        "active_players",
+        "elimination_order",
+        "_pending_eliminations",
+    )
+
+    def __init__(self, number_of_players: int, seed: Optional[int] = None):
+        self.number_of_players = number_of_players
+        self.number_of_decks = decks_for_players(number_of_players)
+        self.rng = random.Random(seed)
+
+        self.coins: list[int] = [0] * number_of_players
+        self.influence: list[int] = [0] * number_of_players
+        self.hands: list[int] = [NO_CARD] * (2 * number_of_players)
+        self.deck: list[int] = []
+        self.treasury = 0
+        self.current_player = 0
+        self.active_players = 0
+        self.elimination_order: list[int] = []
+        self._pending_eliminations: list[int] = []
+
+        self.initialize_game()
+
+    def initialize_game(self, seed: Optional[int] = None) -> None:
+        if seed is not None:
+            self.rng.seed(seed)
+
+        deck = list(DECK_CODES) * self.number_of_decks
+        self.rng.shuffle(deck)
+
+        self.treasury = COINS_PER_DECK * self.number_of_decks
+        hands = self.hands
+        for player in range(self.number_of_players):
+            hands[2 * player] = deck.pop()
+            hands[2 * player + 1] = deck.pop()
+            self.influence[player] = 2
+            self.coins[player] = self._take_coins(2)
+
+        self.deck = deck
+        self.active_players = self.number_of_players
+        self.elimination_order.clear()
+        self._pending_eliminations.clear()
+        self.current_player = self.rng.randrange(self.number_of_players)
+
+    def cards(self, player: int) -> list[int]:
+        hands = self.hands
+        return [card for card in (hands[2 * player], hands[2 * player + 1]) if card != NO_CARD]
+
+    def has_card(self, player: int, card: int) -> bool:
+        return self.hands[2 * player] == card or self.hands[2 * player + 1] == card
+
+    def responders(self, player: int) -> list[int]:
+        """Active players in seat order, starting with the one after `player`"""
+        influence = self.influence
+        number_of_players = self.number_of_players
+        return [
+            other % number_of_players
+            for other in range(player + 1, player + number_of_players)
+            if influence[other % number_of_players]
+        ]
+
+    def is_valid_action(self, player: int, action: int, target: int) -> bool:
+        coins = self.coins[player]
+        if coins >= 10 and action != COUP:
+            return False
+        if ACTION_FLAGS[action] & REQUIRES_TARGET and (
+            target < 0 or target == player or not self.influence[target]
+        ):
+            return False
+        if action in TREASURY_ACTIONS and not self.treasury:
+            return False
+        if action == COUP:
+            return coins >= 7
+        if action == ASSASSINATE:
+            return coins >= 3
+        if action == STEAL:
+            return self.coins[target] > 0
+        return True
+
+    def _take_coins(self, number_of_coins: int) -> int:
+        taken = min(number_of_coins, self.treasury)
+        self.treasury -= taken
+        return taken
+
+    def _lose_influence(self, player: int) -> None:
+        slot = 2 * player
+        hands = self.hands
+        if hands[slot] == NO_CARD or (hands[slot + 1] != NO_CARD and self.rng.random() < 0.5):
+            slot += 1
+        hands[slot] = NO_CARD
+
+        self.influence[player] -= 1
+        if not self.influence[player]:
+            self._pending_eliminations.append(player)
+
+    def _swap_card(self, slot: int, card: int) -> None:
+        # Putting the card at a random place in the (already shuffled) deck keeps it shuffled
+        deck = self.deck
+        deck.append(card)
+        position = self.rng.randrange(len(deck))
+        deck[position], deck[-1] = deck[-1], deck[position]
+        self.hands[slot] = deck.pop()
+
+    def _reveal(self, player: int, cards: tuple[int, ...], challenger: int) -> bool:
+        """Resolve a challenge against `player`, returns whether they had one of the `cards`"""
+        hands = self.hands
+        for card in cards:
+            for slot in (2 * player, 2 * player + 1):
+                if hands[slot] == card:
+                    hands[slot] = NO_CARD
+                    self._lose_influence(challenger)
+                    self._swap_card(slot, card)
+                    return True
+
+        self._lose_influence(player)
+        return False
+
+    def _execute(self, actor: int, action: int, target: int, countered: bool) -> None:
+        coins = self.coins
+        if action == INCOME:
+            coins[actor] += self._take_coins(1)
+        elif action == FOREIGN_AID:
+            if not countered:
+                coins[actor] += self._take_coins(2)
+        elif action == COUP:
+            coins[actor] -= 7
+            self.treasury += 7
+            if self.influence[target]:
+                self._lose_influence(target)
+        elif action == TAX:
+            coins[actor] += self._take_coins(3)
+        elif action == ASSASSINATE:
+            coins[actor] -= 3
+            self.treasury += 3
+            if not countered and self.influence[target]:
+                self._lose_influence(target)
+        elif action == STEAL:
+            if not countered:
+                steal_amount = min(coins[target], 2)
+                coins[target] -= steal_amount
+                coins[actor] += steal_amount
+        elif action == EXCHANGE:
+            self._exchange(actor)
+
+    def _exchange(self, player: int) -> None:
+        hands = self.hands
+        deck = self.deck
+        slots = [slot for slot in (2 * player, 2 * player + 1) if hands[slot] != NO_CARD]
+        cards = [hands[slot] for slot in slots] + [deck.pop(), deck.pop()]
+        self.rng.shuffle(cards)
+        for slot in slots:
+            hands[slot] = cards.pop()
+        deck += cards
+
+    def _end_turn(self) -> bool:
+        for player in self._pending_eliminations:
+            self.treasury += self.coins[player]
+            self.coins[player] = 0
+            self.active_players -= 1
+            self.elimination_order.append(player)
+        self._pending_eliminations.clear()
+
+        if self.active_players == 1:
+            return True
+
+        influence = self.influence
+        number_of_players = self.number_of_players
+        current_player = (self.current_player + 1) % number_of_players
+        while not influence[current_player]:
+            current_player = (current_player + 1) % number_of_players
+        self.current_player = current_player
+        return False
+
+    def play_turn(self, policies: Sequence[CompactPolicy]) -> bool:
+        """Play the current player's turn, returns whether the game is over"""
+        actor = self.current_player
+        action, target = policies[actor].choose_action(self, actor)
+        if not self.is_valid_action(actor, action, target):
+            raise Exception(f"Invalid action: {ACTION_TYPES[action].value} by player {actor}")
+
+        flags = ACTION_FLAGS[action]
+        countered = False
+        if flags & (CAN_BE_CHALLENGED | CAN_BE_COUNTERED):
+            responders = self.responders(actor)
+
+            if flags & CAN_BE_CHALLENGED:
+                for player in responders:
+                    if policies[player].should_challenge(self, player, actor, action, target):
+                        if self._reveal(actor, ACTION_CARDS[action], player):
+                            self._execute(actor, action, target, countered)
+                        return self._end_turn()
+
+            if flags & CAN_BE_COUNTERED:
+                # Anyone can block foreign aid, only the target can block a steal or an assassination
+                for player in responders if action == FOREIGN_AID else (target,):
+                    if policies[player].should_counter(self, player, actor, action):
+                        countered = True
+                        for challenger in self.responders(player):
+                            if policies[challenger].should_challenge_counter(
+                                self, challenger, player, action
+                            ):
+                                countered = self._reveal(
+                                    player, ACTION_COUNTER_CARDS[action], challenger
+                                )
+                                break
+                        break
+
+        self._execute(actor, action, target, countered)
+        return self._end_turn()
+
+    def play_game(self, policies: Sequence[CompactPolicy], max_turns: int = 1000) -> int:
+        """Play until there is a winner, returns the number of turns played"""
+        turns = 0
+        game_over = False
+        while not game_over and turns < max_turns:
+            game_over = self.play_turn(policies)
+            turns += 1
+        return turns
+
+    @property
+    def winner(self) -> Optional[int]:
+        if self.active_players != 1:
+            return None
+        return next(player for player in range(self.number_of_players) if self.influence[player])
+
+    def to_players(
+        self, player_names: Sequence[str], strategies: Sequence[PlayerStrategy]
+    ) -> list[Player]:
+        return [
+            Player(
+                name=player_names[player],
+                coins=self.coins[player],
+                cards=[Card(card_type=CARD_TYPES[card]) for card in self.cards(player)],
+                strategy=strategies[player],
+                is_active=self.influence[player] > 0,
+            )
+            for player in range(self.number_of_players)
+        ]
+
+    def get_game_state(self, player_names: Sequence[str]) -> dict:
+        return {
+            "active_players": [
+                {
+                    "name": player_names[player],
+                    "coins": self.coins[player],
+                    "cards": self.influence[player],
+                }
+                for player in range(self.number_of_players)
+                if self.influence[player]
+            ],
+            "treasury_coin": self.treasury,
+            "next_player": player_names[self.current_player],
+        }
@@ -0,0 +1,202 @@
+import random
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional
+
+from src.engine.compact import (
+    ACTION_CARDS,
+    ACTION_COUNTER_CARDS,
+    ASSASSINATE,
+    CARD_CODES,
+    COUP,
+    EXCHANGE,
+    FOREIGN_AID,
+    INCOME,
+    STEAL,
+    TAX,
+    CompactGame,
+)
+from src.handler.game_handler import STRATEGY_ROTATION
+from src.models.card import CardType
+from src.models.player import PlayerStrategy
+from src.simulation.headless import GameResult, game_seed
+
+DUKE = CARD_CODES[CardType.duke]
+CAPTAIN = CARD_CODES[CardType.captain]
+ASSASSIN = CARD_CODES[CardType.assassin]
+
+
+class CompactBot(ABC):
+    """The bots of `src.ai.bots`, playing on a CompactGame"""
+
+    __slots__ = ("rng",)
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    @staticmethod
+    def _coup_target(game: CompactGame, player: int) -> int:
+        # Go after the opponent with the most influence, then the most coins
+        return max(
+            game.responders(player),
+            key=lambda other: (game.influence[other], game.coins[other]),
+        )
+
+    @staticmethod
+    def _steal_target(game: CompactGame, player: int) -> int:
+        richest = max(game.responders(player), key=lambda other: game.coins[other])
+        return richest if game.coins[richest] > 0 else -1
+
+    @staticmethod
+    def _can_block(game: CompactGame, player: int, action: int) -> bool:
+        return any(game.has_card(player, card) for card in ACTION_COUNTER_CARDS[action])
+
+    def choose_action(self, game: CompactGame, player: int) -> tuple[int, int]:
+        coins = game.coins[player]
+        if coins >= 10:
+            return COUP, self._coup_target(game, player)
+        if not game.treasury:
+            if coins >= 7:
+                return COUP, self._coup_target(game, player)
+            if (steal_target := self._steal_target(game, player)) >= 0:
+                return STEAL, steal_target
+            return EXCHANGE, -1
+        return self._choose_action(game, player)
+
+    @abstractmethod
+    def _choose_action(self, game: CompactGame, player: int) -> tuple[int, int]:
+        ...
+
+
+class AggressiveCompactBot(CompactBot):
+    __slots__ = ()
+
+    def _choose_action(self, game: CompactGame, player: int) -> tuple[int, int]:
+        coins = game.coins[player]
+        if coins >= 7:
+            return COUP, self._coup_target(game, player)
+        if coins >= 3:
+            return ASSASSINATE, self._coup_target(game, player)
+        steal_target = self._steal_target(game, player)
+        if steal_target >= 0 and self.rng.random() < 0.5:
+            return STEAL, steal_target
+        return TAX, -1
+
+    def should_challenge(
+        self, game: CompactGame, player: int, actor: int, action: int, target: int
+    ) -> bool:
+        if target == player:
+            return self.rng.random() < 0.5
+        return self.rng.random() < 0.25
+
+    def should_counter(self, game: CompactGame, player: int, actor: int, action: int) -> bool:
+        return self._can_block(game, player, action) or self.rng.random() < 0.5
+
+    def should_challenge_counter(
+        self, game: CompactGame, player: int, countering_player: int, action: int
+    ) -> bool:
+        return self.rng.random() < 0.3
+
+
+class ConservativeCompactBot(CompactBot):
+    __slots__ = ()
+
+    def _choose_action(self, game: CompactGame, player: int) -> tuple[int, int]:
+        coins = game.coins[player]
+        if coins >= 7:
+            return COUP, self._coup_target(game, player)
+        if game.has_card(player, DUKE):
+            return TAX, -1
+        if self.rng.random() < 0.5:
+            return INCOME, -1
+        if game.has_card(player, CAPTAIN) and (
+            (steal_target := self._steal_target(game, player)) >= 0
+        ):
+            return STEAL, steal_target
+        if game.has_card(player, ASSASSIN) and coins >= 3:
+            return ASSASSINATE, self._coup_target(game, player)
+        return INCOME, -1
+
+    def should_challenge(
+        self, game: CompactGame, player: int, actor: int, action: int, target: int
+    ) -> bool:
+        card = ACTION_CARDS[action][0]
+        return game.cards(player).count(card) == 2
+
+    def should_counter(self, game: CompactGame, player: int, actor: int, action: int) -> bool:
+        return self._can_block(game, player, action)
+
+    def should_challenge_counter(
+        self, game: CompactGame, player: int, countering_player: int, action: int
+    ) -> bool:
+        return False
+
+
+class CoupFreakCompactBot(CompactBot):
+    __slots__ = ()
+
+    def _choose_action(self, game: CompactGame, player: int) -> tuple[int, int]:
+        if game.coins[player] >= 7:
+            return COUP, self._coup_target(game, player)
+        if game.has_card(player, DUKE) or self.rng.random() < 0.3:
+            return TAX, -1
+        return FOREIGN_AID, -1
+
+    def should_challenge(
+        self, game: CompactGame, player: int, actor: int, action: int, target: int
+    ) -> bool:
+        return self.rng.random() < 0.1
+
+    def should_counter(self, game: CompactGame, player: int, actor: int, action: int) -> bool:
+        return self._can_block(game, player, action) or (
+            action == ASSASSINATE and game.influence[player] == 1
+        )
+
+    def should_challenge_counter(
+        self, game: CompactGame, player: int, countering_player: int, action: int
+    ) -> bool:
+        return self.rng.random() < 0.1
+
+
+COMPACT_BOTS_MAP: dict[PlayerStrategy, type[CompactBot]] = {
+    PlayerStrategy.aggressive: AggressiveCompactBot,
+    PlayerStrategy.conservative: ConservativeCompactBot,
+    PlayerStrategy.coup_freak: CoupFreakCompactBot,
+}
+
+
+def create_compact_bots(game: CompactGame, strategies: list[PlayerStrategy]) -> list[CompactBot]:
+    return [COMPACT_BOTS_MAP[strategy](game.rng) for strategy in strategies]
+
+
+def run_compact_games(
+    number_of_players: int,
+    game_indices: Iterable[int],
+    seed: int,
+    max_turns: int = 1000,
+    game: Optional[CompactGame] = None,
+) -> list[GameResult]:
+    player_names = [f"Player_{str(i + 1)}" for i in range(number_of_players)]
+    strategies = [STRATEGY_ROTATION[i % len(STRATEGY_ROTATION)] for i in range(number_of_players)]
+
+    game = game or CompactGame(number_of_players)
+    bots = create_compact_bots(game, strategies)
+
+    results = []
+    for game_index in game_indices:
+        game.initialize_game(game_seed(seed, game_index))
+        turns = game.play_game(bots, max_turns)
+
+        winner = game.winner
+        results.append(
+            GameResult(
+                seed=seed,
+                game_index=game_index,
+                winner=player_names[winner] if winner is not None else None,
+                winner_strategy=strategies[winner] if winner is not None else None,
+                strategies=dict(zip(player_names, strategies)),
+                turns=turns,
+                elimination_order=[player_names[player] for player in game.elimination_order],
+            )
+        )
+
+    return results
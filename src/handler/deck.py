@@ -0,0 +1,91 @@
+import random
+import threading
+from typing import Iterable
+
+from src.handler.zobrist import CARD_CODES, Feature, zobrist_key
+from src.models.card import CardType
+
+CARD_TYPES: tuple[CardType, ...] = tuple(CardType)
+
+# How the deck hash changes when the count of a card type goes from n to n + 1, grown as needed
+_HASH_STEPS: dict[CardType, list[int]] = {card_type: [] for card_type in CARD_TYPES}
+_HASH_STEPS_LOCK = threading.Lock()
+
+
+def _hash_step(card_type: CardType, count: int) -> int:
+    steps = _HASH_STEPS[card_type]
+    if count >= len(steps):
+        # Shared by the handlers of every thread
+        with _HASH_STEPS_LOCK:
+            code = CARD_CODES[card_type]
+            while len(steps) <= count:
+                n = len(steps)
+                steps.append(
+                    zobrist_key(Feature.deck, code, n) ^ zobrist_key(Feature.deck, code, n + 1)
+                )
+    return steps[count]
+
+
+class Deck:
+    """
+    The cards in the deck, as a count per card type.
+
+    The order of a shuffled deck is never seen, so instead of shuffling, a draw picks a card type
+    with a chance proportional to its count. Drawing and returning a card only change a count.
+    """
+
+    __slots__ = ("_counts", "_size", "zobrist")
+
+    def __init__(self, card_types: Iterable[CardType] = ()):
+        self._counts: dict[CardType, int] = dict.fromkeys(CARD_TYPES, 0)
+        self._size = 0
+        # Hash of the counts, kept up to date by every draw and return
+        self.zobrist = 0
+        self.fill(card_types)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def fill(self, card_types: Iterable[CardType]) -> None:
+        """Replace the cards in the deck"""
+        counts = self._counts
+        for card_type in CARD_TYPES:
+            counts[card_type] = 0
+        for card_type in card_types:
+            counts[card_type] += 1
+        self._size = sum(counts.values())
+        self._rehash()
+
+    def counts(self) -> tuple[int, ...]:
+        """The number of cards of every type, in `CardType` order"""
+        return tuple(self._counts.values())
+
+    def set_counts(self, counts: Iterable[int]) -> None:
+        self._counts = dict(zip(CARD_TYPES, counts))
+        self._size = sum(self._counts.values())
+        self._rehash()
+
+    def _rehash(self) -> None:
+        self.zobrist = 0
+        for card_type, count in self._counts.items():
+            self.zobrist ^= zobrist_key(Feature.deck, CARD_CODES[card_type], count)
+
+    def put(self, card_type: CardType) -> None:
+        count = self._counts[card_type]
+        self._counts[card_type] = count + 1
+        self._size += 1
+        self.zobrist ^= _hash_step(card_type, count)
+
+    def draw(self, rng: random.Random) -> CardType:
+        if not self._size:
+            raise Exception("The deck is empty")
+
+        index = rng.randrange(self._size)
+        for card_type, count in self._counts.items():
+            if index < count:
+                self._counts[card_type] = count - 1
+                self._size -= 1
+                self.zobrist ^= _hash_step(card_type, count - 1)
+                return card_type
+            index -= count
+        raise Exception("The deck counts are out of sync")
@@ -0,0 +1,75 @@
+import gzip
+import json
+from enum import Enum
+from typing import IO, Iterator, Optional
+
+
+class EventType(str, Enum):
+    # A new game, with the seed that decides every shuffle and card loss
+    start = "start"
+    deal = "deal"
+    # A call to one of the handler's public actions, the only events needed to replay a game
+    command = "command"
+    reveal = "reveal"
+    lose_card = "lose_card"
+    swap = "swap"
+    exchange = "exchange"
+    eliminate = "eliminate"
+    end_turn = "end_turn"
+    game_over = "game_over"
+    # The full state of the game at the start of a turn, to seek without replaying from the start
+    checkpoint = "checkpoint"
+
+
+class EventLog:
+    """
+    Every state transition of a game, in order.
+
+    Events are plain dicts with a `type` and the `turn` they happened in, which keeps appending
+    them cheap. Logs are written as JSON lines, gzip compressed when the path ends with `.gz`.
+    """
+
+    def __init__(self, checkpoint_interval: int = 25):
+        self.checkpoint_interval = checkpoint_interval
+        self.events: list[dict] = []
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.events)
+
+    def append(self, event_type: EventType, turn: int, **data) -> None:
+        self.events.append({"type": event_type.value, "turn": turn, **data})
+
+    def clear(self) -> None:
+        self.events.clear()
+
+    def of_type(self, event_type: EventType) -> list[dict]:
+        return [event for event in self.events if event["type"] == event_type.value]
+
+    def last_checkpoint(self, turn: int) -> Optional[tuple[int, dict]]:
+        """The index and event of the last checkpoint taken at or before the start of `turn`"""
+        for index in range(len(self.events) - 1, -1, -1):
+            event = self.events[index]
+            if event["type"] == EventType.checkpoint.value and event["turn"] <= turn:
+                return index, event
+        return None
+
+    @staticmethod
+    def _open(path: str, mode: str) -> IO:
+        if path.endswith(".gz"):
+            return gzip.open(path, mode + "t", encoding="utf-8")
+        return open(path, mode, encoding="utf-8")
+
+    def write(self, path: str) -> None:
+        with self._open(path, "w") as file:
+            for event in self.events:
+                file.write(json.dumps(event, separators=(",", ":")) + "\n")
+
+    @classmethod
+    def read(cls, path: str, checkpoint_interval: int = 25) -> "EventLog":
+        event_log = cls(checkpoint_interval)
+        with cls._open(path, "r") as file:
+            event_log.events = [json.loads(line) for line in file if line.strip()]
+        return event_log
@@ -1,7 +1,18 @@
-import random
+import math
 from enum import Enum
-from typing import List, Optional
-
+from typing import List, NamedTuple, Optional
+
+from src.handler.deck import Deck
+from src.handler.event_log import EventLog, EventType
+from src.handler.narration import (
+    LEVELS,
+    ConsoleSink,
+    Level,
+    NarrationSink,
+    NarrationType,
+)
+from src.handler.rng import GameRNG
+from src.handler.zobrist import Feature, card_key, hand_hash, zobrist_key
 from src.models.action import (
     Action,
     ActionType,
@@ -16,7 +27,6 @@ from src.models.action import (
 from src.models.card import Card, CardType
 from src.models.player import Player, PlayerStrategy
 
-
 ACTIONS_MAP: dict[ActionType, Action] = {
     ActionType.income: IncomeAction(),
     ActionType.foreign_aid: ForeignAidAction(),
@@ -27,6 +37,41 @@ ACTIONS_MAP: dict[ActionType, Action] = {
     ActionType.assassinate: AssassinateAction(),
 }
 
+TARGETED_ACTION_TYPES: list[ActionType] = [
+    ActionType.coup,
+    ActionType.steal,
+    ActionType.assassinate,
+]
+TREASURY_ACTION_TYPES: list[ActionType] = [
+    ActionType.income,
+    ActionType.foreign_aid,
+    ActionType.tax,
+]
+
+# Strategies handed out to the players in seat order
+STRATEGY_ROTATION: list[PlayerStrategy] = [
+    PlayerStrategy.conservative,
+    PlayerStrategy.aggressive,
+    PlayerStrategy.coup_freak,
+]
+
+
+class TurnPhase(str, Enum):
+    # The current player has to perform an action
+    action = "action"
+    # The action can still be countered or challenged, or else executed
+    action_response = "action_response"
+    # The counter can still be challenged, or else the action executed
+    counter_response = "counter_response"
+    game_over = "game_over"
+
+
+class ResponseType(str, Enum):
+    pass_ = "pass"
+    counter = "counter"
+    # Challenges the action, or the counter in the counter_response phase
+    challenge = "challenge"
+
 
 def build_deck() -> List[Card]:
     def _create_card(card_type: CardType):
@@ -53,34 +98,168 @@ def build_deck() -> List[Card]:
     ]
 
 
+CARDS_PER_DECK = len(build_deck())
+COINS_PER_DECK = 50
+
+
+def decks_for_players(number_of_players: int) -> int:
+    """
+    The number of base decks to play with, one up to 6 players.
+
+    Enough to deal every player 2 cards and still exchange 2, like the second deck of the
+    Reformation expansion for 7 to 10 players.
+    """
+    return max(1, math.ceil((2 * number_of_players + 3) / CARDS_PER_DECK))
+
+
+class PlayerSnapshot(NamedTuple):
+    coins: int
+    cards: tuple[CardType, ...]
+    is_active: bool
+
+
+class GameSnapshot(NamedTuple):
+    """An immutable copy of the full state of a game, including a pending action"""
+
+    players: tuple[PlayerSnapshot, ...]
+    # The number of cards of every type in the deck, in `CardType` order
+    deck: tuple[int, ...]
+    lost_cards: tuple[CardType, ...]
+    treasury: int
+    current_player_index: int
+    turn: int
+    turn_phase: TurnPhase
+    action_type: Optional[ActionType]
+    action_is_countered: bool
+    action_is_challenged: bool
+    action_target_player_name: Optional[str]
+    counter_action_player_name: Optional[str]
+    # None when the snapshot was taken without the state of the random generator
+    rng_state: Optional[tuple]
+
+    def to_dict(self) -> dict:
+        return {
+            "players": [
+                {"coins": coins, "cards": list(cards), "is_active": is_active}
+                for coins, cards, is_active in self.players
+            ],
+            "deck": list(self.deck),
+            "lost_cards": list(self.lost_cards),
+            "treasury": self.treasury,
+            "current_player_index": self.current_player_index,
+            "turn": self.turn,
+            "turn_phase": self.turn_phase,
+            "action_type": self.action_type,
+            "action_is_countered": self.action_is_countered,
+            "action_is_challenged": self.action_is_challenged,
+            "action_target_player_name": self.action_target_player_name,
+            "counter_action_player_name": self.counter_action_player_name,
+            "rng_state": self.rng_state,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "GameSnapshot":
+        # Written to a file, the enums are plain strings and the tuples lists
+        rng_state = None
+        if state["rng_state"] is not None:
+            rng_state = tuple(state["rng_state"])
+
+        return cls(
+            players=tuple(
+                PlayerSnapshot(
+                    coins=player["coins"],
+                    cards=tuple(CardType(card_type) for card_type in player["cards"]),
+                    is_active=player["is_active"],
+                )
+                for player in state["players"]
+            ),
+            deck=tuple(state["deck"]),
+            lost_cards=tuple(CardType(card_type) for card_type in state["lost_cards"]),
+            treasury=state["treasury"],
+            current_player_index=state["current_player_index"],
+            turn=state["turn"],
+            turn_phase=TurnPhase(state["turn_phase"]),
+            action_type=ActionType(state["action_type"]) if state["action_type"] else None,
+            action_is_countered=state["action_is_countered"],
+            action_is_challenged=state["action_is_challenged"],
+            action_target_player_name=state["action_target_player_name"],
+            counter_action_player_name=state["counter_action_player_name"],
+            rng_state=rng_state,
+        )
+
+
 class ResistanceCoupGameHandler:
-    _players: dict[str, Player] = {}
-    _player_names: list[str] = []
-
-    _deck: List[Card] = []
-    _treasury: int = 0
-
-    # Turn state
-    _current_player_index = 0
-    _current_action: Optional[Action]
-    _current_action_is_countered: bool = False
-    _current_action_is_challenged: bool = False
-    _current_action_target_player_name: Optional[str]
-    _current_counter_action_player_name: Optional[str]
-
-    def __init__(self, number_of_players: int):
-        strategies = [
-            PlayerStrategy.conservative,
-            PlayerStrategy.aggressive,
-            PlayerStrategy.coup_freak,
-        ]
+    def __init__(
+        self,
+        number_of_players: int,
+        seed: Optional[int] = None,
+        event_log: Optional[EventLog] = None,
+        strategies: Optional[list[PlayerStrategy]] = None,
+        narration: Optional[NarrationSink] = None,
+        number_of_decks: Optional[int] = None,
+    ):
+        number_of_decks = number_of_decks or decks_for_players(number_of_players)
+        if number_of_decks * CARDS_PER_DECK < 2 * number_of_players + 2:
+            raise Exception(
+                f"{number_of_decks} deck(s) can't deal 2 cards to {number_of_players} players "
+                f"and still exchange."
+            )
+        self._number_of_decks: int = number_of_decks
+
+        # All randomness in a game comes from here, so a seed replays the same game
+        self._rng = GameRNG(seed)
+        self._seed: Optional[int] = seed
+
+        # Every state transition is recorded when given an event log
+        self.event_log = event_log
+        self._turn: int = 0
+        # The play-by-play, printed unless given another sink
+        self.narration: NarrationSink = narration or ConsoleSink()
+
+        self._players: dict[str, Player] = {}
+        self._player_names: list[str] = []
+        self._seats: dict[str, int] = {}
+        # Hash of the coins, hands and active flags of the players, see `zobrist_hash`
+        self._zobrist: int = 0
+
+        # The active players as a ring of seats, so turns and eliminations don't scan the table
+        self._next_seat: list[int] = []
+        self._previous_seat: list[int] = []
+        self._active_count: int = 0
+        # Active players who lost their last card this turn, eliminated when the turn ends
+        self._pending_eliminations: list[Player] = []
+
+        # Every card in the game, reused by each new game instead of rebuilding the deck
+        self._cards: List[Card] = build_deck() * number_of_decks
+        # Cards are never changed, so hands share one card of each type, the deck only counts them
+        self._card_of_type: dict[CardType, Card] = {card.card_type: card for card in self._cards}
+        self._deck = Deck()
+        # Cards lost to a coup, assassination or challenge are revealed to everyone
+        self._lost_cards: List[Card] = []
+        self._treasury: int = 0
+
+        # Turn state
+        self._current_player_index: int = 0
+        self._reset_turn_state()
+
+        strategies = strategies or STRATEGY_ROTATION
         for i in range(number_of_players):
             player_name = f"Player_{str(i + 1)}"
-            strategy = strategies[i % number_of_players]
+            strategy = strategies[i % len(strategies)]
             self._players[player_name] = Player(name=player_name, strategy=strategy)
             self._player_names.append(player_name)
+            self._seats[player_name] = i
 
-        self.initialize_game()
+        # Hand keys by seat and card type, indexed by copy, a hand holds up to 4 cards
+        self._card_keys: list[dict[CardType, tuple[int, ...]]] = [
+            {
+                card_type: tuple(card_key(seat, card_type, copy) for copy in range(6))
+                for card_type in CardType
+            }
+            for seat in range(number_of_players)
+        ]
+
+        self.initialize_game(seed)
 
     @property
     def current_player(self) -> Player:
@@ -90,6 +269,165 @@ class ResistanceCoupGameHandler:
     def players(self) -> list[Player]:
         return [player for player in self._players.values()]
 
+    @property
+    def seed(self) -> Optional[int]:
+        return self._seed
+
+    @property
+    def number_of_decks(self) -> int:
+        return self._number_of_decks
+
+    @property
+    def turn(self) -> int:
+        return self._turn
+
+    @property
+    def treasury(self) -> int:
+        return self._treasury
+
+    @property
+    def turn_phase(self) -> TurnPhase:
+        return self._turn_phase
+
+    @property
+    def current_action(self) -> Optional[Action]:
+        return self._current_action
+
+    @property
+    def current_action_target_player_name(self) -> Optional[str]:
+        return self._current_action_target_player_name
+
+    @property
+    def current_counter_action_player_name(self) -> Optional[str]:
+        return self._current_counter_action_player_name
+
+    @property
+    def lost_cards(self) -> list[Card]:
+        return self._lost_cards
+
+    @property
+    def zobrist_hash(self) -> int:
+        """
+        A 64 bit hash of the state of the game, equal for equal positions in any game or process.
+
+        The players and the deck are hashed as they change, in constant time per change. Only the
+        treasury and the state of the turn are added when the hash is asked for.
+        """
+        hash_ = (
+            self._zobrist
+            ^ self._deck.zobrist
+            ^ zobrist_key(Feature.treasury, 0, self._treasury)
+            ^ zobrist_key(Feature.current_player, 0, self._current_player_index)
+            ^ zobrist_key(Feature.turn_phase, 0, self._turn_phase)
+        )
+        if self._turn_phase in [TurnPhase.action_response, TurnPhase.counter_response]:
+            hash_ ^= (
+                zobrist_key(Feature.action, 0, self._current_action.action_type)
+                ^ zobrist_key(
+                    Feature.target, 0, self._seats.get(self._current_action_target_player_name)
+                )
+                ^ zobrist_key(Feature.countered, 0, self._current_action_is_countered)
+                ^ zobrist_key(Feature.challenged, 0, self._current_action_is_challenged)
+                ^ zobrist_key(
+                    Feature.counter_player,
+                    0,
+                    self._seats.get(self._current_counter_action_player_name),
+                )
+            )
+        return hash_
+
+    def _coins_key(self, player: Player) -> int:
+        return zobrist_key(Feature.coins, self._seats[player.name], player.coins)
+
+    def _copy_key(self, player: Player, card_type: CardType) -> int:
+        # The key of one more copy of `card_type` than the player holds: toggled when a card
+        # joins the hand, or right after one left it
+        copy = 1
+        for card in player.cards:
+            if card.card_type is card_type:
+                copy += 1
+        return self._card_keys[self._seats[player.name]][card_type][copy]
+
+    def _hand_hash(self, player: Player) -> int:
+        return hand_hash(self._seats[player.name], [card.card_type for card in player.cards])
+
+    def _rehash(self) -> None:
+        """Hash the players from scratch, after dealing or restoring a game"""
+        self._zobrist = 0
+        for player in self._players.values():
+            self._zobrist ^= self._coins_key(player) ^ self._hand_hash(player)
+            if player.is_active:
+                self._zobrist ^= zobrist_key(Feature.active, self._seats[player.name])
+
+    def _link_active_players(self) -> None:
+        """Build the ring of active players from scratch, after dealing or restoring a game"""
+        number_of_seats = len(self._player_names)
+        # Inactive seats keep pointing ahead, so turns can leave from an eliminated player
+        self._next_seat = [(seat + 1) % number_of_seats for seat in range(number_of_seats)]
+        self._previous_seat = [(seat - 1) % number_of_seats for seat in range(number_of_seats)]
+
+        active_players = [player for player in self._players.values() if player.is_active]
+        active_seats = [self._seats[player.name] for player in active_players]
+        for seat, next_seat in zip(active_seats, active_seats[1:] + active_seats[:1]):
+            self._next_seat[seat] = next_seat
+            self._previous_seat[next_seat] = seat
+
+        self._active_count = len(active_seats)
+        self._pending_eliminations = [player for player in active_players if not player.cards]
+
+    def get_player(self, player_name: str) -> Player:
+        return self._players[player_name]
+
+    def get_eligible_responders(self) -> list[str]:
+        """The players that may still counter or challenge in the current turn phase"""
+        match self._turn_phase:
+            case TurnPhase.action_response:
+                responding_to = self.current_player.name
+            case TurnPhase.counter_response:
+                responding_to = self._current_counter_action_player_name
+            case _:
+                return []
+
+        return [
+            player_name
+            for player_name in self._player_names
+            if self._players[player_name].is_active and player_name != responding_to
+        ]
+
+    def players_after(self, player_name: str) -> list[str]:
+        """Active players in seat order, starting with the one after `player_name`"""
+        first_seat = self._next_seat[self._seats[player_name]]
+        while not self._players[self._player_names[first_seat]].is_active:
+            first_seat = self._next_seat[first_seat]
+
+        players_after = []
+        seat = first_seat
+        while True:
+            if self._player_names[seat] != player_name:
+                players_after.append(self._player_names[seat])
+            seat = self._next_seat[seat]
+            if seat == first_seat:
+                return players_after
+
+    def legal_responses(self, player_name: str) -> list[ResponseType]:
+        """Every response `player_name` can give to the current action or counter-action"""
+        if player_name not in self.get_eligible_responders():
+            return []
+
+        legal_responses = [ResponseType.pass_]
+        if self._turn_phase == TurnPhase.counter_response:
+            return legal_responses + [ResponseType.challenge]
+
+        if self._current_action.can_be_challenged:
+            legal_responses.append(ResponseType.challenge)
+        # Anyone can block foreign aid, only the target can block a steal or an assassination
+        if self._current_action.can_be_countered and (
+            self._current_action.action_type == ActionType.foreign_aid
+            or player_name == self._current_action_target_player_name
+        ):
+            legal_responses.append(ResponseType.counter)
+        return legal_responses
+
     def get_game_state(self) -> dict:
         players_str = ""
         for player_name, player in self._players.items():
@@ -106,8 +444,51 @@ class ResistanceCoupGameHandler:
             ],
             "treasury_coin": self._treasury,
             "next_player": self.current_player.name,
+            "legal_actions": [
+                {"action": action_type.value, "target_player_name": target_player_name}
+                for action_type, target_player_name in self.legal_actions(self.current_player.name)
+            ],
         }
 
+    def legal_actions(self, player_name: str) -> list[tuple[ActionType, Optional[str]]]:
+        """
+        Every action `player_name` can perform right now, with its target player.
+
+        Empty unless it is their turn to perform an action. These are exactly the actions that
+        pass `_validate_action`.
+        """
+        player = self._players[player_name]
+        if self._turn_phase != TurnPhase.action or player_name != self.current_player.name:
+            return []
+
+        targets = [
+            other_player_name
+            for other_player_name in self._player_names
+            if other_player_name != player_name and self._players[other_player_name].is_active
+        ]
+        if player.coins >= 10:
+            return [(ActionType.coup, target) for target in targets]
+
+        legal_actions = []
+        for action_type in ACTIONS_MAP:
+            if action_type in TREASURY_ACTION_TYPES and self._treasury == 0:
+                continue
+            if action_type == ActionType.coup and player.coins < 7:
+                continue
+            if action_type == ActionType.assassinate and player.coins < 3:
+                continue
+
+            if action_type == ActionType.steal:
+                legal_actions += [
+                    (action_type, target) for target in targets if self._players[target].coins > 0
+                ]
+            elif action_type in TARGETED_ACTION_TYPES:
+                legal_actions += [(action_type, target) for target in targets]
+            else:
+                legal_actions.append((action_type, None))
+
+        return legal_actions
+
     def get_game_state_str(self) -> str:
         players_str = ""
         for player_name, player in self._players.items():
@@ -124,18 +505,110 @@ The remaining players are:
 The number of coins in the treasury: {self._treasury}
         """
 
-    def initialize_game(self) -> None:
-        self._deck = build_deck()
-        self._shuffle_deck()
+    def _reset_turn_state(self) -> None:
+        self._turn_phase: TurnPhase = TurnPhase.action
+        self._current_action: Optional[Action] = None
+        self._current_action_is_countered: bool = False
+        self._current_action_is_challenged: bool = False
+        self._current_action_target_player_name: Optional[str] = None
+        self._current_counter_action_player_name: Optional[str] = None
+
+    def _log(self, event_type: EventType, **data) -> None:
+        if self.event_log is not None:
+            self.event_log.append(event_type, self._turn, **data)
+
+    def _narrate(self, narration_type: NarrationType, **data) -> None:
+        if LEVELS[narration_type] >= self.narration.level:
+            self.narration.emit({"type": narration_type.value, "turn": self._turn, **data})
+
+    def snapshot(self, include_rng: bool = True) -> GameSnapshot:
+        """
+        A copy of the game to restore later, for example to look ahead during a search.
+
+        Searches that don't need to replay the same draws can leave out the state of the random
+        generator with `include_rng=False`.
+        """
+        return GameSnapshot(
+            players=tuple(
+                PlayerSnapshot(
+                    player.coins,
+                    tuple(card.card_type for card in player.cards),
+                    player.is_active,
+                )
+                for player in self._players.values()
+            ),
+            deck=self._deck.counts(),
+            lost_cards=tuple(card.card_type for card in self._lost_cards),
+            treasury=self._treasury,
+            current_player_index=self._current_player_index,
+            turn=self._turn,
+            turn_phase=self._turn_phase,
+            action_type=self._current_action.action_type if self._current_action else None,
+            action_is_countered=self._current_action_is_countered,
+            action_is_challenged=self._current_action_is_challenged,
+            action_target_player_name=self._current_action_target_player_name,
+            counter_action_player_name=self._current_counter_action_player_name,
+            rng_state=self._rng.getstate() if include_rng else None,
+        )
+
+    def restore(self, snapshot: GameSnapshot) -> None:
+        card_of_type = self._card_of_type
+        for player, (coins, cards, is_active) in zip(self._players.values(), snapshot.players):
+            # Straight into the fields, pydantic's attribute assignment would be most of the cost
+            player.__dict__.update(
+                coins=coins,
+                cards=[card_of_type[card_type] for card_type in cards],
+                is_active=is_active,
+            )
+
+        self._deck.set_counts(snapshot.deck)
+        self._lost_cards = [card_of_type[card_type] for card_type in snapshot.lost_cards]
+        self._treasury = snapshot.treasury
+        self._current_player_index = snapshot.current_player_index
+        self._turn = snapshot.turn
+
+        self._turn_phase = snapshot.turn_phase
+        self._current_action = ACTIONS_MAP[snapshot.action_type] if snapshot.action_type else None
+        self._current_action_is_countered = snapshot.action_is_countered
+        self._current_action_is_challenged = snapshot.action_is_challenged
+        self._current_action_target_player_name = snapshot.action_target_player_name
+        self._current_counter_action_player_name = snapshot.counter_action_player_name
+
+        if snapshot.rng_state is not None:
+            self._rng.setstate(snapshot.rng_state)
+        self._rehash()
+        self._link_active_players()
+
+    def initialize_game(self, seed: Optional[int] = None) -> None:
+        # Without a seed the next game still gets one, so it can be replayed from its event log
+        if seed is None:
+            seed = self._rng.getrandbits(64)
+        self._rng.seed(seed)
+        self._seed = seed
+        self._turn = 0
+
+        if self.event_log is not None:
+            self.event_log.clear()
+        self._log(
+            EventType.start,
+            number_of_players=len(self._players),
+            number_of_decks=self._number_of_decks,
+            seed=seed,
+            strategies=[player.strategy.value for player in self._players.values()],
+        )
+
+        self._deck.fill(card.card_type for card in self._cards)
+        self._reset_turn_state()
 
-        self._treasury = 50
+        self._lost_cards = []
+        self._treasury = COINS_PER_DECK * self._number_of_decks
 
         for player in self._players.values():
             player.reset_player()
 
             # Deal 2 cards to each player
-            player.cards.append(self._deck.pop())
-            player.cards.append(self._deck.pop())
+            player.cards.append(self._draw_card())
+            player.cards.append(self._draw_card())
 
             # Gives each player 2 coins
             player.coins = self._take_coin_from_treasury(2)
@@ -144,15 +617,43 @@ The number of coins in the treasury: {self._treasury}
             player.is_active = True
 
         # Random starting player
-        self._current_player_index = random.randint(0, len(self._players) - 1)
+        self._current_player_index = self._rng.randrange(len(self._players))
+        self._rehash()
+        self._link_active_players()
+
+        if self.event_log is not None:
+            for player in self._players.values():
+                self._log(
+                    EventType.deal,
+                    player=player.name,
+                    cards=[card.card_type.value for card in player.cards],
+                )
+            self._log(EventType.checkpoint, state=self.snapshot().to_dict())
 
-    def _shuffle_deck(self) -> None:
-        random.shuffle(self._deck)
+    def _draw_card(self) -> Card:
+        return self._card_of_type[self._deck.draw(self._rng)]
 
     def _swap_card(self, player: Player, card: Card) -> None:
-        self._deck.append(card)
-        self._shuffle_deck()
-        player.cards.append(self._deck.pop())
+        # The revealed card was already taken out of the player's hand
+        self._zobrist ^= self._copy_key(player, card.card_type)
+        self._deck.put(card.card_type)
+        drawn_card = self._draw_card()
+        self._zobrist ^= self._copy_key(player, drawn_card.card_type)
+        player.cards.append(drawn_card)
+        self._log(
+            EventType.swap,
+            player=player.name,
+            returned=card.card_type.value,
+            drawn=player.cards[-1].card_type.value,
+        )
+
+    def _lose_influence(self, player: Player) -> None:
+        card = player.remove_card(self._rng)
+        self._zobrist ^= self._copy_key(player, card.card_type)
+        self._lost_cards.append(card)
+        if not player.cards:
+            self._pending_eliminations.append(player)
+        self._log(EventType.lose_card, player=player.name, card=card.card_type.value)
 
     def _take_coin_from_treasury(self, number_of_coins: int) -> int:
         if number_of_coins <= self._treasury:
@@ -168,21 +669,35 @@ The number of coins in the treasury: {self._treasury}
         return number_of_coins
 
     def _next_player(self):
-        self._current_player_index = (self._current_player_index + 1) % len(self._players)
-        while not self.current_player.is_active:
-            self._current_player_index = (self._current_player_index + 1) % len(self._players)
+        seat = self._next_seat[self._current_player_index]
+        # Only the current player can be inactive, when they were eliminated this turn
+        while not self._players[self._player_names[seat]].is_active:
+            seat = self._next_seat[seat]
+        self._current_player_index = seat
 
     def _deactivate_player(self) -> Optional[Player]:
-        for player in self._players.values():
-            if not player.cards and player.is_active:
-                player.is_active = False
-                player.coins -= self._give_coin_to_treasury(player.coins)
-
-                return player
-        return None
+        if not self._pending_eliminations:
+            return None
+
+        # In seat order, when a turn eliminates more than one player
+        player = min(self._pending_eliminations, key=lambda player: self._seats[player.name])
+        self._pending_eliminations.remove(player)
+        seat = self._seats[player.name]
+
+        self._zobrist ^= zobrist_key(Feature.active, seat)
+        self._zobrist ^= self._coins_key(player)
+        player.is_active = False
+        player.coins -= self._give_coin_to_treasury(player.coins)
+        self._zobrist ^= self._coins_key(player)
+
+        # Unlink the seat from the ring, it keeps pointing to the next player
+        self._next_seat[self._previous_seat[seat]] = self._next_seat[seat]
+        self._previous_seat[self._next_seat[seat]] = self._previous_seat[seat]
+        self._active_count -= 1
+        return player
 
     def _determine_win_state(self) -> bool:
-        return sum(player.is_active for player in self._players.values()) == 1
+        return self._active_count == 1
 
     def _validate_action(
         self, action: Action, current_player: Player, target_player: Optional[Player]
@@ -193,19 +708,13 @@ The number of coins in the treasury: {self._treasury}
                 f"{ActionType.coup.value} action."
             )
 
-        if (
-            action.action_type in [ActionType.coup, ActionType.steal, ActionType.assassinate]
-            and not target_player
-        ):
+        if action.action_type in TARGETED_ACTION_TYPES and not target_player:
             raise Exception(
                 f"Invalid action: You need a `target_player` for the action {action.action_type.value}"
             )
 
         # Can't take coin if the treasury has none
-        if (
-            action.action_type in [ActionType.income, ActionType.foreign_aid, ActionType.tax]
-            and self._treasury == 0
-        ):
+        if action.action_type in TREASURY_ACTION_TYPES and self._treasury == 0:
             raise Exception("Invalid action: The treasury has no coin to give")
 
         # You can only do a coup if you have at least 7 coins.
@@ -232,38 +741,67 @@ The number of coins in the treasury: {self._treasury}
         self, player_being_challenged: Player, card: Card, challenger: Player
     ):
         # Player being challenged reveals the card
-        print(f"{player_being_challenged} reveals their {card} card!")
-        print(f"{challenger} loses the challenge")
-        print(f"{challenger} has lost influence...")
+        self._narrate(
+            NarrationType.reveal, player=player_being_challenged.name, card=card.card_type.value
+        )
+        self._log(EventType.reveal, player=player_being_challenged.name, card=card.card_type.value)
+        self._narrate(NarrationType.lose_challenge, player=challenger.name)
 
         # Challenge player loses influence (chooses a card to remove)
-        challenger.remove_card()
+        self._lose_influence(challenger)
 
         # Player puts card into the deck and gets a new card
-        print(f"{player_being_challenged} gets a new card\n")
+        self._narrate(NarrationType.new_card, player=player_being_challenged.name)
         self._swap_card(player_being_challenged, card)
 
     def _challenge_against_player_succeeded(self, player_being_challenged: Player):
-        print(f"{player_being_challenged} bluffed! They do not have the required card!")
-        print(f"{player_being_challenged} has lost influence...\n")
+        self._narrate(NarrationType.bluff, player=player_being_challenged.name)
 
         # Player being challenged loses influence (chooses a card to remove)
-        player_being_challenged.remove_card()
+        self._lose_influence(player_being_challenged)
 
     def _end_turn(self):
-        print(self.get_game_state_str())
+        if Level.debug >= self.narration.level:
+            self._narrate(
+                NarrationType.state,
+                players=[
+                    {
+                        "name": player.name,
+                        "strategy": player.strategy.value,
+                        "cards": len(player.cards),
+                        "coins": player.coins,
+                    }
+                    for player in self._players.values()
+                    if player.is_active
+                ],
+                treasury=self._treasury,
+            )
 
         # Is any player out of the game?
         while player := self._deactivate_player():
-            print(f"{player} was defeated! They can no longer play")
+            self._narrate(NarrationType.defeated, player=player.name)
+            self._log(EventType.eliminate, player=player.name)
 
         # Have we reached a winner?
         if self._determine_win_state():
-            print("\n" + f"The game is over! {self.current_player} has won!")
+            self._narrate(NarrationType.game_over, player=self.current_player.name)
+            self.narration.flush()
+            self._turn_phase = TurnPhase.game_over
+            self._log(
+                EventType.game_over,
+                winner=next(player.name for player in self._players.values() if player.is_active),
+            )
             return {"turn_complete": True, "game_over": True}
 
         # Next player
         self._next_player()
+        self._turn_phase = TurnPhase.action
+        self._turn += 1
+
+        if self.event_log is not None:
+            self._log(EventType.end_turn, next_player=self.current_player.name)
+            if self._turn % self.event_log.checkpoint_interval == 0:
+                self._log(EventType.checkpoint, state=self.snapshot().to_dict())
 
         return {
             "turn_complete": True,
@@ -276,17 +814,19 @@ The number of coins in the treasury: {self._treasury}
     def perform_action(
         self, player_name: str, action_name: ActionType, target_player_name: Optional[str] = ""
     ) -> dict:
+        self._log(
+            EventType.command,
+            name="perform_action",
+            args=[player_name, action_name, target_player_name],
+        )
+
         if self._determine_win_state():
             raise Exception(
                 f"You can't play anymore, the game has already ended. {self.current_player} won already."
             )
 
         # Reset current action
-        self._current_action = None
-        self._current_action_target_player_name = None
-        self._current_counter_action_player_name = None
-        self._current_action_is_countered = False
-        self._current_action_is_challenged = False
+        self._reset_turn_state()
 
         action = ACTIONS_MAP[action_name]
         target_player = None
@@ -309,6 +849,7 @@ The number of coins in the treasury: {self._treasury}
         self._current_action_target_player_name = target_player_name
 
         if action.can_be_countered or action.can_be_challenged:
+            self._turn_phase = TurnPhase.action_response
             return {
                 "turn_complete": False,
                 "action_can_be_countered": action.can_be_countered,
@@ -316,11 +857,13 @@ The number of coins in the treasury: {self._treasury}
                 "game_over": False,
             }
         else:
-            return self.execute_action(
+            return self._execute_action(
                 self.current_player.name, action.action_type, target_player_name
             )
 
     def counter_action(self, countering_player_name: str):
+        self._log(EventType.command, name="counter_action", args=[countering_player_name])
+
         countering_player = self._players[countering_player_name]
         if not countering_player.is_active:
             raise Exception(
@@ -329,9 +872,12 @@ The number of coins in the treasury: {self._treasury}
 
         self._current_action_is_countered = True
         self._current_counter_action_player_name = countering_player_name
+        self._turn_phase = TurnPhase.counter_response
 
-        print(
-            f"{countering_player} is countering the previous action: {self._current_action.action_type.value}"
+        self._narrate(
+            NarrationType.counter,
+            player=countering_player_name,
+            action=self._current_action.action_type.value,
         )
 
         return {
@@ -342,6 +888,8 @@ The number of coins in the treasury: {self._treasury}
         }
 
     def challenge_action(self, challenging_player_name: str):
+        self._log(EventType.command, name="challenge_action", args=[challenging_player_name])
+
         challenger = self._players[challenging_player_name]
         if not challenger.is_active:
             raise Exception(
@@ -350,8 +898,10 @@ The number of coins in the treasury: {self._treasury}
 
         self._current_action_is_challenged = True
 
-        print(
-            f"{challenger} is challenging the previous action: {self._current_action.action_type.value}."
+        self._narrate(
+            NarrationType.challenge,
+            player=challenging_player_name,
+            action=self._current_action.action_type.value,
         )
         # Player being challenged has the card
         if card := self.current_player.find_card(self._current_action.associated_card_type):
@@ -361,7 +911,7 @@ The number of coins in the treasury: {self._treasury}
                 challenger=challenger,
             )
             # Go ahead with action execution
-            return self.execute_action(
+            return self._execute_action(
                 player_name=self.current_player.name,
                 action_name=self._current_action.action_type,
                 target_player_name=self._current_action_target_player_name,
@@ -373,17 +923,26 @@ The number of coins in the treasury: {self._treasury}
             return self._end_turn()
 
     def challenge_counter_action(self, challenging_player_name: str):
+        self._log(
+            EventType.command, name="challenge_counter_action", args=[challenging_player_name]
+        )
+
         challenger = self._players[challenging_player_name]
         if not challenger.is_active:
             raise Exception(
                 f"You have been eliminated {challenging_player_name}! You cannot challenge."
             )
 
-        print(f"{challenger} is challenging the previous counter action.")
+        self._narrate(NarrationType.challenge_counter, player=challenging_player_name)
         countering_player = self._players[self._current_counter_action_player_name]
 
-        # Player being challenged has the card
-        if card := self.current_player.find_card(self._current_action.associated_card_type):
+        # Player being challenged has one of the cards that blocks the action
+        card = None
+        for card_type in self._current_action.counter_card_types:
+            if card := countering_player.find_card(card_type):
+                break
+
+        if card:
             self._challenge_against_player_failed(
                 player_being_challenged=countering_player,
                 card=card,
@@ -395,16 +954,65 @@ The number of coins in the treasury: {self._treasury}
             self._challenge_against_player_succeeded(countering_player)
 
         # Go ahead with action and counter execution
-        return self.execute_action(
+        return self._execute_action(
             player_name=self.current_player.name,
             action_name=self._current_action.action_type,
             target_player_name=self._current_action_target_player_name,
         )
 
+    def resolve_responses(self, responses: dict[str, ResponseType]) -> dict:
+        """
+        Resolve the responses of every eligible player to the current action or counter-action at once.
+
+        Challenges go before counters, since a successful challenge cancels the action, and among
+        players giving the same response the first one in seat order after the player being
+        responded to wins. Without any challenge or counter the action is executed. Players missing
+        from `responses` pass.
+        """
+        if self._turn_phase not in [TurnPhase.action_response, TurnPhase.counter_response]:
+            raise Exception("There is no action or counter-action to respond to.")
+
+        for player_name, response in responses.items():
+            if response not in self.legal_responses(player_name):
+                raise Exception(f"Invalid response: {player_name} can't {response.value} now.")
+
+        if self._turn_phase == TurnPhase.action_response:
+            responding_to = self.current_player.name
+        else:
+            responding_to = self._current_counter_action_player_name
+        players = self.players_after(responding_to)
+
+        for player_name in players:
+            if responses.get(player_name) == ResponseType.challenge:
+                if self._turn_phase == TurnPhase.counter_response:
+                    return self.challenge_counter_action(player_name)
+                return self.challenge_action(player_name)
+
+        for player_name in players:
+            if responses.get(player_name) == ResponseType.counter:
+                return self.counter_action(player_name)
+
+        return self.execute_action(
+            self.current_player.name,
+            self._current_action.action_type,
+            self._current_action_target_player_name,
+        )
+
     def execute_action(
         self, player_name: str, action_name: ActionType, target_player_name: Optional[str] = ""
     ) -> dict:
-        result_action_str = ""
+        self._log(
+            EventType.command,
+            name="execute_action",
+            args=[player_name, action_name, target_player_name],
+        )
+        return self._execute_action(player_name, action_name, target_player_name)
+
+    def _execute_action(
+        self, player_name: str, action_name: ActionType, target_player_name: Optional[str] = ""
+    ) -> dict:
+        # Coins the action moved, for the play-by-play
+        coins = 0
 
         action = ACTIONS_MAP[action_name]
         target_player = None
@@ -414,63 +1022,77 @@ The number of coins in the treasury: {self._treasury}
         if player_name != self.current_player.name:
             raise Exception(f"Wrong player, it is currently {self.current_player.name}'s turn.")
 
+        # Only the coins of the player and their target change
+        changing_players = [self.current_player] + ([target_player] if target_player else [])
+        for player in changing_players:
+            self._zobrist ^= self._coins_key(player)
+
         match action.action_type:
             case ActionType.income:
                 # Player gets 1 coin
-                self.current_player.coins += self._take_coin_from_treasury(1)
-                result_action_str = f"{self.current_player}'s coins are increased by 1"
+                coins = self._take_coin_from_treasury(1)
+                self.current_player.coins += coins
             case ActionType.foreign_aid:
                 if not self._current_action_is_countered:
                     # Player gets 2 coin
-                    taken_coin = self._take_coin_from_treasury(2)
-                    self.current_player.coins += taken_coin
-                    result_action_str = (
-                        f"{self.current_player}'s coins are increased by {taken_coin}"
-                    )
+                    coins = self._take_coin_from_treasury(2)
+                    self.current_player.coins += coins
             case ActionType.coup:
                 # Player pays 7 coin
                 self.current_player.coins -= self._give_coin_to_treasury(7)
-                result_action_str = f"{self.current_player} pays 7 coins and performs the coup against {target_player}"
 
                 if target_player.cards:
                     # Target player loses influence
-                    target_player.remove_card()
+                    self._lose_influence(target_player)
             case ActionType.tax:
                 # Player gets 3 coins
-                taken_coin = self._take_coin_from_treasury(3)
-                self.current_player.coins += taken_coin
-                result_action_str = f"{self.current_player}'s coins are increased by {taken_coin}"
+                coins = self._take_coin_from_treasury(3)
+                self.current_player.coins += coins
             case ActionType.assassinate:
                 # Player pays 3 coin
                 self.current_player.coins -= self._give_coin_to_treasury(3)
                 if not self._current_action_is_countered and target_player.cards:
-                    result_action_str = f"{self.current_player} assassinates {target_player}"
-                    target_player.remove_card()
+                    self._lose_influence(target_player)
             case ActionType.steal:
                 if not self._current_action_is_countered:
                     # Take 2 (or all) coins from a player
-                    steal_amount = min(target_player.coins, 2)
-                    target_player.coins -= steal_amount
-                    self.current_player.coins += steal_amount
-                    result_action_str = (
-                        f"{self.current_player} steals {steal_amount} coins from {target_player}"
-                    )
+                    coins = min(target_player.coins, 2)
+                    target_player.coins -= coins
+                    self.current_player.coins += coins
 
             case ActionType.exchange:
                 # Get 2 random cards from deck
                 # TODO: Make interactive
-                cards = [self._deck.pop(), self._deck.pop()]
+                old_hand_hash = self._hand_hash(self.current_player)
+                cards = [self._draw_card(), self._draw_card()]
 
                 self.current_player.cards += cards
-                random.shuffle(self.current_player.cards)
+                self._rng.shuffle(self.current_player.cards)
 
                 first_card, second_card = (
                     self.current_player.cards.pop(),
                     self.current_player.cards.pop(),
                 )
-                self._deck.append(first_card)
-                self._deck.append(second_card)
+                self._deck.put(first_card.card_type)
+                self._deck.put(second_card.card_type)
+                self._zobrist ^= old_hand_hash ^ self._hand_hash(self.current_player)
+                self._log(
+                    EventType.exchange,
+                    player=self.current_player.name,
+                    drawn=[card.card_type.value for card in cards],
+                    returned=[first_card.card_type.value, second_card.card_type.value],
+                )
+
+        for player in changing_players:
+            self._zobrist ^= self._coins_key(player)
 
-        print(result_action_str)
+        self._narrate(
+            NarrationType.action,
+            player=player_name,
+            action=action.action_type.value,
+            target=target_player_name or "",
+            coins=coins,
+            countered=self._current_action_is_countered,
+        )
 
         return self._end_turn()
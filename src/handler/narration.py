@@ -0,0 +1,163 @@
+import gzip
+import json
+import sys
+from enum import Enum, IntEnum
+from typing import IO, Optional, Protocol, TextIO
+
+from src.models.action import ActionType
+
+
+class Level(IntEnum):
+    # The state of the game at the end of every turn
+    debug = 10
+    # What happens in the game
+    info = 20
+    # Above every narration, a sink with this level receives nothing
+    silent = 100
+
+
+class NarrationType(str, Enum):
+    action = "action"
+    counter = "counter"
+    challenge = "challenge"
+    challenge_counter = "challenge_counter"
+    reveal = "reveal"
+    lose_challenge = "lose_challenge"
+    new_card = "new_card"
+    bluff = "bluff"
+    state = "state"
+    defeated = "defeated"
+    game_over = "game_over"
+
+
+LEVELS: dict[NarrationType, Level] = {
+    narration_type: Level.debug if narration_type == NarrationType.state else Level.info
+    for narration_type in NarrationType
+}
+
+TEMPLATES: dict[NarrationType, str] = {
+    NarrationType.counter: "{player} is countering the previous action: {action}",
+    NarrationType.challenge: "{player} is challenging the previous action: {action}.",
+    NarrationType.challenge_counter: "{player} is challenging the previous counter action.",
+    NarrationType.reveal: "{player} reveals their {card} card!",
+    NarrationType.lose_challenge: "{player} loses the challenge\n{player} has lost influence...",
+    NarrationType.new_card: "{player} gets a new card\n",
+    NarrationType.bluff: (
+        "{player} bluffed! They do not have the required card!\n{player} has lost influence...\n"
+    ),
+    NarrationType.defeated: "{player} was defeated! They can no longer play",
+    NarrationType.game_over: "\nThe game is over! {player} has won!",
+}
+
+# The outcome of an action, exchanges don't tell theirs
+ACTION_TEMPLATES: dict[ActionType, str] = {
+    ActionType.income: "{player}'s coins are increased by {coins}",
+    ActionType.foreign_aid: "{player}'s coins are increased by {coins}",
+    ActionType.coup: "{player} pays 7 coins and performs the coup against {target}",
+    ActionType.tax: "{player}'s coins are increased by {coins}",
+    ActionType.assassinate: "{player} assassinates {target}",
+    ActionType.steal: "{player} steals {coins} coins from {target}",
+}
+
+
+def render(event: dict) -> str:
+    """The play-by-play line(s) of a narration event"""
+    narration_type = NarrationType(event["type"])
+    if narration_type == NarrationType.state:
+        players_str = "".join(
+            f"  - {player['name']} [{player['strategy']}] "
+            f"{player['cards']} cards | {player['coins']} coins\n"
+            for player in event["players"]
+        )
+        return f"""
+The remaining players are:
+{players_str}
+The number of coins in the treasury: {event["treasury"]}
+        """
+    if narration_type == NarrationType.action:
+        # Countered actions don't have an outcome either
+        if event["countered"]:
+            return ""
+        template = ACTION_TEMPLATES.get(ActionType(event["action"]))
+        return template.format(**event) if template else ""
+    return TEMPLATES[narration_type].format(**event)
+
+
+class NarrationSink(Protocol):
+    # Narrations below this level aren't even built
+    level: Level
+
+    def emit(self, event: dict) -> None:
+        ...
+
+    def flush(self) -> None:
+        ...
+
+
+class NullSink:
+    """Drops every narration, headless games pay a level comparison for their play-by-play"""
+
+    level = Level.silent
+
+    def emit(self, event: dict) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+
+class ConsoleSink:
+    """Prints the play-by-play for humans, to `sys.stdout` unless given a stream"""
+
+    def __init__(self, level: Level = Level.debug, stream: Optional[TextIO] = None):
+        self.level = level
+        self.stream = stream
+
+    def emit(self, event: dict) -> None:
+        # Looked up on every event, so redirecting stdout still works
+        print(render(event), file=self.stream or sys.stdout)
+
+    def flush(self) -> None:
+        (self.stream or sys.stdout).flush()
+
+
+class BufferedFileSink:
+    """
+    Writes narration events as JSON lines, `buffer_size` events at a time.
+
+    Gzip compressed when the path ends with `.gz`. Events still in the buffer are written by
+    `flush` or `close`.
+    """
+
+    def __init__(self, path: str, level: Level = Level.info, buffer_size: int = 1000):
+        self.level = level
+        self.buffer_size = buffer_size
+        self._buffer: list[dict] = []
+        self._file: IO = (
+            gzip.open(path, "at", encoding="utf-8")
+            if path.endswith(".gz")
+            else open(path, "a", encoding="utf-8")
+        )
+
+    def emit(self, event: dict) -> None:
+        self._buffer.append(event)
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._file.write(
+                "".join(json.dumps(event, separators=(",", ":")) + "\n" for event in self._buffer)
+            )
+            self._buffer.clear()
+        self._file.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+    def __enter__(self) -> "BufferedFileSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,49 @@
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from src.handler.game_handler import ResistanceCoupGameHandler
+
+
+class HandlerPool:
+    """Keeps finished game handlers around so new games reuse them instead of building new ones"""
+
+    def __init__(self, number_of_players: int, max_idle: Optional[int] = None):
+        self.number_of_players = number_of_players
+        self.max_idle = max_idle
+
+        self._idle: list[ResistanceCoupGameHandler] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._idle)
+
+    def acquire(self, seed: Optional[int] = None) -> ResistanceCoupGameHandler:
+        with self._lock:
+            handler = self._idle.pop() if self._idle else None
+
+        if handler is None:
+            # A new handler already starts with a freshly initialized game
+            return ResistanceCoupGameHandler(self.number_of_players, seed)
+
+        handler.initialize_game(seed)
+        return handler
+
+    def release(self, handler: ResistanceCoupGameHandler) -> None:
+        if len(handler.players) != self.number_of_players:
+            raise Exception(
+                f"Handler has {len(handler.players)} players, "
+                f"this pool only holds {self.number_of_players} player games."
+            )
+
+        with self._lock:
+            if self.max_idle is None or len(self._idle) < self.max_idle:
+                self._idle.append(handler)
+
+    @contextmanager
+    def game(self, seed: Optional[int] = None) -> Iterator[ResistanceCoupGameHandler]:
+        handler = self.acquire(seed)
+        try:
+            yield handler
+        finally:
+            self.release(handler)
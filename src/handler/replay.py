@@ -0,0 +1,47 @@
+from typing import Optional
+
+from src.handler.event_log import EventLog, EventType
+from src.handler.game_handler import GameSnapshot, ResistanceCoupGameHandler
+from src.handler.narration import ConsoleSink, NullSink
+from src.models.player import PlayerStrategy
+
+
+def replay(
+    event_log: EventLog, until_turn: Optional[int] = None, quiet: bool = True
+) -> ResistanceCoupGameHandler:
+    """
+    Rebuild a game from its event log, without any agents.
+
+    The game is dealt again from the seed of its start event and the logged commands are applied in
+    order; rejected commands are rejected again, so they are replayed as well. With `until_turn` the
+    game stops at the start of that turn, continuing from the last checkpoint before it.
+    """
+    if not event_log.events or event_log.events[0]["type"] != EventType.start.value:
+        raise Exception("Invalid event log: it has to begin with the start of a game.")
+
+    start = event_log.events[0]
+    handler = ResistanceCoupGameHandler(
+        start["number_of_players"],
+        seed=start["seed"],
+        strategies=[PlayerStrategy(strategy) for strategy in start["strategies"]],
+        narration=NullSink() if quiet else ConsoleSink(),
+        number_of_decks=start.get("number_of_decks"),
+    )
+
+    first_event = 1
+    if until_turn is not None and (checkpoint := event_log.last_checkpoint(until_turn)):
+        first_event, checkpoint_event = checkpoint
+        handler.restore(GameSnapshot.from_dict(checkpoint_event["state"]))
+
+    for event in event_log.events[first_event:]:
+        if until_turn is not None and event["turn"] >= until_turn:
+            break
+        if event["type"] != EventType.command.value:
+            continue
+
+        try:
+            getattr(handler, event["name"])(*event["args"])
+        except Exception:
+            pass
+
+    return handler
@@ -0,0 +1,78 @@
+import hashlib
+import random
+from typing import Optional
+
+MASK64 = (1 << 64) - 1
+# SplitMix64 steps its counter by 2^64 over the golden ratio
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+
+def _mix64(z: int) -> int:
+    """The SplitMix64 finalizer, scrambles every bit of a 64 bit int into every other"""
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+def derive_seed(seed: int, *stream_ids: int) -> int:
+    """The 64 bit seed of stream `stream_ids` of `seed`, unrelated to the seeds of other streams"""
+    key = 0
+    for value in (seed, *stream_ids):
+        key = _mix64(key ^ _mix64((value + GOLDEN_GAMMA) & MASK64))
+    return key
+
+
+class GameRNG(random.Random):
+    """
+    A counter based random generator: the n-th number of a stream is a hash of its key and n.
+
+    The state is just the key and the counter, which makes it cheap to snapshot. A stream can jump
+    ahead without generating the numbers in between, and `split` gives independent streams, such as
+    one per game of a tournament. Numbers are SplitMix64's, the methods `random.Random`'s.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self._key = 0
+        self._counter = 0
+        super().__init__(seed)
+
+    def seed(self, a=None, version: int = 2) -> None:
+        if a is None:
+            a = random.SystemRandom().getrandbits(64)
+        elif not isinstance(a, int):
+            a = int.from_bytes(hashlib.sha256(str(a).encode()).digest()[:8], "big")
+        self._key = derive_seed(a)
+        self._counter = 0
+        self.gauss_next = None
+
+    def _next(self) -> int:
+        self._counter += 1
+        return _mix64((self._key + self._counter * GOLDEN_GAMMA) & MASK64)
+
+    def getrandbits(self, k: int) -> int:
+        if k < 0:
+            raise ValueError("number of bits must be non-negative")
+        if k <= 64:
+            return self._next() >> (64 - k)
+
+        value = 0
+        for _ in range((k + 63) // 64):
+            value = (value << 64) | self._next()
+        return value >> (-k % 64)
+
+    def random(self) -> float:
+        return (self._next() >> 11) * (1.0 / (1 << 53))
+
+    def getstate(self) -> tuple:
+        return self._key, self._counter, self.gauss_next
+
+    def setstate(self, state: tuple) -> None:
+        self._key, self._counter, self.gauss_next = state
+
+    def jump(self, steps: int) -> None:
+        """Skip the next `steps` numbers"""
+        self._counter += steps
+
+    def split(self, stream_id: int) -> "GameRNG":
+        """An independent generator for stream `stream_id`, the same for the same key"""
+        return GameRNG(derive_seed(self._key, stream_id))
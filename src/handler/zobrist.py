@@ -0,0 +1,56 @@
+import functools
+from enum import Enum, IntEnum
+from typing import Hashable, Iterable
+
+from src.handler.rng import derive_seed
+from src.models.card import CardType
+
+CARD_CODES: dict[CardType, int] = {card_type: code for code, card_type in enumerate(CardType)}
+
+# Fixed, so hashes of the same position match across games and processes
+ZOBRIST_SEED = 0x5A0B4157
+
+
+class Feature(IntEnum):
+    coins = 0
+    card = 1
+    active = 2
+    deck = 3
+    treasury = 4
+    current_player = 5
+    turn_phase = 6
+    action = 7
+    target = 8
+    countered = 9
+    challenged = 10
+    counter_player = 11
+    # The decision pending in a search, and the seats of the players asked after
+    decision = 12
+    decision_player = 13
+    waiting_player = 14
+
+
+@functools.cache
+def zobrist_key(feature: Feature, index: int, value: Hashable = 0) -> int:
+    """The random 64 bit key of `feature` (of seat or card type `index`) having `value`"""
+    if isinstance(value, Enum):
+        value = list(type(value)).index(value)
+    elif value is None:
+        value = -1
+    return derive_seed(ZOBRIST_SEED, feature, index, value)
+
+
+def card_key(seat: int, card_type: CardType, copy: int) -> int:
+    """The key of the `copy`-th card of `card_type` in the hand of `seat`, counting from 1"""
+    return zobrist_key(Feature.card, seat, CARD_CODES[card_type] * 16 + copy)
+
+
+def hand_hash(seat: int, card_types: Iterable[CardType]) -> int:
+    """The hash of a hand, which doesn't depend on the order of its cards"""
+    hash_ = 0
+    copies: dict[CardType, int] = {}
+    for card_type in card_types:
+        # The n-th copy of a card type has its own key, so pairs don't cancel out
+        copies[card_type] = copies.get(card_type, 0) + 1
+        hash_ ^= card_key(seat, card_type, copies[card_type])
+    return hash_
@@ -28,6 +28,7 @@ class Action(BaseModel):
     requires_target: bool = False
     can_be_challenged: bool = False
     can_be_countered: bool = False
+    counter_card_types: List[CardType] = []
 
     def __str__(self):
         return f"{self.action_type.value}"
@@ -40,6 +41,7 @@ class IncomeAction(Action):
 class ForeignAidAction(Action):
     action_type: ActionType = ActionType.foreign_aid
     can_be_countered: bool = True
+    counter_card_types: List[CardType] = [CardType.duke]
 
 
 class CoupAction(Action):
@@ -59,6 +61,7 @@ class AssassinateAction(Action):
     requires_target: bool = True
     can_be_challenged: bool = True
     can_be_countered: bool = True
+    counter_card_types: List[CardType] = [CardType.contessa]
 
 
 class StealAction(Action):
@@ -67,6 +70,7 @@ class StealAction(Action):
     requires_target: bool = True
     can_be_challenged: bool = True
     can_be_countered: bool = True
+    counter_card_types: List[CardType] = [CardType.captain, CardType.ambassador]
 
 
 class ExchangeAction(Action):
@@ -12,6 +12,8 @@ class PlayerStrategy(str, Enum):
     aggressive = "aggressive"
     conservative = "conservative"
     coup_freak = "coup_freak"
+    # Searches the game tree instead of following a fixed play style, see src/ai/ismcts.py
+    ismcts = "ismcts"
 
 
 class Player(BaseModel, ABC):
@@ -35,7 +37,7 @@ class Player(BaseModel, ABC):
 
         return None
 
-    def remove_card(self) -> None:
+    def remove_card(self, rng: Optional[random.Random] = None) -> Card:
         """Remove a random card"""
-        # Remove a random card
-        self.cards.pop(random.randrange(len(self.cards)))
+        # Remove a random card, using the game's own random generator when given one
+        return self.cards.pop((rng or random).randrange(len(self.cards)))
@@ -0,0 +1,82 @@
+import json
+import urllib.error
+import urllib.request
+from typing import Optional
+
+from src.server.games import apply_diff
+
+
+class GameClient:
+    """
+    A seat at a game of the game server, for bots and agents in another process.
+
+    Keeps a copy of the public state of the game, updated with the diffs the server sends back.
+    """
+
+    def __init__(self, base_url: str = "http://127.0.0.1:8080", timeout: float = 60.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+        self.game_id: Optional[str] = None
+        self.player_name: Optional[str] = None
+        self.token: Optional[str] = None
+        self.version = -1
+        self.state: dict = {}
+        # The cards and legal moves of our seat, as of our last command
+        self.player: dict = {}
+
+    def _request(self, method: str, path: str, body: Optional[dict] = None) -> dict:
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        request = urllib.request.Request(
+            f"{self.base_url}{path}",
+            data=json.dumps(body).encode() if body is not None else None,
+            headers=headers,
+            method=method,
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise Exception(json.loads(e.read())["error"]["message"]) from e
+
+    def _update(self, changes: dict) -> None:
+        if "state" in changes:
+            self.state = changes["state"]
+        else:
+            apply_diff(self.state, changes["diff"])
+        self.version = changes["version"]
+
+    def create_game(self, number_of_players: int, seed: Optional[int] = None) -> str:
+        changes = self._request("POST", "/games", {"players": number_of_players, "seed": seed})
+        self.game_id = changes["game_id"]
+        self._update(changes)
+        return self.game_id
+
+    def join(self, game_id: str, player_name: Optional[str] = None) -> str:
+        self.game_id = game_id
+        response = self._request("POST", f"/games/{game_id}/join", {"player_name": player_name})
+        self.player_name, self.token = response["player_name"], response["token"]
+        self._update(response)
+        self.player = self._request("GET", f"/games/{game_id}/player")
+        return self.player_name
+
+    def refresh(self, wait: Optional[float] = None) -> dict:
+        """Catch up with the game, waiting up to `wait` seconds for it to change"""
+        query = f"?since={self.version}" if self.version >= 0 else ""
+        if wait is not None and query:
+            query += f"&wait={wait}"
+        self._update(self._request("GET", f"/games/{self.game_id}{query}"))
+        self.player = self._request("GET", f"/games/{self.game_id}/player")
+        return self.state
+
+    def command(self, command: str, **arguments) -> dict:
+        response = self._request(
+            "POST",
+            f"/games/{self.game_id}/commands",
+            {"command": command, "since": self.version, **arguments},
+        )
+        self._update(response)
+        self.player = response["player"]
+        return response["result"]
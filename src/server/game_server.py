@@ -0,0 +1,232 @@
+import base64
+import hashlib
+import json
+import select
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+from src.server.games import GamePool, HostedGame
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WEBSOCKET_TEXT = 0x1
+WEBSOCKET_CLOSE = 0x8
+WEBSOCKET_PING = 0x9
+WEBSOCKET_PONG = 0xA
+
+# Longest wait for a new version of a game, for long polling and between checks of a websocket
+MAX_WAIT = 30.0
+WEBSOCKET_POLL_INTERVAL = 1.0
+
+
+def websocket_frame(payload: bytes, opcode: int = WEBSOCKET_TEXT) -> bytes:
+    """A single, unmasked frame, as a server sends them"""
+    length = len(payload)
+    if length < 126:
+        header = bytes([0x80 | opcode, length])
+    elif length < 1 << 16:
+        header = bytes([0x80 | opcode, 126]) + length.to_bytes(2, "big")
+    else:
+        header = bytes([0x80 | opcode, 127]) + length.to_bytes(8, "big")
+    return header + payload
+
+
+class GameRequestHandler(BaseHTTPRequestHandler):
+    """
+    The routes of the game server, every game is under `/games/<game_id>`.
+
+    Players join a game for a token, and send it with their commands as `Authorization: Bearer`.
+    The state of a game is fetched or pushed as the diff since the version a client has.
+    """
+
+    # Keep connections open, and don't hold back the body behind the headers
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "GameServer"
+
+    def _send_json(self, status: int, body: dict, game: Optional[HostedGame] = None) -> None:
+        # Responses with the changes of a game are serialized under its lock
+        data = game.dumps(body) if game is not None else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: int, message: str) -> None:
+        self._send_json(status, {"error": {"message": message}})
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _token(self) -> str:
+        return self.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+
+    def _route(self) -> tuple[list[str], dict]:
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        return [part for part in url.path.split("/") if part], query
+
+    def _game(self, parts: list[str]) -> Optional[HostedGame]:
+        """The game of a `/games/<game_id>/...` path, answers with a 404 when there is none"""
+        if len(parts) < 2 or parts[0] != "games":
+            self._send_error(404, f"Unknown path {self.path}")
+            return None
+        if (game := self.server.pool.get(parts[1])) is None:
+            self._send_error(404, f"Unknown game {parts[1]}")
+        return game
+
+    def do_GET(self):
+        parts, query = self._route()
+        try:
+            if parts == ["games"]:
+                games = self.server.pool.games()
+                self._send_json(200, {"games": [game.summary() for game in games]})
+                return
+            if (game := self._game(parts)) is None:
+                return
+
+            match parts[2:]:
+                case []:
+                    since = int(query["since"]) if "since" in query else None
+                    if since is not None and "wait" in query:
+                        # Long polling, for clients without websockets
+                        game.wait(since, min(float(query["wait"]), MAX_WAIT))
+                    self._send_json(200, game.changes(since), game)
+                case ["player"]:
+                    self._send_json(200, game.player_state(self._token()))
+                case ["ws"]:
+                    self._stream(game)
+                case _:
+                    self._send_error(404, f"Unknown path {self.path}")
+        except Exception as e:
+            self._send_error(400, str(e))
+
+    def do_POST(self):
+        parts, _ = self._route()
+        try:
+            body = self._body()
+            if parts == ["games"]:
+                game = self.server.pool.create(int(body.get("players", 3)), body.get("seed"))
+                self._send_json(201, {"game_id": game.game_id, **game.changes()}, game)
+                return
+            if (game := self._game(parts)) is None:
+                return
+
+            match parts[2:]:
+                case ["join"]:
+                    player_name, token = game.join(body.get("player_name"))
+                    self._send_json(
+                        200,
+                        {"player_name": player_name, "token": token, **game.changes()},
+                        game,
+                    )
+                case ["commands"]:
+                    token = self._token()
+                    since = body.get("since", game.version)
+                    result = game.command(token, body.get("command", ""), body)
+                    self._send_json(
+                        200,
+                        {
+                            "result": result,
+                            "player": game.player_state(token),
+                            **game.changes(since),
+                        },
+                        game,
+                    )
+                case _:
+                    self._send_error(404, f"Unknown path {self.path}")
+        except Exception as e:
+            self._send_error(400, str(e))
+
+    def do_DELETE(self):
+        parts, _ = self._route()
+        if len(parts) != 2:
+            self._send_error(404, f"Unknown path {self.path}")
+            return
+        if self._game(parts) is None:
+            return
+        self.server.pool.close(parts[1])
+        self._send_json(200, {"game_id": parts[1], "closed": True})
+
+    def _stream(self, game: HostedGame) -> None:
+        """Push the full state and then every diff over a websocket, until either side closes"""
+        key = self.headers.get("Sec-WebSocket-Key")
+        if self.headers.get("Upgrade", "").lower() != "websocket" or not key:
+            self._send_error(400, "Expected a websocket upgrade")
+            return
+
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest())
+        self.send_response(101)
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept.decode())
+        self.end_headers()
+        self.close_connection = True
+
+        version = None
+        try:
+            while not game.closed:
+                if version is None or game.version > version:
+                    changes = game.changes(version)
+                    version = changes["version"]
+                    self.wfile.write(websocket_frame(game.dumps(changes)))
+                    self.wfile.flush()
+
+                game.wait(version, WEBSOCKET_POLL_INTERVAL)
+                # Answer what the client sent in the meantime
+                while select.select([self.connection], [], [], 0)[0]:
+                    opcode, payload = self._read_frame()
+                    if opcode == WEBSOCKET_CLOSE:
+                        self.wfile.write(websocket_frame(payload[:2], WEBSOCKET_CLOSE))
+                        return
+                    if opcode == WEBSOCKET_PING:
+                        self.wfile.write(websocket_frame(payload, WEBSOCKET_PONG))
+
+            # 1001: going away, the game was closed or evicted
+            self.wfile.write(websocket_frame((1001).to_bytes(2, "big"), WEBSOCKET_CLOSE))
+        except (ConnectionError, OSError):
+            # The client left without closing
+            pass
+
+    def _receive(self, length: int) -> bytes:
+        data = b""
+        while len(data) < length:
+            if not (chunk := self.connection.recv(length - len(data))):
+                raise ConnectionError("The websocket was closed")
+            data += chunk
+        return data
+
+    def _read_frame(self) -> tuple[int, bytes]:
+        first, second = self._receive(2)
+        length = second & 0x7F
+        if length == 126:
+            length = int.from_bytes(self._receive(2), "big")
+        elif length == 127:
+            length = int.from_bytes(self._receive(8), "big")
+
+        # Clients always mask their frames
+        mask = self._receive(4) if second & 0x80 else bytes(4)
+        payload = self._receive(length)
+        return first & 0x0F, bytes(byte ^ mask[index % 4] for index, byte in enumerate(payload))
+
+    def log_message(self, format, *args):
+        # Every command is a request, keep the console quiet
+        pass
+
+
+class GameServer(ThreadingHTTPServer):
+    """Hosts the games of a `GamePool`, serve it with `serve_forever()`"""
+
+    daemon_threads = True
+    # Every seat of every game may connect at once
+    request_queue_size = 1024
+
+    def __init__(self, pool: GamePool, host: str = "127.0.0.1", port: int = 8080):
+        self.pool = pool
+        super().__init__((host, port), GameRequestHandler)
+
+    def service_actions(self) -> None:
+        # Called by `serve_forever` between requests, at least every poll interval
+        self.pool.evict_idle()
@@ -0,0 +1,369 @@
+import json
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from typing import Optional
+
+from src.handler.game_handler import ResistanceCoupGameHandler, ResponseType, TurnPhase
+from src.handler.narration import NullSink
+from src.handler.pool import HandlerPool
+from src.models.action import ActionType
+
+# Diffs kept per game, clients further behind are sent the full state instead
+DIFF_HISTORY = 256
+# Seconds the players get to respond to an action or counter-action before it can be executed
+RESPONSE_TIMEOUT = 30.0
+
+RESPONSE_PHASES: list[TurnPhase] = [TurnPhase.action_response, TurnPhase.counter_response]
+
+
+def public_state(handler: ResistanceCoupGameHandler) -> dict:
+    """What everyone at the table can see, hands only by their number of cards"""
+    responding = handler.turn_phase in RESPONSE_PHASES
+    active_players = [player.name for player in handler.players if player.is_active]
+    return {
+        "turn": handler.turn,
+        "turn_phase": handler.turn_phase.value,
+        "current_player": handler.current_player.name,
+        "treasury": handler.treasury,
+        "players": {
+            player.name: {
+                "coins": player.coins,
+                "cards": len(player.cards),
+                "is_active": player.is_active,
+            }
+            for player in handler.players
+        },
+        # By card type, so a lost card only changes one count
+        "lost_cards": dict(Counter(card.card_type.value for card in handler.lost_cards)),
+        "action": handler.current_action.action_type.value if responding else None,
+        "target_player": (
+            (handler.current_action_target_player_name or None) if responding else None
+        ),
+        "counter_player": handler.current_counter_action_player_name if responding else None,
+        "winner": active_players[0] if handler.turn_phase == TurnPhase.game_over else None,
+    }
+
+
+def parse_action_type(action_name: str) -> ActionType:
+    """The action named `action_name`, by value ("Foreign Aid") or name ("foreign_aid"), any case"""
+    name = action_name.strip().lower().replace(" ", "_")
+    if name not in ActionType.__members__:
+        raise Exception(f"Invalid action: there is no action called {action_name}.")
+    return ActionType[name]
+
+
+def state_diff(old: dict, new: dict) -> dict:
+    """
+    The entries of `new` that differ from `old`, nested dictionaries with only their changes.
+
+    Entries are never removed from a state, so a diff only holds new values.
+    """
+    diff = {}
+    for key, value in new.items():
+        old_value = old.get(key)
+        if isinstance(value, dict) and isinstance(old_value, dict):
+            if nested_diff := state_diff(old_value, value):
+                diff[key] = nested_diff
+        elif key not in old or value != old_value:
+            diff[key] = value
+    return diff
+
+
+def apply_diff(state: dict, diff: dict) -> dict:
+    """
+    Update `state` in place with a diff, also merges diffs into one.
+
+    Nested dictionaries of the diff are copied, never shared, so merging doesn't change the diffs.
+    """
+    for key, value in diff.items():
+        if isinstance(value, dict):
+            if not isinstance(state.get(key), dict):
+                state[key] = {}
+            apply_diff(state[key], value)
+        else:
+            state[key] = value
+    return state
+
+
+class HostedGame:
+    """
+    A game hosted by the server, with the players that joined it.
+
+    Commands of a game run one at a time under its lock, while other games go on in parallel.
+    Every command that changes what the players see bumps the version and keeps the diff, so
+    clients only fetch what changed since the version they have.
+
+    An action or counter-action can only be executed once every other player that may respond
+    passed, or `response_timeout` seconds after it was played.
+    """
+
+    def __init__(
+        self,
+        game_id: str,
+        handler: ResistanceCoupGameHandler,
+        response_timeout: Optional[float] = RESPONSE_TIMEOUT,
+    ):
+        self.game_id = game_id
+        self.handler = handler
+        self.response_timeout = response_timeout
+        # Also wakes up the clients waiting for the next version
+        self.lock = threading.Condition()
+
+        self.version = 0
+        self.state = public_state(handler)
+        self._diffs: deque[tuple[int, dict]] = deque(maxlen=DIFF_HISTORY)
+
+        # The players that passed on the action or counter-action waiting for responses
+        self._passed: set[str] = set()
+        self._responses_opened = time.monotonic()
+
+        # Player name by token, a seat can only be taken once
+        self._tokens: dict[str, str] = {}
+        self.last_active = time.monotonic()
+        self.closed = False
+
+    def summary(self) -> dict:
+        with self.lock:
+            return {
+                "game_id": self.game_id,
+                "version": self.version,
+                "players": len(self.handler.players),
+                "joined": len(self._tokens),
+                "turn_phase": self.state["turn_phase"],
+            }
+
+    def join(self, player_name: Optional[str] = None) -> tuple[str, str]:
+        """Take the seat of `player_name`, or the first free seat, returns it with its token"""
+        with self.lock:
+            self._check_open()
+            taken = set(self._tokens.values())
+            free_seats = [
+                player.name for player in self.handler.players if player.name not in taken
+            ]
+            if player_name is None and free_seats:
+                player_name = free_seats[0]
+            if player_name not in free_seats:
+                raise Exception(f"The seat of {player_name} is not free in game {self.game_id}.")
+
+            token = uuid.uuid4().hex
+            self._tokens[token] = player_name
+            self.last_active = time.monotonic()
+            return player_name, token
+
+    def player_name(self, token: str) -> str:
+        if token not in self._tokens:
+            raise Exception(f"Invalid token: it doesn't hold a seat in game {self.game_id}.")
+        return self._tokens[token]
+
+    def legal_responses(self, player_name: str) -> list[ResponseType]:
+        """The responses of the handler, none once the player passed"""
+        if player_name in self._passed:
+            return []
+        return self.handler.legal_responses(player_name)
+
+    def waiting_for(self) -> list[str]:
+        """The players that may still respond before the action or counter-action is executed"""
+        if self.handler.turn_phase not in RESPONSE_PHASES or (
+            self.response_timeout is not None
+            and time.monotonic() - self._responses_opened > self.response_timeout
+        ):
+            return []
+        return [
+            player_name
+            for player_name in self.handler.get_eligible_responders()
+            if player_name not in self._passed
+        ]
+
+    def player_state(self, token: str) -> dict:
+        """What only the player holding `token` sees: their cards, and what they can do now"""
+        with self.lock:
+            self._check_open()
+            player_name = self.player_name(token)
+            return {
+                "player_name": player_name,
+                "cards": [
+                    card.card_type.value for card in self.handler.get_player(player_name).cards
+                ],
+                "legal_actions": [
+                    {"action_name": action_type.value, "target_player_name": target_player_name}
+                    for action_type, target_player_name in self.handler.legal_actions(player_name)
+                ],
+                "legal_responses": [
+                    response.value for response in self.legal_responses(player_name)
+                ],
+                "waiting_for": self.waiting_for(),
+            }
+
+    def command(self, token: str, command: str, arguments: dict) -> dict:
+        """Play a command for the player holding `token`, as the agents would call it"""
+        with self.lock:
+            self._check_open()
+            player_name = self.player_name(token)
+            result = self._run(player_name, command, arguments)
+            self.last_active = time.monotonic()
+            if command != "pass":
+                # Every other command plays or ends an action or counter-action
+                self._passed.clear()
+                self._responses_opened = self.last_active
+            self._publish()
+            return result
+
+    def _run(self, player_name: str, command: str, arguments: dict) -> dict:
+        handler = self.handler
+        legal_responses = self.legal_responses(player_name)
+        match command:
+            case "perform_action":
+                return handler.perform_action(
+                    player_name,
+                    parse_action_type(arguments["action_name"]),
+                    arguments.get("target_player_name") or "",
+                )
+            case "pass" if ResponseType.pass_ in legal_responses:
+                self._passed.add(player_name)
+                return {"turn_complete": False, "waiting_for": self.waiting_for()}
+            case "execute_action":
+                if handler.turn_phase not in RESPONSE_PHASES:
+                    raise Exception("There is no action waiting to be executed.")
+                # Executing passes on a counter-action for the acting player
+                if waiting_for := [name for name in self.waiting_for() if name != player_name]:
+                    raise Exception(
+                        f"Invalid command: waiting for {', '.join(waiting_for)} to respond."
+                    )
+                return handler.execute_action(
+                    player_name,
+                    handler.current_action.action_type,
+                    handler.current_action_target_player_name,
+                )
+            case "counter_action" if ResponseType.counter in legal_responses:
+                return handler.counter_action(player_name)
+            case "challenge_action" if (
+                handler.turn_phase == TurnPhase.action_response
+                and ResponseType.challenge in legal_responses
+            ):
+                return handler.challenge_action(player_name)
+            case "challenge_counter_action" if (
+                handler.turn_phase == TurnPhase.counter_response
+                and ResponseType.challenge in legal_responses
+            ):
+                return handler.challenge_counter_action(player_name)
+        raise Exception(f"Invalid command: {player_name} can't {command} now.")
+
+    def _publish(self) -> None:
+        state = public_state(self.handler)
+        if diff := state_diff(self.state, state):
+            self.version += 1
+            self._diffs.append((self.version, diff))
+            self.state = state
+            self.lock.notify_all()
+
+    def changes(self, since: Optional[int] = None) -> dict:
+        """The diff from version `since` to the current one, or the full state if it is too old"""
+        with self.lock:
+            if since is None or since > self.version or not self._can_diff(since):
+                return {"version": self.version, "state": self.state}
+
+            diff: dict = {}
+            for version, version_diff in self._diffs:
+                if version > since:
+                    apply_diff(diff, version_diff)
+            return {"version": self.version, "diff": diff}
+
+    def dumps(self, body: dict) -> bytes:
+        """Serialize a response holding the state or diffs of the game, under its lock"""
+        with self.lock:
+            return json.dumps(body).encode()
+
+    def _can_diff(self, since: int) -> bool:
+        return since == self.version or (bool(self._diffs) and self._diffs[0][0] <= since + 1)
+
+    def wait(self, since: int, timeout: Optional[float] = None) -> bool:
+        """Wait for a version after `since`, returns False on a timeout"""
+        with self.lock:
+            return self.lock.wait_for(lambda: self.version > since or self.closed, timeout)
+
+    def close(self) -> None:
+        with self.lock:
+            self.closed = True
+            self.lock.notify_all()
+
+    def _check_open(self) -> None:
+        if self.closed:
+            raise Exception(f"Game {self.game_id} has been closed.")
+
+
+class GamePool:
+    """
+    The games hosted by the server, by game id.
+
+    Handlers of closed games go back to a `HandlerPool` per number of players, so new games reuse
+    them. Games without a join or command for `idle_timeout` seconds are evicted.
+    """
+
+    def __init__(
+        self,
+        max_games: int = 1000,
+        idle_timeout: float = 600.0,
+        max_players: int = 100,
+        response_timeout: Optional[float] = RESPONSE_TIMEOUT,
+    ):
+        self.max_games = max_games
+        self.idle_timeout = idle_timeout
+        self.max_players = max_players
+        self.response_timeout = response_timeout
+
+        self._games: dict[str, HostedGame] = {}
+        self._handler_pools: dict[int, HandlerPool] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+    def games(self) -> list[HostedGame]:
+        with self._lock:
+            return list(self._games.values())
+
+    def get(self, game_id: str) -> Optional[HostedGame]:
+        return self._games.get(game_id)
+
+    def create(self, number_of_players: int, seed: Optional[int] = None) -> HostedGame:
+        if not 2 <= number_of_players <= self.max_players:
+            raise Exception(f"A game needs 2 to {self.max_players} players.")
+
+        self.evict_idle()
+        with self._lock:
+            if len(self._games) >= self.max_games:
+                raise Exception(f"The server is full, it hosts at most {self.max_games} games.")
+
+            handler_pool = self._handler_pools.setdefault(
+                number_of_players, HandlerPool(number_of_players)
+            )
+            handler = handler_pool.acquire(seed)
+            # Nobody reads the play-by-play of hosted games
+            handler.narration = NullSink()
+
+            game = HostedGame(uuid.uuid4().hex, handler, self.response_timeout)
+            self._games[game.game_id] = game
+            return game
+
+    def close(self, game_id: str) -> bool:
+        with self._lock:
+            game = self._games.pop(game_id, None)
+        if game is None:
+            return False
+
+        # Only released once no command of the game is running anymore
+        game.close()
+        self._handler_pools[len(game.handler.players)].release(game.handler)
+        return True
+
+    def evict_idle(self, now: Optional[float] = None) -> list[str]:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            idle_game_ids = [
+                game_id
+                for game_id, game in self._games.items()
+                if now - game.last_active > self.idle_timeout
+            ]
+        return [game_id for game_id in idle_game_ids if self.close(game_id)]
@@ -0,0 +1,155 @@
+import random
+from typing import Iterable, Optional
+
+from pydantic import BaseModel
+
+from src.ai.bots import PlayerBot, create_player_bot
+from src.ai.ismcts import DEFAULT_MAX_ITERATIONS, ISMCTSBot
+from src.handler.game_handler import ACTIONS_MAP, ResistanceCoupGameHandler
+from src.handler.narration import NullSink
+from src.handler.rng import derive_seed
+from src.models.action import ActionType
+from src.models.player import PlayerStrategy
+
+
+class GameResult(BaseModel):
+    seed: Optional[int] = None
+    game_index: Optional[int] = None
+    winner: Optional[str]
+    winner_strategy: Optional[PlayerStrategy]
+    strategies: dict[str, PlayerStrategy]
+    turns: int
+    elimination_order: list[str]
+
+
+def create_bots(
+    handler: ResistanceCoupGameHandler, rng: Optional[random.Random] = None
+) -> dict[str, PlayerBot]:
+    # A fixed number of search iterations instead of a time budget keeps games reproducible
+    return {
+        player.name: ISMCTSBot(
+            player.name, rng, time_budget=None, max_iterations=DEFAULT_MAX_ITERATIONS
+        )
+        if player.strategy == PlayerStrategy.ismcts
+        else create_player_bot(player.name, player.strategy, rng)
+        for player in handler.players
+    }
+
+
+def play_turn(handler: ResistanceCoupGameHandler, bots: dict[str, PlayerBot]) -> dict:
+    acting_player_name = handler.current_player.name
+    action_type, target_player_name = bots[acting_player_name].choose_action(handler)
+
+    result = handler.perform_action(acting_player_name, action_type, target_player_name)
+    if result["turn_complete"]:
+        return result
+
+    action = ACTIONS_MAP[action_type]
+    responders = handler.players_after(acting_player_name)
+
+    if action.can_be_challenged:
+        for player_name in responders:
+            if bots[player_name].should_challenge(
+                handler, acting_player_name, action_type, target_player_name
+            ):
+                return handler.challenge_action(player_name)
+
+    if action.can_be_countered:
+        # Anyone can block foreign aid, only the target can block a steal or an assassination
+        if action_type != ActionType.foreign_aid:
+            responders = [
+                player_name for player_name in responders if player_name == target_player_name
+            ]
+
+        for player_name in responders:
+            if bots[player_name].should_counter(handler, acting_player_name, action_type):
+                handler.counter_action(player_name)
+
+                for challenger_name in handler.players_after(player_name):
+                    if bots[challenger_name].should_challenge_counter(
+                        handler, player_name, action_type
+                    ):
+                        return handler.challenge_counter_action(challenger_name)
+                break
+
+    return handler.execute_action(acting_player_name, action_type, target_player_name)
+
+
+def play_game(
+    handler: ResistanceCoupGameHandler, bots: dict[str, PlayerBot], max_turns: int = 1000
+) -> GameResult:
+    active_player_names = [player.name for player in handler.players if player.is_active]
+    elimination_order = []
+
+    turns = 0
+    game_over = False
+    while not game_over and turns < max_turns:
+        game_over = play_turn(handler, bots)["game_over"]
+        turns += 1
+
+        still_active = [name for name in active_player_names if handler.get_player(name).is_active]
+        if len(still_active) != len(active_player_names):
+            elimination_order += [name for name in active_player_names if name not in still_active]
+            active_player_names = still_active
+
+    winner = handler.get_player(active_player_names[0]) if game_over else None
+    return GameResult(
+        winner=winner.name if winner else None,
+        winner_strategy=winner.strategy if winner else None,
+        strategies={player.name: player.strategy for player in handler.players},
+        turns=turns,
+        elimination_order=elimination_order,
+    )
+
+
+# The bots draw from their own stream of the game seed, apart from the game's
+BOTS_STREAM = 1
+
+
+def game_seed(seed: int, game_index: int) -> int:
+    """The seed of a single game, so any game of a run can be replayed on its own"""
+    return derive_seed(seed, game_index)
+
+
+def run_games(
+    number_of_players: int,
+    game_indices: Iterable[int],
+    seed: int,
+    max_turns: int = 1000,
+    quiet: bool = True,
+    handler: Optional[ResistanceCoupGameHandler] = None,
+    strategies: Optional[list[PlayerStrategy]] = None,
+) -> list[GameResult]:
+    handler = handler or ResistanceCoupGameHandler(number_of_players, strategies=strategies)
+    # Bots draw from their own generator, reseeded with every game so the game seed covers their
+    # decisions too. The handler's generator only serves the game, which keeps its event log
+    # replayable.
+    bots_rng = random.Random()
+    bots = create_bots(handler, bots_rng)
+
+    if quiet:
+        # The handler narrates every turn, which headless games don't need
+        handler.narration = NullSink()
+
+    results = []
+    for game_index in game_indices:
+        handler.initialize_game(game_seed(seed, game_index))
+        bots_rng.seed(derive_seed(handler.seed, BOTS_STREAM))
+        result = play_game(handler, bots, max_turns)
+        result.seed = seed
+        result.game_index = game_index
+        results.append(result)
+
+    return results
+
+
+def replay_game(
+    number_of_players: int,
+    seed: int,
+    game_index: int,
+    max_turns: int = 1000,
+    strategies: Optional[list[PlayerStrategy]] = None,
+) -> GameResult:
+    return run_games(
+        number_of_players, [game_index], seed, max_turns, quiet=False, strategies=strategies
+    )[0]
@@ -0,0 +1,179 @@
+import math
+from collections import defaultdict
+from statistics import NormalDist
+from typing import Hashable, Optional
+
+from src.models.player import PlayerStrategy
+
+
+class RunningMean:
+    """Mean and variance of a stream of values, updated in constant memory (Welford's algorithm)"""
+
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def standard_error(self) -> float:
+        return math.sqrt(self.variance / self.count) if self.count else math.inf
+
+
+def _z(confidence: float) -> float:
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def wilson_interval(successes: int, trials: int, confidence: float = 0.95) -> tuple[float, float]:
+    """Confidence interval of a success rate, sensible even for few trials or rates near 0 or 1"""
+    if not trials:
+        return 0.0, 1.0
+    z = _z(confidence)
+    rate = successes / trials
+    denominator = 1 + z**2 / trials
+    center = (rate + z**2 / (2 * trials)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / trials + z**2 / (4 * trials**2)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def _beta_continued_fraction(a: float, b: float, x: float) -> float:
+    # Lentz's method for the continued fraction of the incomplete beta function
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    result = d
+    for m in range(1, 300):
+        for numerator in (
+            m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+            -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1)),
+        ):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            result *= c * d
+        if abs(c * d - 1.0) < 1e-12:
+            break
+    return result
+
+
+def beta_cdf(x: float, a: float, b: float) -> float:
+    """The regularized incomplete beta function, the CDF of a Beta(a, b) distribution"""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    log_front = (
+        math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1 - x)
+    )
+    if x < (a + 1) / (a + b + 2):
+        return math.exp(log_front) * _beta_continued_fraction(a, b, x) / a
+    return 1.0 - math.exp(log_front) * _beta_continued_fraction(b, a, 1 - x) / b
+
+
+def beta_interval(
+    successes: int, trials: int, confidence: float = 0.95, prior: tuple[float, float] = (1.0, 1.0)
+) -> tuple[float, float]:
+    """Equal tailed credible interval of a success rate, from its Beta posterior"""
+    a, b = prior[0] + successes, prior[1] + trials - successes
+
+    def quantile(probability: float) -> float:
+        low, high = 0.0, 1.0
+        for _ in range(60):
+            middle = (low + high) / 2
+            if beta_cdf(middle, a, b) < probability:
+                low = middle
+            else:
+                high = middle
+        return (low + high) / 2
+
+    tail = (1 - confidence) / 2
+    return quantile(tail), quantile(1 - tail)
+
+
+INTERVALS = {"wilson": wilson_interval, "bayes": beta_interval}
+
+
+class WinRateTracker:
+    """
+    Running win rates and placings of strategies, updated one game at a time.
+
+    Win rates are tracked per strategy, per strategy and seat, and per strategy and number of
+    players, so variants can be compared without keeping every game. `settled` is a sequential
+    stopping rule: it can be checked after every game, and says when the ranking of the strategies
+    by win rate won't change with more games.
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.looks = 0
+        self.seats: dict[Hashable, int] = defaultdict(int)
+        self.wins: dict[Hashable, int] = defaultdict(int)
+        self.placings: dict[PlayerStrategy, RunningMean] = defaultdict(RunningMean)
+
+    def update(
+        self,
+        strategies: dict[str, PlayerStrategy],
+        winner: Optional[str],
+        placings: Optional[dict[str, float]] = None,
+    ) -> None:
+        """Add a game, its `strategies` by player name in seat order"""
+        self.games += 1
+        number_of_players = len(strategies)
+        for seat, (player_name, strategy) in enumerate(strategies.items()):
+            won = player_name == winner
+            for key in (
+                strategy,
+                (strategy, "seat", seat),
+                (strategy, "players", number_of_players),
+            ):
+                self.seats[key] += 1
+                self.wins[key] += won
+            if placings is not None:
+                self.placings[strategy].update(placings[player_name])
+
+    def win_rate(self, key: Hashable) -> float:
+        return self.wins[key] / self.seats[key] if self.seats[key] else 0.0
+
+    def interval(
+        self, key: Hashable, confidence: float = 0.95, method: str = "wilson"
+    ) -> tuple[float, float]:
+        """Interval of the win rate of a strategy, or of `(strategy, "seat" or "players", number)`"""
+        return INTERVALS[method](self.wins[key], self.seats[key], confidence)
+
+    def ranking(self) -> list[PlayerStrategy]:
+        strategies = [key for key in self.seats if isinstance(key, PlayerStrategy)]
+        return sorted(strategies, key=self.win_rate, reverse=True)
+
+    def settled(
+        self, confidence: float = 0.95, min_games: int = 30, method: str = "wilson"
+    ) -> bool:
+        """
+        Whether the win rate intervals of strategies next to each other in the ranking are apart.
+
+        Every check spends part of the error rate: the k-th check uses 1 - confidence over k(k + 1),
+        split over the strategies. Those add up to 1 - confidence over all checks, so checking after
+        every game is as safe as checking once.
+        """
+        if self.games < min_games:
+            return False
+
+        self.looks += 1
+        ranking = self.ranking()
+        if len(ranking) < 2:
+            return True
+
+        error = (1 - confidence) / (self.looks * (self.looks + 1)) / len(ranking)
+        intervals = [self.interval(strategy, 1 - error, method) for strategy in ranking]
+        return all(higher[0] > lower[1] for higher, lower in zip(intervals, intervals[1:]))
@@ -0,0 +1,171 @@
+import multiprocessing
+import random
+from collections import defaultdict
+from typing import Optional, Union
+
+from pydantic import BaseModel
+
+from src.engine.compact import CompactGame
+from src.engine.policies import run_compact_games
+from src.handler.game_handler import ResistanceCoupGameHandler
+from src.models.player import PlayerStrategy
+from src.simulation.headless import GameResult, run_games
+from src.simulation.statistics import WinRateTracker, wilson_interval
+
+
+class StrategySummary(BaseModel):
+    seats: int = 0
+    wins: int = 0
+    win_rate: float = 0.0
+    # 95% Wilson interval of the win rate
+    win_rate_interval: tuple[float, float] = (0.0, 1.0)
+    # 1 is the winner, the number of players is the first player eliminated
+    average_placing: float = 0.0
+
+
+class TournamentSummary(BaseModel):
+    seed: int
+    number_of_games: int
+    number_of_players: int
+    unfinished_games: int
+    average_turns: float
+    strategies: dict[PlayerStrategy, StrategySummary]
+    # Stopped before playing all games, because the ranking of the strategies was settled
+    settled: bool = False
+
+
+# Each worker process keeps a single game for every game it plays
+_worker_game: Optional[Union[ResistanceCoupGameHandler, CompactGame]] = None
+
+
+def _init_worker(
+    number_of_players: int, engine: str, strategies: Optional[list[PlayerStrategy]] = None
+) -> None:
+    global _worker_game
+    if engine == "compact":
+        _worker_game = CompactGame(number_of_players)
+    else:
+        _worker_game = ResistanceCoupGameHandler(number_of_players, strategies=strategies)
+
+
+def _play_games(args: tuple[int, range, int, int]) -> list[GameResult]:
+    number_of_players, game_indices, seed, max_turns = args
+    if isinstance(_worker_game, CompactGame):
+        return run_compact_games(
+            number_of_players, game_indices, seed, max_turns, game=_worker_game
+        )
+    return run_games(number_of_players, game_indices, seed, max_turns, handler=_worker_game)
+
+
+def _placings(result: GameResult, number_of_players: int) -> dict[str, float]:
+    placings = {}
+    for player_name in result.strategies:
+        if player_name in result.elimination_order:
+            placings[player_name] = number_of_players - result.elimination_order.index(player_name)
+        elif player_name == result.winner:
+            placings[player_name] = 1
+        else:
+            # Still standing when the game hit the turn limit, they share the places left
+            placings[player_name] = (number_of_players - len(result.elimination_order) + 1) / 2
+    return placings
+
+
+def summarize(results: list[GameResult], seed: int, number_of_players: int) -> TournamentSummary:
+    strategies: dict[PlayerStrategy, StrategySummary] = defaultdict(StrategySummary)
+    placings: dict[PlayerStrategy, float] = defaultdict(float)
+
+    for result in results:
+        for player_name, placing in _placings(result, number_of_players).items():
+            strategy = result.strategies[player_name]
+            strategies[strategy].seats += 1
+            placings[strategy] += placing
+
+        if result.winner_strategy:
+            strategies[result.winner_strategy].wins += 1
+
+    for strategy, summary in strategies.items():
+        summary.win_rate = summary.wins / summary.seats
+        summary.win_rate_interval = wilson_interval(summary.wins, summary.seats)
+        summary.average_placing = placings[strategy] / summary.seats
+
+    return TournamentSummary(
+        seed=seed,
+        number_of_games=len(results),
+        number_of_players=number_of_players,
+        unfinished_games=sum(result.winner is None for result in results),
+        average_turns=sum(result.turns for result in results) / max(len(results), 1),
+        strategies=dict(strategies),
+    )
+
+
+def run_tournament(
+    number_of_games: int,
+    number_of_players: int,
+    seed: Optional[int] = None,
+    workers: int = 1,
+    max_turns: int = 1000,
+    chunk_size: int = 250,
+    engine: str = "handler",
+    strategies: Optional[list[PlayerStrategy]] = None,
+    until_settled: bool = False,
+    confidence: float = 0.95,
+) -> tuple[TournamentSummary, list[GameResult]]:
+    """
+    Play `number_of_games` bot games over `workers` processes.
+
+    The "handler" engine plays through ResistanceCoupGameHandler, the "compact" engine plays the
+    same rules on a CompactGame, which is about five times faster. Only the handler engine
+    seats players with other `strategies` than the default rotation, such as ISMCTS players.
+
+    With `until_settled` the tournament stops at the first game after which the ranking of the
+    strategies by win rate is settled with `confidence`, so at most `number_of_games` are played.
+    Games are then taken in order, which stops a tournament at the same game for any `workers`.
+    """
+    if strategies and engine != "handler":
+        raise Exception(f"The {engine} engine only plays the default rotation of strategies.")
+
+    if seed is None:
+        seed = random.randrange(2**32)
+
+    chunks = [
+        (number_of_players, range(start, min(start + chunk_size, number_of_games)), seed, max_turns)
+        for start in range(0, number_of_games, chunk_size)
+    ]
+
+    results: list[GameResult] = []
+    tracker = WinRateTracker()
+
+    def add_results(chunk_results: list[GameResult]) -> bool:
+        """Adds the results of a chunk, up to the game that settles the ranking if stopping early"""
+        if not until_settled:
+            results.extend(chunk_results)
+            return False
+
+        for result in chunk_results:
+            results.append(result)
+            tracker.update(result.strategies, result.winner, _placings(result, number_of_players))
+            if tracker.settled(confidence):
+                return True
+        return False
+
+    settled = False
+    if workers == 1:
+        _init_worker(number_of_players, engine, strategies)
+        for chunk in chunks:
+            if settled := add_results(_play_games(chunk)):
+                break
+    else:
+        with multiprocessing.Pool(
+            workers, initializer=_init_worker, initargs=(number_of_players, engine, strategies)
+        ) as pool:
+            play = pool.imap if until_settled else pool.imap_unordered
+            for chunk_results in play(_play_games, chunks):
+                if settled := add_results(chunk_results):
+                    break
+
+        # Results arrive in whatever order the workers finish
+        results.sort(key=lambda result: result.game_index)
+
+    summary = summarize(results, seed, number_of_players)
+    summary.settled = settled
+    return summary, results
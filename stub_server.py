@@ -0,0 +1,60 @@
+import argparse
+import json
+import sys
+
+from src.ai.stub_server import StubModel, create_server
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve a local OpenAI compatible stand-in for the model, to load test the agents"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Host to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the answers")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds to wait before every answer"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="Random seconds added to or taken off the latency"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error"
+    )
+    parser.add_argument(
+        "--error-status", type=int, default=500, help="HTTP status of the injected errors"
+    )
+    parser.add_argument(
+        "--script",
+        default=None,
+        help="JSON file with a list of messages to answer with first, in order",
+    )
+    args = parser.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script, encoding="utf-8") as file:
+            script = json.load(file)
+
+    model = StubModel(
+        seed=args.seed,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        script=script,
+    )
+    server = create_server(model, args.host, args.port)
+    print(f"Serving the stub model on http://{args.host}:{server.server_port}/v1")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        print(f"Answered {model.requests} requests, {model.errors} with an injected error")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(130)